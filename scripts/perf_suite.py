@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Performance regression suite for the Definite MCP server.
+
+Runs offline against the bundled mock API and compares each metric with the
+baselines stored in scripts/perf_baselines.json. Exits non-zero when any
+metric is slower than its baseline by more than the allowed threshold.
+
+    python scripts/perf_suite.py                 # compare against baselines
+    python scripts/perf_suite.py --update        # re-record baselines
+    python scripts/perf_suite.py --only cache_hit_us --threshold 0.5
+
+Baselines are machine-specific: re-record them on the box that runs the
+suite in CI, and commit the file alongside the change that moved them.
+"""
+
+import os
+import sys
+import json
+import time
+import socket
+import asyncio
+import argparse
+import statistics
+import subprocess
+from typing import Callable, Awaitable, Dict, Any, List, Optional
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+BASELINES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "perf_baselines.json")
+sys.path.insert(0, SRC_DIR)
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+# The server reads its configuration at import time, so point it at the mock
+# (and make retries deterministic) before importing it.
+MOCK_PORT = _free_port()
+SERVER_ENV = {
+    "DEFINITE_API_KEY": "perf",
+    "DEFINITE_API_BASE_URL": f"http://127.0.0.1:{MOCK_PORT}",
+    "DEFINITE_HEALTH_INTERVAL_S": "0",
+    "DEFINITE_BACKOFF_BASE_S": "0.02",
+    "DEFINITE_RETRY_JITTER": "none",
+    "DEFINITE_RETRY_BUDGET_MIN": "1000000",
+    "DEFINITE_BREAKER_FAILURES": "0",
+    "LOG_LEVEL": "CRITICAL",
+}
+os.environ.update(SERVER_ENV)
+
+import definite_mcp  # noqa: E402
+from definite_mcp.mock_server import MockServer, MockConfig  # noqa: E402
+
+BENCHMARKS: Dict[str, Callable[[], Awaitable[float]]] = {}
+UNITS: Dict[str, str] = {}
+
+
+def benchmark(name: str, unit: str):
+    def register(fn: Callable[[], Awaitable[float]]) -> Callable[[], Awaitable[float]]:
+        BENCHMARKS[name] = fn
+        UNITS[name] = unit
+        return fn
+    return register
+
+
+async def _median_of(n: int, fn: Callable[[], Awaitable[Any]]) -> float:
+    """Median wall time of n runs of fn, in seconds."""
+    samples = []
+    for _ in range(n):
+        t0 = time.perf_counter()
+        await fn()
+        samples.append(time.perf_counter() - t0)
+    return statistics.median(samples)
+
+
+# -------------------------
+# Benchmarks
+# -------------------------
+
+@benchmark("cold_start_ms", "ms")
+async def cold_start() -> float:
+    """Interpreter start + import of the server module (median of 5)."""
+    env = {**os.environ, "PYTHONPATH": SRC_DIR}
+    samples = []
+    for _ in range(5):
+        t0 = time.perf_counter()
+        subprocess.run([sys.executable, "-c", "import definite_mcp"], env=env,
+                       check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        samples.append(time.perf_counter() - t0)
+    return statistics.median(samples) * 1000
+
+
+@benchmark("call_overhead_ms", "ms")
+async def call_overhead() -> float:
+    """Uncached run_sql_query against a zero-latency, 1-row mock."""
+    sql = "SELECT 1 /* mock: rows=1 latency=0 */"
+    await definite_mcp.run_sql_query(sql, use_cache=False)
+    return await _median_of(200, lambda: definite_mcp.run_sql_query(sql, use_cache=False)) * 1000
+
+
+@benchmark("result_1k_rows_ms", "ms")
+async def result_1k_rows() -> float:
+    """Download + JSON decode of a 1k-row result."""
+    sql = "SELECT 1 /* mock: rows=1000 latency=0 */"
+    return await _median_of(50, lambda: definite_mcp.run_sql_query(sql, use_cache=False)) * 1000
+
+
+@benchmark("result_100k_rows_ms", "ms")
+async def result_100k_rows() -> float:
+    """Download + JSON decode of a 100k-row result."""
+    sql = "SELECT 1 /* mock: rows=100000 latency=0 */"
+    return await _median_of(5, lambda: definite_mcp.run_sql_query(sql, use_cache=False)) * 1000
+
+
+@benchmark("retry_wall_ms", "ms")
+async def retry_wall() -> float:
+    """Wall time to exhaust all retries on a persistent 503."""
+    sql = "SELECT 1 /* mock: status=503 latency=0 */"
+    return await _median_of(3, lambda: definite_mcp.run_sql_query(sql, use_cache=False)) * 1000
+
+
+@benchmark("cache_hit_us", "us")
+async def cache_hit() -> float:
+    """run_sql_query served from the result cache."""
+    sql = "SELECT 1 /* mock: rows=1000 latency=0 */"
+    await definite_mcp.run_sql_query(sql)
+    return await _median_of(2000, lambda: definite_mcp.run_sql_query(sql)) * 1_000_000
+
+
+# -------------------------
+# Runner
+# -------------------------
+
+def _load_baselines() -> Dict[str, Any]:
+    try:
+        with open(BASELINES_PATH) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {"threshold": 0.25, "metrics": {}}
+
+
+async def run(names: List[str]) -> Dict[str, float]:
+    results: Dict[str, float] = {}
+    async with MockServer(MockConfig(), port=MOCK_PORT):
+        for name in names:
+            results[name] = await BENCHMARKS[name]()
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    p = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    p.add_argument("--update", action="store_true", help="write results as the new baselines")
+    p.add_argument("--threshold", type=float, default=None,
+                   help="allowed slowdown as a fraction (overrides the baselines file)")
+    p.add_argument("--only", action="append", choices=sorted(BENCHMARKS), default=None)
+    args = p.parse_args(argv)
+
+    names = args.only or list(BENCHMARKS)
+    results = asyncio.run(run(names))
+    baselines = _load_baselines()
+
+    if args.update:
+        metrics = baselines.setdefault("metrics", {})
+        for name, value in results.items():
+            entry = metrics.setdefault(name, {})
+            entry.update({"value": round(value, 3), "unit": UNITS[name]})
+        with open(BASELINES_PATH, "w") as f:
+            json.dump(baselines, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"Baselines written to {BASELINES_PATH}")
+
+    default_threshold = args.threshold if args.threshold is not None else baselines.get("threshold", 0.25)
+    regressions = 0
+    print(f"{'metric':<22} {'current':>12} {'baseline':>12} {'change':>9}")
+    for name, value in results.items():
+        base = baselines.get("metrics", {}).get(name, {})
+        base_value = base.get("value")
+        threshold = args.threshold if args.threshold is not None else base.get("threshold", default_threshold)
+        unit = UNITS[name]
+        if base_value:
+            change = (value - base_value) / base_value
+            failed = change > threshold
+            regressions += failed
+            status = "REGRESSED" if failed else "ok"
+            print(f"{name:<22} {value:>10.2f}{unit:>2} {base_value:>10.2f}{unit:>2} "
+                  f"{change:>+8.1%}  {status}")
+        else:
+            print(f"{name:<22} {value:>10.2f}{unit:>2} {'-':>12} {'-':>9}  (no baseline)")
+
+    if regressions and not args.update:
+        print(f"\n{regressions} metric(s) regressed beyond threshold")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
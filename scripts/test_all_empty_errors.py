@@ -24,7 +24,7 @@ async def test_http_error_empty_message():
 
     original = definite_mcp.make_api_request
 
-    async def mock(endpoint: str, payload: dict):
+    async def mock(endpoint: str, payload: dict, **kwargs):
         response = httpx.Response(
             status_code=400,
             json={"message": ""},
@@ -57,7 +57,7 @@ async def test_http_error_empty_after_extraction():
 
     original = definite_mcp.make_api_request
 
-    async def mock(endpoint: str, payload: dict):
+    async def mock(endpoint: str, payload: dict, **kwargs):
         response = httpx.Response(
             status_code=500,
             json={"message": "HTTP error 500: Something went wrong: "},
@@ -93,7 +93,7 @@ async def test_generic_exception_empty():
         def __str__(self):
             return ""
 
-    async def mock(endpoint: str, payload: dict):
+    async def mock(endpoint: str, payload: dict, **kwargs):
         raise EmptyException()
 
     definite_mcp.make_api_request = mock
@@ -148,7 +148,7 @@ async def test_cube_empty_errors():
         def __str__(self):
             return ""
 
-    async def mock(endpoint: str, payload: dict):
+    async def mock(endpoint: str, payload: dict, **kwargs):
         raise EmptyException()
 
     definite_mcp.make_api_request = mock
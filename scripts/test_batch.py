@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Offline check of the batched query tools against the bundled mock API:
+bounded concurrency, per-query results in input order, the batch size
+cap, and one deadline for the whole batch.
+
+    python scripts/test_batch.py
+"""
+
+import os
+import sys
+import socket
+import asyncio
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+# The server reads its configuration at import time
+MOCK_PORT = _free_port()
+os.environ.update({
+    "DEFINITE_API_KEY": "test",
+    "DEFINITE_API_BASE_URL": f"http://127.0.0.1:{MOCK_PORT}",
+    "DEFINITE_HEALTH_INTERVAL_S": "0",
+    "DEFINITE_WARM_CONNECTIONS": "0",
+    "DEFINITE_CACHE_TTL_S": "0",
+    "DEFINITE_BATCH_MAX_CONCURRENCY": "8",
+    "DEFINITE_BATCH_MAX_QUERIES": "10",
+    "LOG_LEVEL": "CRITICAL",
+})
+
+import definite_mcp  # noqa: E402
+from definite_mcp.mock_server import MockServer, MockConfig  # noqa: E402
+
+
+async def test_bounded_and_ordered():
+    """Eight 200ms queries four at a time take two rounds and come back in order"""
+    print("1. Eight SQL queries with max_concurrency=4, one of them failing...")
+    queries = [f"SELECT {i} /* mock: latency=200 */" for i in range(7)] + ["SELECT 7 /* mock: status=500 */"]
+    batch = await definite_mcp.run_sql_queries(queries, max_concurrency=4)
+    order = [r["index"] for r in batch["results"]]
+    echoed = [r["result"].get("query") for r in batch["results"]]
+    ok = 350 <= batch["elapsed_ms"] < 700 and order == list(range(8)) and echoed[-1] == queries[-1] \
+        and batch["succeeded"] == 7 and batch["failed"] == 1 and not batch["results"][7]["ok"]
+    print(f"{'✅' if ok else '❌'} {batch['elapsed_ms']:.0f}ms, succeeded {batch['succeeded']}, failed {batch['failed']}")
+    return ok
+
+
+async def test_limits(server):
+    """max_concurrency is capped by the server setting and oversized batches are refused"""
+    print("2. max_concurrency=100 and an eleven-query batch...")
+    capped = await definite_mcp.run_cube_queries(
+        [{"measures": [f"m{i}"], "mock": {"latency": 50}} for i in range(3)], max_concurrency=100,
+    )
+    before = server.stats.get("query", 0)
+    refused = await definite_mcp.run_sql_queries([f"SELECT {i}" for i in range(11)])
+    sent = server.stats.get("query", 0) - before
+    ok = capped["max_concurrency"] == 8 and capped["succeeded"] == 3 and "error" in refused and sent == 0
+    print(f"{'✅' if ok else '❌'} max_concurrency {capped['max_concurrency']}, oversized: {refused.get('error')}")
+    return ok
+
+
+async def test_one_deadline():
+    """timeout_s bounds the batch as a whole, not each query"""
+    print("3. Four 1s queries two at a time with timeout_s=0.5...")
+    batch = await definite_mcp.run_sql_queries(
+        [f"SELECT {10 + i} /* mock: latency=1000 */" for i in range(4)], max_concurrency=2, timeout_s=0.5,
+    )
+    ok = batch["failed"] == 4 and batch["elapsed_ms"] < 900
+    print(f"{'✅' if ok else '❌'} {batch['elapsed_ms']:.0f}ms, failed {batch['failed']}")
+    return ok
+
+
+async def main():
+    async with MockServer(MockConfig(), port=MOCK_PORT) as server:
+        results = [
+            await test_bounded_and_ordered(),
+            await test_limits(server),
+            await test_one_deadline(),
+        ]
+    print()
+    print("All passed" if all(results) else "Some checks failed")
+    return 0 if all(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Offline check of the load-testing harness: it drives a real server
+subprocess over stdio against the bundled mock API and reports what the
+mock actually saw, including errors and cache hits.
+
+    python scripts/test_bench.py
+"""
+
+import os
+import sys
+import asyncio
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+# Importing the harness imports the server package, which configures logging
+os.environ.setdefault("LOG_LEVEL", "CRITICAL")
+
+from definite_mcp import bench  # noqa: E402
+
+
+async def _bench(*argv: str) -> dict:
+    return await bench.run(bench._parse_args([*argv, "--server-log-level", "CRITICAL"]))
+
+
+async def test_clean_run():
+    """Every call is measured once and reaches the mock once"""
+    print("1. 40 calls at concurrency 8 after 2 warmup calls...")
+    report = await _bench("--requests", "40", "--concurrency", "8", "--warmup", "2")
+    lat = report["latency_ms"]
+    ok = report["requests"] == 40 and report["error_rate"] == 0 and report["mock_stats"]["query"] == 42 \
+        and lat["p50"] <= lat["p95"] <= lat["max"] and report["server_rss_bytes"]
+    print(f"{'✅' if ok else '❌'} {report['requests']} measured, {report['mock_stats']['query']} at the mock, "
+          f"p50 {lat['p50']}ms, errors {report['errors']}")
+    return ok
+
+
+async def test_errors_counted():
+    """Failing calls are labelled by HTTP status in the report"""
+    print("2. 10 calls against a mock that always answers 500...")
+    report = await _bench("--requests", "10", "--concurrency", "2", "--warmup", "0", "--mock-error-rate", "1")
+    ok = report["error_rate"] == 1.0 and report["errors"] == {"500": 10}
+    print(f"{'✅' if ok else '❌'} error rate {report['error_rate']}, errors {report['errors']}")
+    return ok
+
+
+async def test_repeats_hit_cache():
+    """With --cache, repeated queries are answered by the server without reaching the mock"""
+    print("3. 40 calls, 80% repeats, cache on...")
+    report = await _bench("--requests", "40", "--concurrency", "1", "--warmup", "0",
+                          "--repeat-ratio", "0.8", "--cache")
+    sent = report["mock_stats"]["query"]
+    ok = report["error_rate"] == 0 and sent < 20
+    print(f"{'✅' if ok else '❌'} {sent} of 40 calls reached the mock")
+    return ok
+
+
+async def test_workload():
+    """The workload honours --mix and rejects unknown query kinds"""
+    print("4. Workload generation...")
+    args = bench._parse_args(["--mix", "cube=1", "--result-rows", "5"])
+    tools = {bench._Workload(args).next(i)[0] for i in range(20)}
+    try:
+        bench._parse_mix("sql=1,graphql=1")
+        rejected = False
+    except argparse.ArgumentTypeError:
+        rejected = True
+    ok = tools == {"run_cube_query"} and rejected and bench.percentile([1, 2, 3, 4], 0.5) == 2
+    print(f"{'✅' if ok else '❌'} tools {tools}, unknown kind rejected: {rejected}")
+    return ok
+
+
+async def main():
+    results = [
+        await test_clean_run(),
+        await test_errors_counted(),
+        await test_repeats_hit_cache(),
+        await test_workload(),
+    ]
+    print()
+    print("All passed" if all(results) else "Some checks failed")
+    return 0 if all(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
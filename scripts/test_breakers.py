@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Offline check of the per-integration circuit breaker against the bundled
+mock API: which failures count toward opening it, and how often.
+
+    python scripts/test_breakers.py
+"""
+
+import os
+import sys
+import socket
+import asyncio
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+# The server reads its configuration at import time
+MOCK_PORT = _free_port()
+os.environ.update({
+    "DEFINITE_API_KEY": "test",
+    "DEFINITE_API_BASE_URL": f"http://127.0.0.1:{MOCK_PORT}",
+    "DEFINITE_HEALTH_INTERVAL_S": "0",
+    "DEFINITE_WARM_CONNECTIONS": "0",
+    "DEFINITE_CACHE_TTL_S": "0",
+    "DEFINITE_RETRIES": "2",
+    "DEFINITE_BACKOFF_BASE_S": "0.01",
+    "DEFINITE_RETRY_JITTER": "none",
+    "DEFINITE_RETRY_BUDGET_MIN": "1000000",
+    "DEFINITE_ATTEMPT_DEADLINE_S": "0.2",
+    "DEFINITE_BREAKER_FAILURES": "3",
+    "DEFINITE_BREAKER_RESET_S": "30",
+    "LOG_LEVEL": "CRITICAL",
+})
+
+import definite_mcp  # noqa: E402
+from definite_mcp.mock_server import MockServer, MockConfig  # noqa: E402
+
+BREAKER = "integration:default"
+
+
+def _integration() -> dict:
+    return definite_mcp._BREAKERS.snapshot().get(BREAKER, {"state": "closed", "consecutive_failures": 0})
+
+
+def _reset(failure_threshold: int = 3, reset_timeout_s: float = 30) -> None:
+    definite_mcp._BREAKERS = type(definite_mcp._BREAKERS)(failure_threshold, reset_timeout_s)
+
+
+async def test_sql_errors_do_not_open():
+    """A 500 is the query's own error, not an unavailable integration"""
+    print("1. Five SQL errors (HTTP 500)...")
+    _reset()
+    for i in range(5):
+        await definite_mcp.run_sql_query(f"SELECT {i} /* mock: status=500 */")
+    result = await definite_mcp.run_sql_query("SELECT 1")
+    state = _integration()
+    ok = state["state"] == "closed" and "error" not in result
+    print(f"{'✅' if ok else '❌'} {BREAKER}: {state}")
+    return ok
+
+
+async def test_one_failure_per_call():
+    """Every attempt of one call timing out counts once"""
+    print("2. One call whose every attempt times out...")
+    _reset()
+    await definite_mcp.run_sql_query("SELECT 1 /* mock: latency=1000 */")
+    state = _integration()
+    ok = state["consecutive_failures"] == 1 and state["state"] == "closed"
+    print(f"{'✅' if ok else '❌'} {BREAKER}: {state}")
+    return ok
+
+
+async def test_gateway_errors_open():
+    """502/503/504 on every attempt open the breaker after the threshold"""
+    print("3. Three calls failing with 502/503/504...")
+    _reset()
+    for status in (502, 503, 504):
+        await definite_mcp.run_sql_query(f"SELECT {status} /* mock: status={status} */")
+    result = await definite_mcp.run_sql_query("SELECT 1")
+    state = _integration()
+    ok = state["state"] == "open" and result.get("request_details", {}).get("phase") == "circuit_open"
+    print(f"{'✅' if ok else '❌'} {BREAKER}: {state}")
+    return ok
+
+
+async def test_half_open_trial_retries(server):
+    """The call holding the half-open trial retries and reports its failure"""
+    print("4. Half-open trial that gets another 503...")
+    _reset(failure_threshold=1, reset_timeout_s=0.3)
+    await definite_mcp.run_sql_query("SELECT 1 /* mock: status=503 */")
+    await asyncio.sleep(0.35)
+    before = server.stats.get("query", 0)
+    result = await definite_mcp.run_sql_query("SELECT 2 /* mock: status=503 */")
+    sent = server.stats.get("query", 0) - before
+    state = _integration()
+    phase = result.get("request_details", {}).get("phase")
+    ok = sent > 1 and phase != "circuit_open" and result.get("http_status") == 503 \
+        and state["state"] == "open" and state["times_opened"] == 2
+    print(f"{'✅' if ok else '❌'} {sent} upstream request(s), phase {phase}, {BREAKER}: {state}")
+    return ok
+
+
+async def main():
+    async with MockServer(MockConfig(), port=MOCK_PORT) as server:
+        results = [
+            await test_sql_errors_do_not_open(),
+            await test_one_failure_per_call(),
+            await test_gateway_errors_open(),
+            await test_half_open_trial_retries(server),
+        ]
+    print()
+    print("All passed" if all(results) else "Some checks failed")
+    return 0 if all(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Offline check of the in-process result cache against the bundled mock API:
+repeated reads are served locally until they expire, writes always reach
+the API and invalidate their integration's reads, and the byte ceiling
+evicts least-recently-used entries.
+
+    python scripts/test_cache.py
+"""
+
+import os
+import sys
+import socket
+import asyncio
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+# The server reads its configuration at import time
+MOCK_PORT = _free_port()
+os.environ.update({
+    "DEFINITE_API_KEY": "test",
+    "DEFINITE_API_BASE_URL": f"http://127.0.0.1:{MOCK_PORT}",
+    "DEFINITE_HEALTH_INTERVAL_S": "0",
+    "DEFINITE_WARM_CONNECTIONS": "0",
+    "DEFINITE_CACHE_TTL_S": "0.5",
+    "LOG_LEVEL": "CRITICAL",
+})
+
+import definite_mcp  # noqa: E402
+from definite_mcp.cache import ResultCache  # noqa: E402
+from definite_mcp.mock_server import MockServer, MockConfig  # noqa: E402
+
+
+async def _sent(server, *coros) -> int:
+    """Queries the mock received while running coros one after another."""
+    before = server.stats.get("query", 0)
+    for coro in coros:
+        await coro
+    return server.stats.get("query", 0) - before
+
+
+async def test_repeat_read_hits(server):
+    """A repeated read (modulo whitespace) is served from the cache; use_cache=False bypasses it"""
+    print("1. Same SELECT three times, then with use_cache=False...")
+    cached = await _sent(server,
+                         definite_mcp.run_sql_query("SELECT 1"),
+                         definite_mcp.run_sql_query("  SELECT 1\n"),
+                         definite_mcp.run_sql_query("SELECT 1"))
+    bypassed = await _sent(server, definite_mcp.run_sql_query("SELECT 1", use_cache=False))
+    ok = cached == 1 and bypassed == 1
+    print(f"{'✅' if ok else '❌'} {cached} upstream query(ies) for three reads, {bypassed} with the bypass")
+    return ok
+
+
+async def test_entries_expire(server):
+    """Past the TTL the next read goes upstream again"""
+    print("2. Same SELECT after the 0.5s TTL...")
+    await definite_mcp.run_sql_query("SELECT 2")
+    await asyncio.sleep(0.6)
+    sent = await _sent(server, definite_mcp.run_sql_query("SELECT 2"))
+    ok = sent == 1
+    print(f"{'✅' if ok else '❌'} {sent} upstream query(ies)")
+    return ok
+
+
+async def test_writes_not_cached(server):
+    """Writes and failed reads always go upstream; a write drops cached reads"""
+    print("3. Repeated INSERT, repeated failing SELECT, and a read after a write...")
+    writes = await _sent(server,
+                         definite_mcp.run_sql_query("INSERT INTO t VALUES (1)"),
+                         definite_mcp.run_sql_query("INSERT INTO t VALUES (1)"))
+    errors = await _sent(server,
+                         definite_mcp.run_sql_query("SELECT 3 /* mock: status=500 */"),
+                         definite_mcp.run_sql_query("SELECT 3 /* mock: status=500 */"))
+    await definite_mcp.run_sql_query("SELECT 4")
+    invalidated = await _sent(server,
+                              definite_mcp.run_sql_query("DELETE FROM t"),
+                              definite_mcp.run_sql_query("SELECT 4"))
+    ok = writes == 2 and errors == 2 and invalidated == 2
+    print(f"{'✅' if ok else '❌'} inserts: {writes}, failing reads: {errors}, delete + read: {invalidated}")
+    return ok
+
+
+async def test_lru_eviction():
+    """Over the byte ceiling the least recently used entry goes first"""
+    print("4. Three 40-byte entries in a 100-byte cache...")
+    cache = ResultCache(max_bytes=100, default_ttl_s=60)
+    cache.put("a", 1, 40)
+    cache.put("b", 2, 40)
+    cache.get("a")
+    cache.put("c", 3, 40)
+    too_big = cache.put("d", 4, 101)
+    stats = cache.stats()
+    ok = cache.get("b") is None and cache.get("a") == 1 and cache.get("c") == 3 \
+        and stats["bytes"] == 80 and stats["evictions"] == 1 and not too_big
+    print(f"{'✅' if ok else '❌'} {stats}")
+    return ok
+
+
+async def main():
+    async with MockServer(MockConfig(), port=MOCK_PORT) as server:
+        results = [
+            await test_repeat_read_hits(server),
+            await test_entries_expire(server),
+            await test_writes_not_cached(server),
+            await test_lru_eviction(),
+        ]
+    print()
+    print("All passed" if all(results) else "Some checks failed")
+    return 0 if all(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
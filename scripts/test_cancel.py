@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Offline check of upstream cancellation against the bundled mock API: a
+query nobody will read is cancelled server-side, whether the caller went
+away or the client gave up retrying.
+
+    python scripts/test_cancel.py
+"""
+
+import os
+import sys
+import socket
+import asyncio
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+# The server reads its configuration at import time
+MOCK_PORT = _free_port()
+os.environ.update({
+    "DEFINITE_API_KEY": "test",
+    "DEFINITE_API_BASE_URL": f"http://127.0.0.1:{MOCK_PORT}",
+    "DEFINITE_HEALTH_INTERVAL_S": "0",
+    "DEFINITE_WARM_CONNECTIONS": "0",
+    "DEFINITE_CACHE_TTL_S": "0",
+    "DEFINITE_RETRIES": "1",
+    "DEFINITE_BACKOFF_BASE_S": "0.01",
+    "DEFINITE_RETRY_JITTER": "none",
+    "DEFINITE_RETRY_BUDGET_MIN": "1000000",
+    "DEFINITE_ATTEMPT_DEADLINE_S": "0.3",
+    "DEFINITE_BREAKER_FAILURES": "0",
+    "LOG_LEVEL": "CRITICAL",
+})
+
+import definite_mcp  # noqa: E402
+from definite_mcp.mock_server import MockServer, MockConfig  # noqa: E402
+
+
+async def _cancels_after(server, coro) -> int:
+    """Cancel requests the mock received for coro (cancels are sent in the background)."""
+    before = server.stats.get("cancel_requests", 0)
+    await coro
+    await asyncio.sleep(0.2)
+    return server.stats.get("cancel_requests", 0) - before
+
+
+async def test_caller_cancelled(server):
+    """A tool call cancelled mid-query cancels the query upstream"""
+    print("1. Caller cancels a running query...")
+
+    async def call_and_cancel():
+        task = asyncio.ensure_future(definite_mcp.run_sql_query("SELECT 1 /* mock: latency=2000 */", timeout_s=0))
+        await asyncio.sleep(0.1)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+    sent = await _cancels_after(server, call_and_cancel())
+    ok = sent == 1
+    print(f"{'✅' if ok else '❌'} {sent} cancel request(s)")
+    return ok
+
+
+async def test_last_attempt_times_out(server):
+    """Giving up after the last attempt's deadline cancels the query upstream"""
+    print("2. Every attempt hits the attempt deadline...")
+    sent = await _cancels_after(server, definite_mcp.run_sql_query("SELECT 2 /* mock: latency=2000 */"))
+    ok = sent == 1
+    print(f"{'✅' if ok else '❌'} {sent} cancel request(s)")
+    return ok
+
+
+async def test_gateway_error_give_up(server):
+    """Giving up on a 504 cancels; giving up on a 429 (never started) doesn't"""
+    print("3. Retries exhausted on 504 and on 429...")
+    sent_504 = await _cancels_after(server, definite_mcp.run_sql_query("SELECT 3 /* mock: status=504 */"))
+    sent_429 = await _cancels_after(server, definite_mcp.run_sql_query("SELECT 4 /* mock: status=429 */"))
+    ok = sent_504 == 1 and sent_429 == 0
+    print(f"{'✅' if ok else '❌'} 504: {sent_504} cancel request(s), 429: {sent_429}")
+    return ok
+
+
+async def test_success_not_cancelled(server):
+    """A query that returned a result is never cancelled"""
+    print("4. Successful query...")
+    sent = await _cancels_after(server, definite_mcp.run_sql_query("SELECT 5"))
+    ok = sent == 0
+    print(f"{'✅' if ok else '❌'} {sent} cancel request(s)")
+    return ok
+
+
+async def main():
+    async with MockServer(MockConfig(), port=MOCK_PORT) as server:
+        results = [
+            await test_caller_cancelled(server),
+            await test_last_attempt_times_out(server),
+            await test_gateway_error_give_up(server),
+            await test_success_not_cancelled(server),
+        ]
+    print()
+    print("All passed" if all(results) else "Some checks failed")
+    return 0 if all(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
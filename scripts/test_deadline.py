@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Offline check of end-to-end call deadlines against the bundled mock API:
+timeout_s bounds a call retries included, coalesced callers each keep
+their own deadline, and an attempt timing out inside a generous call
+deadline is reported as the attempt's timeout, not the call's.
+
+    python scripts/test_deadline.py
+"""
+
+import os
+import sys
+import time
+import socket
+import asyncio
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+# The server reads its configuration at import time
+MOCK_PORT = _free_port()
+os.environ.update({
+    "DEFINITE_API_KEY": "test",
+    "DEFINITE_API_BASE_URL": f"http://127.0.0.1:{MOCK_PORT}",
+    "DEFINITE_HEALTH_INTERVAL_S": "0",
+    "DEFINITE_WARM_CONNECTIONS": "0",
+    "DEFINITE_CACHE_TTL_S": "0",
+    "DEFINITE_BACKOFF_BASE_S": "0.4",
+    "DEFINITE_RETRY_JITTER": "none",
+    "DEFINITE_BREAKER_FAILURES": "0",
+    "LOG_LEVEL": "CRITICAL",
+})
+
+import definite_mcp  # noqa: E402
+from definite_mcp.mock_server import MockServer, MockConfig  # noqa: E402
+
+
+async def _timed(coro):
+    t0 = time.monotonic()
+    result = await coro
+    return result, time.monotonic() - t0
+
+
+def _phase(result: dict):
+    return result.get("request_details", {}).get("phase")
+
+
+async def test_slow_query_bounded():
+    """A 3s query with timeout_s=1 gives up after about a second"""
+    print("1. 3s query with timeout_s=1...")
+    result, elapsed = await _timed(definite_mcp.run_sql_query("SELECT 1 /* mock: latency=3000 */", timeout_s=1))
+    ok = _phase(result) == "deadline_exceeded" and 0.9 <= elapsed < 1.3
+    print(f"{'✅' if ok else '❌'} {elapsed:.2f}s, phase {_phase(result)}")
+    return ok
+
+
+async def test_retries_bounded(server):
+    """Retries stop when the next backoff plus attempt wouldn't fit the deadline"""
+    print("2. Failing query with 0.4s backoffs and timeout_s=1...")
+    before = server.stats.get("query", 0)
+    result, elapsed = await _timed(definite_mcp.run_sql_query("SELECT 2 /* mock: status=503 */", timeout_s=1))
+    attempts = server.stats.get("query", 0) - before
+    ok = result.get("http_status") == 503 and elapsed < 1.0 and 1 < attempts < 4
+    print(f"{'✅' if ok else '❌'} {attempts} attempt(s) in {elapsed:.2f}s")
+    return ok
+
+
+async def test_coalesced_deadlines():
+    """Sharing a query, the tight caller gives up and the generous one gets the result"""
+    print("3. One 2s query shared by callers with timeout_s=1 and timeout_s=10...")
+    sql = "SELECT 3 /* mock: latency=2000 */"
+    tight, generous = await asyncio.gather(
+        definite_mcp.run_sql_query(sql, timeout_s=1),
+        definite_mcp.run_sql_query(sql, timeout_s=10),
+    )
+    ok = _phase(tight) == "deadline_exceeded" and "error" not in generous
+    print(f"{'✅' if ok else '❌'} tight: {_phase(tight)}, generous: {generous.get('error', 'ok')}")
+    return ok
+
+
+async def test_attempt_timeout_not_call_timeout():
+    """An attempt deadline hit well inside the call deadline keeps its own phase and timings"""
+    print("4. Attempt deadline of 0.3s inside a 60s call deadline...")
+    policy = definite_mcp._RETRY_POLICY
+    max_attempts, policy.max_attempts = policy.max_attempts, 1
+    try:
+        result = await definite_mcp._run_query(
+            definite_mcp._sql_payload("SELECT 4 /* mock: latency=1000 */", None), {}, attempt_deadline_s=0.3,
+            deadline=definite_mcp._call_deadline(60),
+        )
+    finally:
+        policy.max_attempts = max_attempts
+    timings = result.get("request_details", {}).get("timings_ms") or {}
+    ok = _phase(result) == "attempt_deadline_timeout" and timings.get("total", 0) >= 300
+    print(f"{'✅' if ok else '❌'} phase {_phase(result)}, timings {timings}")
+    return ok
+
+
+async def main():
+    async with MockServer(MockConfig(), port=MOCK_PORT) as server:
+        results = [
+            await test_slow_query_bounded(),
+            await test_retries_bounded(server),
+            await test_coalesced_deadlines(),
+            await test_attempt_timeout_not_call_timeout(),
+        ]
+    print()
+    print("All passed" if all(results) else "Some checks failed")
+    return 0 if all(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Offline check of the DNS cache against the bundled mock API: concurrent new
+connections share one lookup, later connections reuse the cached answer, a
+failed re-resolution serves the stale answer, and an answer whose addresses
+all refuse is dropped.
+
+    python scripts/test_dns.py
+"""
+
+import os
+import sys
+import socket
+import asyncio
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+# The server reads its configuration at import time
+MOCK_PORT = _free_port()
+os.environ.update({
+    "DEFINITE_API_KEY": "test",
+    # A name, not an IP literal, so connections go through the resolver
+    "DEFINITE_API_BASE_URL": f"http://localhost:{MOCK_PORT}",
+    "DEFINITE_HEALTH_INTERVAL_S": "0",
+    "DEFINITE_WARM_CONNECTIONS": "0",
+    "DEFINITE_CACHE_TTL_S": "0",
+    "LOG_LEVEL": "CRITICAL",
+})
+
+import httpcore  # noqa: E402
+
+import definite_mcp  # noqa: E402
+from definite_mcp.dns import DnsCache, CachingBackend  # noqa: E402
+from definite_mcp.mock_server import MockServer, MockConfig  # noqa: E402
+
+LOOKUPS = []
+
+
+def _count_lookups(cache: DnsCache) -> None:
+    lookup = cache._lookup
+
+    async def counted(host, port):
+        LOOKUPS.append((host, port))
+        return await lookup(host, port)
+    cache._lookup = counted
+
+
+async def _burst(n: int, tag: str) -> bool:
+    results = await asyncio.gather(*[
+        definite_mcp.run_sql_query(f"SELECT {i} AS {tag} /* mock: latency=200 */") for i in range(n)
+    ])
+    return all("error" not in r for r in results)
+
+
+async def test_concurrent_lookups_shared():
+    """Five calls opening five connections at once resolve the name once"""
+    print("1. Five concurrent calls on an empty pool...")
+    ok = await _burst(5, "a")
+    entry = definite_mcp._DNS.snapshot()["entries"].get(f"localhost:{MOCK_PORT}")
+    ok = ok and len(LOOKUPS) == 1 and entry is not None
+    print(f"{'✅' if ok else '❌'} {len(LOOKUPS)} lookup(s), cached {entry and entry['addresses']}")
+    return ok
+
+
+async def test_cached_answer_reused():
+    """Connections opened later are resolved from the cache"""
+    print("2. Eight concurrent calls, more than the pool keeps alive...")
+    hits = definite_mcp._DNS.hits
+    ok = await _burst(8, "b")
+    new_hits = definite_mcp._DNS.hits - hits
+    ok = ok and len(LOOKUPS) == 1 and new_hits >= 1
+    print(f"{'✅' if ok else '❌'} {len(LOOKUPS)} lookup(s) in total, {new_hits} cache hit(s)")
+    return ok
+
+
+async def test_stale_on_failure():
+    """A failed re-resolution serves the previous answer within stale_s, and fails past it"""
+    print("3. Re-resolution failing after the TTL...")
+
+    async def failing(host, port):
+        raise socket.gaierror("resolver down")
+
+    outcomes = []
+    for stale_s in (60.0, 0.0):
+        cache = DnsCache(ttl_s=0.1, stale_s=stale_s)
+        first = await cache.resolve("localhost", MOCK_PORT)
+        await asyncio.sleep(0.2)
+        cache._lookup = failing
+        try:
+            outcomes.append(await cache.resolve("localhost", MOCK_PORT) == first and cache.stale_served == 1)
+        except OSError:
+            outcomes.append("raised")
+    ok = outcomes == [True, "raised"]
+    print(f"{'✅' if ok else '❌'} within stale_s: {outcomes[0]}, past it: {outcomes[1]}")
+    return ok
+
+
+async def test_refused_answer_dropped():
+    """When every cached address refuses, the answer is re-resolved next time"""
+    print("4. Connecting to a port nobody listens on...")
+    cache = DnsCache(ttl_s=60)
+    backend = CachingBackend(cache)
+    port = _free_port()
+    try:
+        stream = await backend.connect_tcp("localhost", port, timeout=2)
+        await stream.aclose()
+        refused = False
+    except httpcore.ConnectError:
+        refused = True
+    ok = refused and not cache.snapshot()["entries"]
+    print(f"{'✅' if ok else '❌'} refused: {refused}, entries left: {cache.snapshot()['entries']}")
+    return ok
+
+
+async def main():
+    _count_lookups(definite_mcp._DNS)
+    async with MockServer(MockConfig(), port=MOCK_PORT):
+        results = [
+            await test_concurrent_lookups_shared(),
+            await test_cached_answer_reused(),
+            await test_stale_on_failure(),
+            await test_refused_answer_dropped(),
+        ]
+    print()
+    print("All passed" if all(results) else "Some checks failed")
+    return 0 if all(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -52,7 +52,7 @@ async def simulate_empty_error():
 
     original_make_api_request = definite_mcp.make_api_request
 
-    async def mock_empty_error_response(endpoint: str, payload: dict):
+    async def mock_empty_error_response(endpoint: str, payload: dict, **kwargs):
         # Simulate an HTTP error with empty message
         response = httpx.Response(
             status_code=400,
@@ -24,7 +24,7 @@ async def test_empty_sql_error():
 
     original_make_api_request = definite_mcp.make_api_request
 
-    async def mock_empty_error(endpoint: str, payload: dict):
+    async def mock_empty_error(endpoint: str, payload: dict, **kwargs):
         response = httpx.Response(
             status_code=400,
             json={"message": ""},  # Empty message
@@ -65,7 +65,7 @@ async def test_empty_cube_error():
 
     original_make_api_request = definite_mcp.make_api_request
 
-    async def mock_empty_error(endpoint: str, payload: dict):
+    async def mock_empty_error(endpoint: str, payload: dict, **kwargs):
         response = httpx.Response(
             status_code=500,
             json={"message": ""},  # Empty message
@@ -110,7 +110,7 @@ async def test_empty_after_extraction():
 
     original_make_api_request = definite_mcp.make_api_request
 
-    async def mock_empty_after_extraction(endpoint: str, payload: dict):
+    async def mock_empty_after_extraction(endpoint: str, payload: dict, **kwargs):
         response = httpx.Response(
             status_code=400,
             json={"message": "HTTP error 500: Something went wrong: "},  # Empty after colon
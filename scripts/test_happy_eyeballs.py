@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Offline check of happy-eyeballs connection racing against the bundled mock
+API: a blackholed first address costs one stagger delay instead of a
+connect timeout, the winning family is tried first next time, a refused
+address hands over at once, and all-blackholed answers still honour the
+connect timeout.
+
+Unreachable addresses are simulated by a network backend that stalls or
+refuses connects to documentation-range IPs and sends everything else to
+the mock.
+
+    python scripts/test_happy_eyeballs.py
+"""
+
+import os
+import sys
+import time
+import socket
+import asyncio
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+# The server reads its configuration at import time
+MOCK_PORT = _free_port()
+os.environ.update({
+    "DEFINITE_API_KEY": "test",
+    "DEFINITE_API_BASE_URL": f"http://localhost:{MOCK_PORT}",
+    "DEFINITE_HEALTH_INTERVAL_S": "0",
+    "DEFINITE_WARM_CONNECTIONS": "0",
+    "DEFINITE_CACHE_TTL_S": "0",
+    "DEFINITE_CONNECT_STAGGER_S": "0.1",
+    "LOG_LEVEL": "CRITICAL",
+})
+
+import httpcore  # noqa: E402
+from httpcore._backends.auto import AutoBackend  # noqa: E402
+
+import definite_mcp  # noqa: E402
+from definite_mcp.dns import DnsCache, CachingBackend  # noqa: E402
+from definite_mcp.mock_server import MockServer, MockConfig  # noqa: E402
+
+V6 = socket.AF_INET6
+V4 = socket.AF_INET
+BLACKHOLE = "2001:db8::1"
+REFUSED = "2001:db8::2"
+MOCK = "127.0.0.1"
+
+
+class _FakeNetwork(httpcore.AsyncNetworkBackend):
+    """Stalls connects to BLACKHOLE, refuses REFUSED, and connects anything else to the mock."""
+
+    def __init__(self) -> None:
+        self._real = AutoBackend()
+
+    async def connect_tcp(self, host, port, timeout=None, local_address=None, socket_options=None):
+        if host == BLACKHOLE:
+            await asyncio.sleep(timeout if timeout is not None else 3600)
+            raise httpcore.ConnectTimeout(f"{host} timed out")
+        if host == REFUSED:
+            raise httpcore.ConnectError(f"{host} refused")
+        return await self._real.connect_tcp(MOCK, port, timeout=timeout,
+                                            local_address=local_address, socket_options=socket_options)
+
+    async def sleep(self, seconds):
+        await self._real.sleep(seconds)
+
+
+def _answer(*addresses):
+    async def lookup(host, port):
+        return list(addresses)
+    return lookup
+
+
+def _backend(*addresses, stagger_s=0.1) -> CachingBackend:
+    cache = DnsCache(ttl_s=0)
+    cache._lookup = _answer(*addresses)
+    return CachingBackend(cache, backend=_FakeNetwork(), stagger_s=stagger_s)
+
+
+async def _connect(backend: CachingBackend, timeout: float = 5.0):
+    t0 = time.monotonic()
+    try:
+        stream = await backend.connect_tcp("api.example", MOCK_PORT, timeout=timeout)
+        await stream.aclose()
+        outcome = "connected"
+    except httpcore.ConnectTimeout:
+        outcome = "timeout"
+    return outcome, time.monotonic() - t0
+
+
+async def test_blackhole_costs_one_stagger():
+    """A stalled IPv6 address is overtaken by IPv4 after the stagger, and IPv4 goes first next time"""
+    print("1. IPv6 blackholed, IPv4 reachable, 0.1s stagger...")
+    backend = _backend((V6, BLACKHOLE), (V4, MOCK))
+    first, first_s = await _connect(backend)
+    second, second_s = await _connect(backend)
+    snap = backend.snapshot()
+    ok = first == second == "connected" and 0.1 <= first_s < 0.5 and second_s < 0.1 \
+        and snap["fallbacks"] == 1 and snap["preferred_family"] == {"api.example": "ipv4"}
+    print(f"{'✅' if ok else '❌'} first {first_s * 1000:.0f}ms, then {second_s * 1000:.0f}ms, {snap}")
+    return ok
+
+
+async def test_refused_hands_over_at_once():
+    """A refused address doesn't wait out the stagger before the next one starts"""
+    print("2. IPv6 refused, IPv4 reachable, 1s stagger...")
+    outcome, elapsed = await _connect(_backend((V6, REFUSED), (V4, MOCK), stagger_s=1.0))
+    ok = outcome == "connected" and elapsed < 0.5
+    print(f"{'✅' if ok else '❌'} {outcome} in {elapsed * 1000:.0f}ms")
+    return ok
+
+
+async def test_all_blackholed_times_out():
+    """With nothing reachable the race gives up at the connect timeout"""
+    print("3. Every address blackholed, 0.5s connect timeout...")
+    backend = _backend((V6, BLACKHOLE), (V4, BLACKHOLE))
+    outcome, elapsed = await _connect(backend, timeout=0.5)
+    ok = outcome == "timeout" and 0.45 <= elapsed < 1.0
+    print(f"{'✅' if ok else '❌'} {outcome} after {elapsed:.2f}s")
+    return ok
+
+
+async def test_server_races():
+    """The server's connection pool races addresses too"""
+    print("4. A query whose host resolves to a blackholed IPv6 and the mock...")
+    definite_mcp._DNS._lookup = _answer((V6, BLACKHOLE), (V4, MOCK))
+    definite_mcp._DNS_BACKEND._backend = _FakeNetwork()
+    races = definite_mcp._DNS_BACKEND.races
+    t0 = time.monotonic()
+    result = await definite_mcp.run_sql_query("SELECT 1")
+    elapsed = time.monotonic() - t0
+    ok = "error" not in result and definite_mcp._DNS_BACKEND.races == races + 1 and elapsed < 1.0
+    print(f"{'✅' if ok else '❌'} {result.get('error', 'ok')} in {elapsed * 1000:.0f}ms")
+    return ok
+
+
+async def main():
+    async with MockServer(MockConfig(), port=MOCK_PORT):
+        results = [
+            await test_blackhole_costs_one_stagger(),
+            await test_refused_hands_over_at_once(),
+            await test_all_blackholed_times_out(),
+            await test_server_races(),
+        ]
+    print()
+    print("All passed" if all(results) else "Some checks failed")
+    return 0 if all(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Offline check of the background health monitor against the bundled mock
+API: calls never wait on a probe, probes keep running on their interval,
+and an unreachable endpoint is reported as down.
+
+    python scripts/test_health.py
+"""
+
+import os
+import sys
+import time
+import socket
+import asyncio
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+# The server reads its configuration at import time
+MOCK_PORT = _free_port()
+BASE_URL = f"http://127.0.0.1:{MOCK_PORT}"
+os.environ.update({
+    "DEFINITE_API_KEY": "test",
+    "DEFINITE_API_BASE_URL": BASE_URL,
+    "DEFINITE_HEALTH_INTERVAL_S": "0.2",
+    "DEFINITE_WARM_CONNECTIONS": "0",
+    "DEFINITE_CACHE_TTL_S": "0",
+    "LOG_LEVEL": "CRITICAL",
+})
+
+import httpx  # noqa: E402
+
+import definite_mcp  # noqa: E402
+from definite_mcp.health import HealthMonitor  # noqa: E402
+from definite_mcp.mock_server import MockServer, MockConfig  # noqa: E402
+
+
+async def test_call_does_not_wait_on_probe():
+    """The first call starts the monitor but doesn't wait for its 300ms probe"""
+    print("1. First query while the health probe takes 300ms...")
+    t0 = time.monotonic()
+    result = await definite_mcp.run_sql_query("SELECT 1")
+    elapsed = time.monotonic() - t0
+    monitor = definite_mcp._HEALTH[BASE_URL]
+    ok = "error" not in result and elapsed < 0.25 and monitor.healthy is None
+    print(f"{'✅' if ok else '❌'} {elapsed * 1000:.0f}ms, healthy before the first probe: {monitor.healthy}")
+    return ok
+
+
+async def test_probes_on_interval(server):
+    """Probes keep running in the background and mark the API reachable"""
+    print("2. Health state a second later...")
+    await asyncio.sleep(1.0)
+    snapshot = definite_mcp._HEALTH[BASE_URL].snapshot()
+    probes = server.stats.get("health", 0)
+    ok = snapshot["reachable"] is True and probes >= 2 and snapshot["samples"] >= 1
+    print(f"{'✅' if ok else '❌'} {probes} probe(s), reachable: {snapshot['reachable']}")
+    return ok
+
+
+async def test_unreachable_endpoint():
+    """Connection errors count as down; stop() ends the loop"""
+    print("3. Monitor pointed at a closed port...")
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{_free_port()}") as client:
+        monitor = HealthMonitor(client, interval_s=0.1, timeout_s=1.0)
+        monitor.ensure_started()
+        await asyncio.sleep(0.35)
+        await monitor.stop()
+        snapshot = monitor.snapshot()
+    ok = monitor.healthy is False and snapshot["consecutive_failures"] >= 2 and snapshot["last_error"]
+    print(f"{'✅' if ok else '❌'} healthy: {monitor.healthy}, failures: {snapshot['consecutive_failures']}, "
+          f"last error: {snapshot['last_error']}")
+    return ok
+
+
+async def main():
+    async with MockServer(MockConfig(health_latency="300"), port=MOCK_PORT) as server:
+        results = [
+            await test_call_does_not_wait_on_probe(),
+            await test_probes_on_interval(server),
+            await test_unreachable_endpoint(),
+        ]
+        for monitor in definite_mcp._HEALTH.values():
+            await monitor.stop()
+    print()
+    print("All passed" if all(results) else "Some checks failed")
+    return 0 if all(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Offline check of hedged requests against the bundled mock API: no hedge
+until there are enough latency samples, a straggler is overtaken by its
+hedge, and a hedge answering with a retryable status doesn't win.
+
+    python scripts/test_hedging.py
+"""
+
+import os
+import sys
+import time
+import socket
+import asyncio
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+# The server reads its configuration at import time
+MOCK_PORT = _free_port()
+os.environ.update({
+    "DEFINITE_API_KEY": "test",
+    "DEFINITE_API_BASE_URL": f"http://127.0.0.1:{MOCK_PORT}",
+    "DEFINITE_HEALTH_INTERVAL_S": "0",
+    "DEFINITE_WARM_CONNECTIONS": "0",
+    "DEFINITE_CACHE_TTL_S": "0",
+    "DEFINITE_HEDGE": "1",
+    "DEFINITE_HEDGE_MIN_SAMPLES": "5",
+    "DEFINITE_HEDGE_MIN_DELAY_S": "0.1",
+    # Without a shared key the hedge is a second run, not a reattach to the first
+    "DEFINITE_IDEMPOTENCY_KEYS": "0",
+    "LOG_LEVEL": "CRITICAL",
+})
+
+import definite_mcp  # noqa: E402
+from definite_mcp.mock_server import MockServer, MockConfig  # noqa: E402
+
+
+def _hedges(outcome: str) -> float:
+    series = definite_mcp._METRICS.snapshot()["counters"].get("hedges_total", [])
+    return sum(s["value"] for s in series if s["labels"].get("outcome") == outcome)
+
+
+async def _timed(server, sql: str):
+    before = server.stats.get("query", 0)
+    launched, won = _hedges("launched"), _hedges("won")
+    t0 = time.monotonic()
+    result = await definite_mcp.run_sql_query(sql)
+    return (result, time.monotonic() - t0, server.stats.get("query", 0) - before,
+            _hedges("launched") - launched, _hedges("won") - won)
+
+
+async def test_needs_samples(server):
+    """Without HEDGE_MIN_SAMPLES latency samples a slow call is left alone"""
+    print("1. Straggler before any latency samples...")
+    result, elapsed, sent, launched, _ = await _timed(server, "SELECT 1 /* mock: latency=500,0 */")
+    ok = "error" not in result and elapsed >= 0.5 and sent == 1 and launched == 0
+    print(f"{'✅' if ok else '❌'} {elapsed * 1000:.0f}ms, {sent} upstream query(ies), {launched:g} hedge(s)")
+    return ok
+
+
+async def test_hedge_overtakes(server):
+    """Past the observed tail a second attempt is raced and its answer used"""
+    print("2. Straggler after five fast queries...")
+    definite_mcp._TTFB.clear()   # forget the straggler above, or it sets the p95
+    for i in range(5):
+        await definite_mcp.run_sql_query(f"SELECT {10 + i}")
+    result, elapsed, sent, launched, won = await _timed(server, "SELECT 2 /* mock: latency=1000,10 */")
+    ok = "error" not in result and elapsed < 0.5 and sent == 2 and launched == 1 and won == 1
+    print(f"{'✅' if ok else '❌'} {elapsed * 1000:.0f}ms, {sent} upstream queries, "
+          f"hedges launched {launched:g}, won {won:g}")
+    return ok
+
+
+async def test_retryable_hedge_loses(server):
+    """A hedge that gets a 503 doesn't beat a primary that is going to succeed"""
+    print("3. Slow primary that succeeds, fast hedge that gets a 503...")
+    result, elapsed, sent, launched, won = await _timed(
+        server, "SELECT 3 /* mock: latency=400,0 status=200,503 */",
+    )
+    ok = "error" not in result and elapsed >= 0.4 and launched == 1 and won == 0
+    print(f"{'✅' if ok else '❌'} {elapsed * 1000:.0f}ms, hedges launched {launched:g}, won {won:g}")
+    return ok
+
+
+async def main():
+    async with MockServer(MockConfig(), port=MOCK_PORT) as server:
+        results = [
+            await test_needs_samples(server),
+            await test_hedge_overtakes(server),
+            await test_retryable_hedge_loses(server),
+        ]
+    print()
+    print("All passed" if all(results) else "Some checks failed")
+    return 0 if all(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Offline check of per-host HTTP/2 fallback against the bundled mock API,
+which only speaks HTTP/1.1: a host that doesn't negotiate h2 falls back,
+HTTP/2 is retried after DEFINITE_HTTP2_RETRY_S, slow queries don't count
+against it, and repeated protocol errors fall back mid-call so the call
+still succeeds over HTTP/1.1.
+
+Needs the optional `h2` package (`pip install httpx[http2]`).
+
+    python scripts/test_http2.py
+"""
+
+import os
+import sys
+import socket
+import asyncio
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+# The server reads its configuration at import time
+MOCK_PORT = _free_port()
+BASE_URL = f"http://127.0.0.1:{MOCK_PORT}"
+os.environ.update({
+    "DEFINITE_API_KEY": "test",
+    "DEFINITE_API_BASE_URL": BASE_URL,
+    "DEFINITE_HEALTH_INTERVAL_S": "0",
+    "DEFINITE_WARM_CONNECTIONS": "0",
+    "DEFINITE_CACHE_TTL_S": "0",
+    "DEFINITE_HTTP2": "auto",
+    "DEFINITE_HTTP2_MAX_FAILURES": "2",
+    "DEFINITE_HTTP2_RETRY_S": "0.5",
+    "DEFINITE_RETRIES": "3",
+    "DEFINITE_BACKOFF_BASE_S": "0.01",
+    "DEFINITE_ATTEMPT_DEADLINE_S": "0.3",
+    "DEFINITE_BREAKER_FAILURES": "0",
+    # Every attempt of a slow query is a fresh (slow) run, not a reattach
+    "DEFINITE_IDEMPOTENCY_KEYS": "0",
+    "LOG_LEVEL": "CRITICAL",
+})
+
+import httpx  # noqa: E402
+
+import definite_mcp  # noqa: E402
+from definite_mcp.protocol import http2_available  # noqa: E402
+from definite_mcp.mock_server import MockServer, MockConfig  # noqa: E402
+
+
+def _host() -> dict:
+    return definite_mcp._PROTOCOLS.snapshot()[BASE_URL]
+
+
+async def test_not_negotiated():
+    """A host answering over HTTP/1.1 is moved to the HTTP/1.1 pool"""
+    print("1. First call to a host that only speaks HTTP/1.1...")
+    first = definite_mcp._client_for(BASE_URL) is definite_mcp._HTTP2
+    result = await definite_mcp.run_sql_query("SELECT 1")
+    host = _host()
+    ok = first and "error" not in result and host["protocol"] == "http1.1" \
+        and host["fallback_reason"] == "not_negotiated" \
+        and definite_mcp._client_for(BASE_URL) is definite_mcp._HTTP
+    print(f"{'✅' if ok else '❌'} started on HTTP/2: {first}, now {host}")
+    return ok
+
+
+async def test_slow_queries_dont_count():
+    """After the retry interval HTTP/2 is tried again, and attempt timeouts aren't held against it"""
+    print("2. A query slower than the attempt deadline, after the retry interval...")
+    await asyncio.sleep(0.6)
+    retried = definite_mcp._client_for(BASE_URL) is definite_mcp._HTTP2
+    result = await definite_mcp.run_sql_query("SELECT 2 /* mock: latency=1000 */")
+    host = _host()
+    ok = retried and "error" in result and host["protocol"] == "http2" and host["consecutive_failures"] == 0
+    print(f"{'✅' if ok else '❌'} back on HTTP/2: {retried}, after three timeouts {host}")
+    return ok
+
+
+async def test_protocol_errors_fall_back():
+    """Two broken HTTP/2 attempts fall back, and the call's next attempt succeeds over HTTP/1.1"""
+    print("3. HTTP/2 streams reset on every request...")
+
+    def reset(request):
+        raise httpx.RemoteProtocolError("stream reset", request=request)
+    transport = definite_mcp._HTTP2._transport
+    definite_mcp._HTTP2._transport = httpx.MockTransport(reset)
+    try:
+        result = await definite_mcp.run_sql_query("SELECT 3")
+    finally:
+        definite_mcp._HTTP2._transport = transport
+    host = _host()
+    ok = "error" not in result and host["protocol"] == "http1.1" \
+        and host["fallback_reason"] == "protocol_error" and host["fallbacks"] == 2
+    print(f"{'✅' if ok else '❌'} {result.get('error', 'ok')}, {host}")
+    return ok
+
+
+async def main():
+    if not http2_available():
+        print("h2 is not installed; skipping")
+        return 0
+    async with MockServer(MockConfig(), port=MOCK_PORT):
+        results = [
+            await test_not_negotiated(),
+            await test_slow_queries_dont_count(),
+            await test_protocol_errors_fall_back(),
+        ]
+    print()
+    print("All passed" if all(results) else "Some checks failed")
+    return 0 if all(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Offline check of idempotency keys against the bundled mock API: a retry
+after an attempt timeout reattaches to the query still running instead of
+starting it again, a retryable error is run again rather than replayed,
+separate calls never share a key, and without keys the same slow query
+never finishes.
+
+    python scripts/test_idempotency.py
+"""
+
+import os
+import sys
+import time
+import socket
+import asyncio
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+# The server reads its configuration at import time
+MOCK_PORT = _free_port()
+os.environ.update({
+    "DEFINITE_API_KEY": "test",
+    "DEFINITE_API_BASE_URL": f"http://127.0.0.1:{MOCK_PORT}",
+    "DEFINITE_HEALTH_INTERVAL_S": "0",
+    "DEFINITE_WARM_CONNECTIONS": "0",
+    "DEFINITE_CACHE_TTL_S": "0",
+    "DEFINITE_RETRIES": "4",
+    "DEFINITE_ATTEMPT_DEADLINE_S": "0.6",
+    "DEFINITE_BACKOFF_BASE_S": "0.05",
+    "DEFINITE_BREAKER_FAILURES": "0",
+    "LOG_LEVEL": "CRITICAL",
+})
+
+import definite_mcp  # noqa: E402
+from definite_mcp.mock_server import MockServer, MockConfig  # noqa: E402
+
+
+def _replays() -> float:
+    series = definite_mcp._METRICS.snapshot()["counters"].get("idempotent_replays_total", [])
+    return sum(s["value"] for s in series)
+
+
+def _delta(server, before: dict, key: str) -> int:
+    return server.stats.get(key, 0) - before.get(key, 0)
+
+
+async def test_timeout_retry_reattaches(server):
+    """A 1.5s query outliving 0.6s attempts completes once, on a reattached retry"""
+    print("1. 1.5s query with a 0.6s attempt deadline...")
+    before, replays = dict(server.stats), _replays()
+    t0 = time.monotonic()
+    result = await definite_mcp.run_sql_query("SELECT 1 /* mock: latency=1500 */")
+    elapsed = time.monotonic() - t0
+    ok = "error" not in result and elapsed < 2.0 and _delta(server, before, "ok") == 1 \
+        and _delta(server, before, "reattached") >= 1 and _replays() > replays
+    print(f"{'✅' if ok else '❌'} {result.get('error', 'ok')} in {elapsed:.2f}s, "
+          f"{_delta(server, before, 'ok')} execution(s), {_delta(server, before, 'reattached')} reattach(es)")
+    return ok
+
+
+async def test_error_not_replayed(server):
+    """A 503 isn't replayed to the retry; the query runs again and succeeds"""
+    print("2. Query answering 503 once, then 200...")
+    before = dict(server.stats)
+    result = await definite_mcp.run_sql_query("SELECT 2 /* mock: status=503,200 */")
+    ok = "error" not in result and _delta(server, before, "status_503") == 1 and _delta(server, before, "ok") == 1
+    print(f"{'✅' if ok else '❌'} {result.get('error', 'ok')}, "
+          f"{_delta(server, before, 'status_503')} 503(s), {_delta(server, before, 'ok')} success(es)")
+    return ok
+
+
+async def test_calls_use_own_keys(server):
+    """The same query called twice is two executions, not a replay of the first"""
+    print("3. The same query as two separate calls...")
+    before = dict(server.stats)
+    for _ in range(2):
+        await definite_mcp.run_sql_query("SELECT 3")
+    ok = _delta(server, before, "ok") == 2 and _delta(server, before, "replayed") == 0 \
+        and _delta(server, before, "idempotency_conflicts") == 0
+    print(f"{'✅' if ok else '❌'} {_delta(server, before, 'ok')} executions, "
+          f"{_delta(server, before, 'replayed')} replays")
+    return ok
+
+
+async def test_without_keys(server):
+    """Without keys each retry starts the query over and never outlives the attempt deadline"""
+    print("4. The 1.5s query again with idempotency keys off...")
+    before = dict(server.stats)
+    definite_mcp.IDEMPOTENCY_KEYS = False
+    try:
+        result = await definite_mcp.run_sql_query("SELECT 4 /* mock: latency=1500 */")
+    finally:
+        definite_mcp.IDEMPOTENCY_KEYS = True
+    ok = "error" in result and _delta(server, before, "query") == 4
+    print(f"{'✅' if ok else '❌'} {result.get('http_status') or result.get('error', 'ok')[:60]}, "
+          f"{_delta(server, before, 'query')} runs started")
+    return ok
+
+
+async def main():
+    async with MockServer(MockConfig(), port=MOCK_PORT) as server:
+        results = [
+            await test_timeout_retry_reattaches(server),
+            await test_error_not_replayed(server),
+            await test_calls_use_own_keys(server),
+            await test_without_keys(server),
+        ]
+    print()
+    print("All passed" if all(results) else "Some checks failed")
+    return 0 if all(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
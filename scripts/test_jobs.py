@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Offline check of background query jobs against the bundled mock API:
+submit / status / fetch round trip, and cancelling a running or still
+queued job.
+
+    python scripts/test_jobs.py
+"""
+
+import os
+import sys
+import socket
+import asyncio
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+# The server reads its configuration at import time
+MOCK_PORT = _free_port()
+os.environ.update({
+    "DEFINITE_API_KEY": "test",
+    "DEFINITE_API_BASE_URL": f"http://127.0.0.1:{MOCK_PORT}",
+    "DEFINITE_HEALTH_INTERVAL_S": "0",
+    "DEFINITE_WARM_CONNECTIONS": "0",
+    "DEFINITE_CACHE_TTL_S": "0",
+    "DEFINITE_JOB_MAX_CONCURRENCY": "1",
+    "LOG_LEVEL": "CRITICAL",
+})
+
+import definite_mcp  # noqa: E402
+from definite_mcp.mock_server import MockServer, MockConfig  # noqa: E402
+
+
+async def _wait_finished(job_id: str, timeout_s: float = 5.0) -> dict:
+    for _ in range(int(timeout_s / 0.05)):
+        status = await definite_mcp.get_query_status(job_id)
+        if status.get("result_ready") or "error" in status:
+            return status
+        await asyncio.sleep(0.05)
+    return status
+
+
+async def test_round_trip():
+    """A submitted query can be polled and its result fetched once"""
+    print("1. Submit, poll and fetch a query...")
+    job = await definite_mcp.submit_sql_query("SELECT 1 /* mock: latency=200 */")
+    running = await definite_mcp.get_query_status(job["job_id"])
+    finished = await _wait_finished(job["job_id"])
+    result = await definite_mcp.fetch_query_result(job["job_id"])
+    again = await definite_mcp.fetch_query_result(job["job_id"])
+    ok = not running["result_ready"] and finished["status"] == "succeeded" \
+        and "error" not in result and "error" in again
+    print(f"{'✅' if ok else '❌'} {running['status']} -> {finished['status']}, fetched twice: {'error' in again}")
+    return ok
+
+
+async def test_cancel_running(server):
+    """Cancelling a running job marks it cancelled and cancels the query upstream"""
+    print("2. Cancel a running job...")
+    cancels = server.stats.get("cancel_requests", 0)
+    job = await definite_mcp.submit_sql_query("SELECT 2 /* mock: latency=2000 */")
+    await asyncio.sleep(0.2)
+    cancelled = await definite_mcp.cancel_query_job(job["job_id"])
+    await asyncio.sleep(0.2)
+    sent = server.stats.get("cancel_requests", 0) - cancels
+    result = await definite_mcp.fetch_query_result(job["job_id"])
+    ok = cancelled["status"] == "cancelled" and sent == 1 and result.get("status") == "failed"
+    print(f"{'✅' if ok else '❌'} status {cancelled['status']}, {sent} cancel request(s)")
+    return ok
+
+
+async def test_cancel_queued(server):
+    """A job still waiting for a slot is cancelled without reaching the API"""
+    print("3. Cancel a job queued behind another...")
+    queries = server.stats.get("query", 0)
+    first = await definite_mcp.submit_sql_query("SELECT 3 /* mock: latency=300 */")
+    second = await definite_mcp.submit_sql_query("SELECT 4")
+    cancelled = await definite_mcp.cancel_query_job(second["job_id"])
+    await _wait_finished(first["job_id"])
+    sent = server.stats.get("query", 0) - queries
+    unknown = await definite_mcp.cancel_query_job("no-such-job")
+    ok = cancelled["status"] == "cancelled" and sent == 1 and "error" in unknown
+    print(f"{'✅' if ok else '❌'} status {cancelled['status']}, {sent} upstream query(ies)")
+    return ok
+
+
+async def main():
+    async with MockServer(MockConfig(), port=MOCK_PORT) as server:
+        results = [
+            await test_round_trip(),
+            await test_cancel_running(server),
+            await test_cancel_queued(server),
+        ]
+    print()
+    print("All passed" if all(results) else "Some checks failed")
+    return 0 if all(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Offline check of priority lanes against the bundled mock API: a query that
+ran slowly last time is queued in the slow lane, fast calls keep flowing
+while slow ones fill their share of the limit, freed slots go fast:slow by
+weight, and an unknown lane is rejected.
+
+    python scripts/test_lanes.py
+"""
+
+import os
+import sys
+import time
+import socket
+import asyncio
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+# The server reads its configuration at import time
+MOCK_PORT = _free_port()
+os.environ.update({
+    "DEFINITE_API_KEY": "test",
+    "DEFINITE_API_BASE_URL": f"http://127.0.0.1:{MOCK_PORT}",
+    "DEFINITE_HEALTH_INTERVAL_S": "0",
+    "DEFINITE_WARM_CONNECTIONS": "0",
+    "DEFINITE_CACHE_TTL_S": "0",
+    # Four slots, at most two of them slow; 300ms or more counts as slow
+    "DEFINITE_CONCURRENCY_INITIAL": "4",
+    "DEFINITE_CONCURRENCY_MIN": "4",
+    "DEFINITE_CONCURRENCY_MAX": "4",
+    "DEFINITE_SLOW_LANE_SHARE": "0.5",
+    "DEFINITE_SLOW_QUERY_MS": "300",
+    "LOG_LEVEL": "CRITICAL",
+})
+
+import definite_mcp  # noqa: E402
+from definite_mcp.limiter import AdaptiveLimiter  # noqa: E402
+from definite_mcp.mock_server import MockServer, MockConfig  # noqa: E402
+
+
+def _lanes() -> dict:
+    return definite_mcp._LIMITER.snapshot()["lanes"]
+
+
+async def test_lane_inferred():
+    """A query that took longer than SLOW_QUERY_MS runs in the slow lane next time"""
+    print("1. The same 400ms query twice...")
+    sql = "SELECT 1 /* mock: latency=400 */"
+    first = asyncio.create_task(definite_mcp.run_sql_query(sql))
+    await asyncio.sleep(0.1)
+    first_lanes = {name: lane["in_flight"] for name, lane in _lanes().items()}
+    await first
+    second = asyncio.create_task(definite_mcp.run_sql_query(sql))
+    await asyncio.sleep(0.1)
+    second_lanes = {name: lane["in_flight"] for name, lane in _lanes().items()}
+    await second
+    ok = first_lanes == {"fast": 1, "slow": 0} and second_lanes == {"fast": 0, "slow": 1}
+    print(f"{'✅' if ok else '❌'} in flight first {first_lanes}, then {second_lanes}")
+    return ok
+
+
+async def test_fast_flows_past_slow():
+    """With the slow lane at its share and queueing, a fast call still starts at once"""
+    print("2. Six 400ms slow-lane queries, then a fast one...")
+    slow = [asyncio.create_task(definite_mcp.run_sql_query(f"SELECT {10 + i} /* mock: latency=400 */", lane="slow"))
+            for i in range(6)]
+    await asyncio.sleep(0.05)
+    lanes = _lanes()
+    t0 = time.monotonic()
+    result = await definite_mcp.run_sql_query("SELECT 2", lane="fast")
+    elapsed = time.monotonic() - t0
+    await asyncio.gather(*slow)
+    ok = "error" not in result and elapsed < 0.2 and lanes["slow"]["in_flight"] == 2 \
+        and lanes["slow"]["queue_depth"] == 4
+    print(f"{'✅' if ok else '❌'} fast call took {elapsed * 1000:.0f}ms with slow lane "
+          f"{lanes['slow']['in_flight']} running, {lanes['slow']['queue_depth']} queued")
+    return ok
+
+
+async def test_weighted_admission():
+    """Freed slots go to the lanes 4:1 while both have waiters"""
+    print("3. 10 fast and 10 slow waiters behind a single slot...")
+    limiter = AdaptiveLimiter(initial=1, min_limit=1, max_limit=1, fast_weight=4, slow_share=1.0)
+    order = []
+
+    async def waiter(lane: str) -> None:
+        await limiter.acquire(lane)
+        order.append(lane)
+        await asyncio.sleep(0)
+        limiter.release(lane=lane)
+    await limiter.acquire()
+    tasks = [asyncio.create_task(waiter(lane)) for lane in ["slow"] * 10 + ["fast"] * 10]
+    await asyncio.sleep(0.01)
+    limiter.release()
+    await asyncio.gather(*tasks)
+    first = order[:10]
+    ok = first.count("fast") == 8 and first.count("slow") == 2
+    print(f"{'✅' if ok else '❌'} first ten admitted: {''.join(lane[0] for lane in first)}")
+    return ok
+
+
+async def test_unknown_lane():
+    """A lane that doesn't exist is an error, not a silent default"""
+    print("4. lane='urgent'...")
+    result = await definite_mcp.run_sql_query("SELECT 3", lane="urgent")
+    ok = "Unknown lane" in result.get("error", "")
+    print(f"{'✅' if ok else '❌'} {result.get('error')}")
+    return ok
+
+
+async def main():
+    async with MockServer(MockConfig(), port=MOCK_PORT):
+        results = [
+            await test_lane_inferred(),
+            await test_fast_flows_past_slow(),
+            await test_weighted_admission(),
+            await test_unknown_lane(),
+        ]
+    print()
+    print("All passed" if all(results) else "Some checks failed")
+    return 0 if all(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
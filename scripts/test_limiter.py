@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Offline check of the adaptive concurrency limit and priority lanes against
+the bundled mock API: slow-lane traffic doesn't read as a latency spike,
+a real slowdown does, and a full lane queue sheds new calls.
+
+    python scripts/test_limiter.py
+"""
+
+import os
+import sys
+import socket
+import asyncio
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+# The server reads its configuration at import time
+MOCK_PORT = _free_port()
+os.environ.update({
+    "DEFINITE_API_KEY": "test",
+    "DEFINITE_API_BASE_URL": f"http://127.0.0.1:{MOCK_PORT}",
+    "DEFINITE_HEALTH_INTERVAL_S": "0",
+    "DEFINITE_WARM_CONNECTIONS": "0",
+    "DEFINITE_CACHE_TTL_S": "0",
+    "DEFINITE_CONCURRENCY_INITIAL": "4",
+    "DEFINITE_CONCURRENCY_MIN": "2",
+    "DEFINITE_CONCURRENCY_MAX": "4",
+    "DEFINITE_QUEUE_MAX_DEPTH": "2",
+    "LOG_LEVEL": "CRITICAL",
+})
+
+import definite_mcp  # noqa: E402
+from definite_mcp.limiter import AdaptiveLimiter  # noqa: E402
+from definite_mcp.mock_server import MockServer, MockConfig  # noqa: E402
+
+
+def _reset() -> None:
+    definite_mcp._LIMITER = AdaptiveLimiter(initial=4, min_limit=2, max_limit=4, max_queue=2)
+
+
+async def _fast(n: int, latency_ms: int = 5) -> None:
+    for i in range(n):
+        await definite_mcp.run_sql_query(f"SELECT {i} /* mock: latency={latency_ms} */", lane="fast")
+
+
+async def test_slow_lane_mix():
+    """Slow queries between fast ones leave the limit alone"""
+    print("1. Fast queries interleaved with slow-lane queries...")
+    _reset()
+    await _fast(20)
+    for i in range(4):
+        await definite_mcp.run_sql_query(f"SELECT {100 + i} /* mock: latency=300 */", lane="slow")
+        await _fast(3)
+    snap = definite_mcp._LIMITER.snapshot()
+    ok = snap["decreases"] == 0
+    print(f"{'✅' if ok else '❌'} decreases: {snap['decreases']}, lanes: "
+          f"{ {name: lane['latency_ewma_ms'] for name, lane in snap['lanes'].items()} }")
+    return ok
+
+
+async def test_fast_lane_slowdown():
+    """Fast-lane latency jumping well past its own baseline backs the limit off"""
+    print("2. Fast-lane latency rising from 5ms to 200ms...")
+    _reset()
+    await _fast(20)
+    await _fast(3, latency_ms=200)
+    snap = definite_mcp._LIMITER.snapshot()
+    ok = snap["decreases"] >= 1 and snap["limit"] < 4
+    print(f"{'✅' if ok else '❌'} decreases: {snap['decreases']}, limit: {snap['limit']}")
+    return ok
+
+
+async def test_full_lane_sheds():
+    """Past max_queue waiters the slow lane rejects calls instead of queueing them"""
+    print("3. Six concurrent slow-lane queries with room for one running and two queued...")
+    _reset()
+    definite_mcp._LIMITER.slow_share = 0.25
+    results = await asyncio.gather(*(
+        definite_mcp.run_sql_query(f"SELECT {200 + i} /* mock: latency=200 */", lane="slow")
+        for i in range(6)
+    ))
+    shed = sum(1 for r in results if r.get("overloaded"))
+    ok = shed == 3 and definite_mcp._LIMITER.snapshot()["lanes"]["slow"]["shed"] == 3
+    print(f"{'✅' if ok else '❌'} {shed} of 6 shed")
+    return ok
+
+
+async def main():
+    async with MockServer(MockConfig(), port=MOCK_PORT):
+        results = [
+            await test_slow_lane_mix(),
+            await test_fast_lane_slowdown(),
+            await test_full_lane_sheds(),
+        ]
+    print()
+    print("All passed" if all(results) else "Some checks failed")
+    return 0 if all(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Offline check of metrics exposition against the bundled mock API: the
+definite://metrics resource and the Prometheus textfile reflect real
+calls, and shutdown still closes the HTTP clients when the final textfile
+write fails.
+
+    python scripts/test_metrics.py
+"""
+
+import os
+import sys
+import json
+import shutil
+import socket
+import asyncio
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+# The server reads its configuration at import time
+MOCK_PORT = _free_port()
+METRICS_DIR = tempfile.mkdtemp(prefix="definite-mcp-metrics-")
+TEXTFILE = os.path.join(METRICS_DIR, "definite_mcp.prom")
+os.environ.update({
+    "DEFINITE_API_KEY": "test",
+    "DEFINITE_API_BASE_URL": f"http://127.0.0.1:{MOCK_PORT}",
+    "DEFINITE_HEALTH_INTERVAL_S": "0",
+    "DEFINITE_WARM_CONNECTIONS": "0",
+    "DEFINITE_CACHE_TTL_S": "0",
+    "DEFINITE_METRICS_TEXTFILE": TEXTFILE,
+    "DEFINITE_METRICS_INTERVAL_S": "0.1",
+    "LOG_LEVEL": "CRITICAL",
+})
+
+import definite_mcp  # noqa: E402
+from definite_mcp.mock_server import MockServer, MockConfig  # noqa: E402
+
+
+async def test_resource_counts_requests():
+    """The metrics resource counts successful and failed requests"""
+    print("1. Metrics resource after one good and one failing query...")
+    await definite_mcp.run_sql_query("SELECT 1")
+    await definite_mcp.run_sql_query("SELECT 2 /* mock: status=500 */")
+    snapshot = json.loads(definite_mcp.metrics_resource())
+    results = {s["labels"]["result"]: s["value"] for s in snapshot["counters"].get("requests_total", [])}
+    ok = results.get("ok", 0) >= 1 and results.get("http_500", 0) >= 1
+    print(f"{'✅' if ok else '❌'} requests_total by result: {results}")
+    return ok
+
+
+async def test_textfile_written():
+    """The textfile exporter leaves Prometheus text with the request counter"""
+    print("2. Prometheus textfile...")
+    await asyncio.sleep(0.3)
+    try:
+        with open(TEXTFILE, encoding="utf-8") as f:
+            text = f.read()
+    except OSError as e:
+        text = ""
+        print(f"   {e}")
+    ok = "definite_mcp_requests_total" in text and "# TYPE" in text
+    print(f"{'✅' if ok else '❌'} {len(text.splitlines())} line(s) in {TEXTFILE}")
+    return ok
+
+
+async def test_shutdown_survives_failed_write():
+    """A final textfile write that fails doesn't keep the clients open"""
+    print("3. Shutdown with the textfile directory gone...")
+    shutil.rmtree(METRICS_DIR)
+    try:
+        async with definite_mcp._lifespan(definite_mcp.mcp):
+            pass
+        error = None
+    except Exception as e:
+        error = e
+    ok = error is None and definite_mcp._HTTP.is_closed and definite_mcp._HEDGE_HTTP.is_closed
+    print(f"{'✅' if ok else '❌'} error: {error!r}, clients closed: {definite_mcp._HTTP.is_closed}")
+    return ok
+
+
+async def main():
+    async with MockServer(MockConfig(), port=MOCK_PORT):
+        definite_mcp._METRICS_EXPORTER.ensure_started()
+        results = [
+            await test_resource_counts_requests(),
+            await test_textfile_written(),
+            await test_shutdown_survives_failed_write(),
+        ]
+    print()
+    print("All passed" if all(results) else "Some checks failed")
+    return 0 if all(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Offline check of the bundled mock Definite API itself: per-query
+overrides, per-run override lists, idempotent replays, the cancel and
+status endpoints, dropped connections and the stats endpoints.
+
+    python scripts/test_mock_server.py
+"""
+
+import os
+import sys
+import time
+import asyncio
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+# Importing the mock imports the server package, which configures logging
+os.environ.setdefault("LOG_LEVEL", "CRITICAL")
+
+import httpx  # noqa: E402
+
+from definite_mcp.mock_server import MockServer, MockConfig  # noqa: E402
+
+AUTH = {"Authorization": "Bearer test"}
+
+
+async def _query(client, sql: str, **headers: str) -> httpx.Response:
+    return await client.post("/v1/query", json={"sql": sql}, headers={**AUTH, **headers})
+
+
+async def test_overrides(client):
+    """Comments and the cube "mock" object override rows and status; no key is a 401"""
+    print("1. Per-query overrides...")
+    rows = (await _query(client, "SELECT 1 /* mock: rows=3 */")).json()["row_count"]
+    status = (await _query(client, "SELECT 1 /* mock: status=504 */")).status_code
+    cube = await client.post("/v1/query", json={"cube_query": {"mock": {"rows": 2}}}, headers=AUTH)
+    unauthorized = (await client.post("/v1/query", json={"sql": "SELECT 1"})).status_code
+    ok = rows == 3 and status == 504 and cube.json()["row_count"] == 2 and unauthorized == 401
+    print(f"{'✅' if ok else '❌'} rows {rows}, status {status}, cube rows {cube.json()['row_count']}, "
+          f"no key {unauthorized}")
+    return ok
+
+
+async def test_per_run_lists(client):
+    """A comma-separated override walks through successive runs, the last value repeating"""
+    print("2. status=503,200 and latency=300,0 over three runs...")
+    statuses = [(await _query(client, "SELECT 2 /* mock: status=503,200 */")).status_code for _ in range(3)]
+    timings = []
+    for _ in range(3):
+        t0 = time.monotonic()
+        await _query(client, "SELECT 3 /* mock: latency=300,0 */")
+        timings.append(time.monotonic() - t0)
+    ok = statuses == [503, 200, 200] and timings[0] >= 0.3 and max(timings[1:]) < 0.2
+    print(f"{'✅' if ok else '❌'} statuses {statuses}, timings {[round(t, 2) for t in timings]}")
+    return ok
+
+
+async def test_idempotency(server, client):
+    """Concurrent requests with one Idempotency-Key run once; a different body is refused"""
+    print("3. Two concurrent requests with the same Idempotency-Key, then a different body...")
+    before = server.stats.get("ok", 0)
+    first, second = await asyncio.gather(
+        _query(client, "SELECT 4 /* mock: latency=200 */", **{"Idempotency-Key": "k1"}),
+        _query(client, "SELECT 4 /* mock: latency=200 */", **{"Idempotency-Key": "k1"}),
+    )
+    executed = server.stats.get("ok", 0) - before
+    conflict = (await _query(client, "SELECT 5", **{"Idempotency-Key": "k1"})).status_code
+    replayed = [r.headers.get("Idempotent-Replayed") for r in (first, second)]
+    ok = executed == 1 and replayed.count("true") == 1 and conflict == 422
+    print(f"{'✅' if ok else '❌'} executed {executed} time(s), replayed headers {replayed}, conflict {conflict}")
+    return ok
+
+
+async def test_status_and_cancel(client):
+    """A running query reports rows scanned and answers 499 once cancelled"""
+    print("4. Status and cancel for a running query...")
+    query = asyncio.ensure_future(_query(client, "SELECT 6 /* mock: latency=2000 rows=1000 */",
+                                         **{"X-Request-Id": "r1"}))
+    await asyncio.sleep(0.3)
+    status = (await client.post("/v1/query/status", json={"request_id": "r1"}, headers=AUTH)).json()
+    cancel = await client.post("/v1/query/cancel", json={"request_id": "r1"}, headers=AUTH)
+    result = await query
+    unknown = (await client.post("/v1/query/cancel", json={"request_id": "r1"}, headers=AUTH)).status_code
+    ok = status["state"] == "running" and 0 < status["rows_scanned"] < 1000 \
+        and cancel.status_code == 200 and result.status_code == 499 and unknown == 404
+    print(f"{'✅' if ok else '❌'} status {status}, query answered {result.status_code}, second cancel {unknown}")
+    return ok
+
+
+async def test_drop_and_stats():
+    """drop_rate=1 closes every connection unanswered; /mock/reset clears the counters"""
+    print("5. A server that drops every query, and its stats endpoints...")
+    async with MockServer(MockConfig(drop_rate=1.0, seed=1)) as server:
+        async with httpx.AsyncClient(base_url=server.base_url) as client:
+            try:
+                await _query(client, "SELECT 7")
+                error = None
+            except httpx.HTTPError as e:
+                error = e
+            stats = (await client.get("/mock/stats")).json()
+            await client.post("/mock/reset")
+            cleared = (await client.get("/mock/stats")).json()
+    ok = isinstance(error, httpx.RemoteProtocolError) and stats.get("dropped") == 1 and cleared == {}
+    print(f"{'✅' if ok else '❌'} error {error.__class__.__name__}, stats {stats}, after reset {cleared}")
+    return ok
+
+
+async def main():
+    async with MockServer(MockConfig()) as server:
+        async with httpx.AsyncClient(base_url=server.base_url, timeout=5) as client:
+            results = [
+                await test_overrides(client),
+                await test_per_run_lists(client),
+                await test_idempotency(server, client),
+                await test_status_and_cancel(client),
+            ]
+    results.append(await test_drop_and_stats())
+    print()
+    print("All passed" if all(results) else "Some checks failed")
+    return 0 if all(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -26,7 +26,7 @@ async def test_timeout_configuration():
     timeout_value = None
 
     # Create a function that captures the timeout
-    async def mock_request_to_check_timeout(endpoint: str, payload: dict):
+    async def mock_request_to_check_timeout(endpoint: str, payload: dict, **kwargs):
         headers = {
             "Authorization": f"Bearer {definite_mcp.API_KEY}",
             "Content-Type": "application/json"
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Offline check of the performance regression suite's bookkeeping: a metric
+slower than its baseline beyond the threshold fails the run, --update
+records baselines, and a metric without one never fails.
+
+    python scripts/test_perf_suite.py
+"""
+
+import os
+import sys
+import json
+import tempfile
+import contextlib
+import io
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import perf_suite  # noqa: E402
+
+METRIC = "cache_hit_us"
+
+
+def _run(baselines, *argv: str):
+    """main() against a temporary baselines file; returns (exit code, file contents after)."""
+    with tempfile.TemporaryDirectory() as tmp:
+        perf_suite.BASELINES_PATH = os.path.join(tmp, "perf_baselines.json")
+        if baselines is not None:
+            with open(perf_suite.BASELINES_PATH, "w") as f:
+                json.dump(baselines, f)
+        with contextlib.redirect_stdout(io.StringIO()):
+            code = perf_suite.main(["--only", METRIC, *argv])
+        with open(perf_suite.BASELINES_PATH) as f:
+            return code, json.load(f)
+
+
+def test_regression_fails():
+    """A baseline far below the measurement fails; one far above passes"""
+    print("1. Baselines a thousand times faster and slower than reality...")
+    slow, _ = _run({"threshold": 0.25, "metrics": {METRIC: {"value": 0.001, "unit": "us"}}})
+    fast, _ = _run({"threshold": 0.25, "metrics": {METRIC: {"value": 1e6, "unit": "us"}}})
+    ok = slow == 1 and fast == 0
+    print(f"{'✅' if ok else '❌'} exit codes: regressed {slow}, improved {fast}")
+    return ok
+
+
+def test_per_metric_threshold():
+    """A metric's own threshold overrides the file-wide one; --threshold overrides both"""
+    print("2. Per-metric and command-line thresholds...")
+    baselines = {"threshold": 0.25, "metrics": {METRIC: {"value": 0.001, "unit": "us", "threshold": 1e9}}}
+    lenient, _ = _run(baselines)
+    strict, _ = _run(baselines, "--threshold", "0.25")
+    ok = lenient == 0 and strict == 1
+    print(f"{'✅' if ok else '❌'} exit codes: per-metric {lenient}, --threshold {strict}")
+    return ok
+
+
+def test_update_records():
+    """--update writes the measured value and keeps other settings"""
+    print("3. --update over an existing baselines file...")
+    code, written = _run({"threshold": 0.3, "metrics": {METRIC: {"value": 0.001, "unit": "us"}}}, "--update")
+    value = written["metrics"][METRIC]["value"]
+    ok = code == 0 and value > 0.001 and written["threshold"] == 0.3
+    print(f"{'✅' if ok else '❌'} exit code {code}, recorded {value}us")
+    return ok
+
+
+def test_missing_baseline():
+    """No baselines file at all reports without failing"""
+    print("4. No baselines file...")
+    code, written = _run(None, "--update")
+    ok = code == 0 and METRIC in written["metrics"]
+    print(f"{'✅' if ok else '❌'} exit code {code}, metrics recorded: {sorted(written['metrics'])}")
+    return ok
+
+
+def main():
+    results = [
+        test_regression_fails(),
+        test_per_metric_threshold(),
+        test_update_records(),
+        test_missing_baseline(),
+    ]
+    print()
+    print("All passed" if all(results) else "Some checks failed")
+    return 0 if all(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Offline check of progress notifications against the bundled mock API:
+they are only sent (and the query status endpoint only polled) when the
+client asked for progress, and the status poller gives up or backs off
+when that endpoint misbehaves.
+
+    python scripts/test_progress.py
+"""
+
+import os
+import sys
+import socket
+import asyncio
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+# The server reads its configuration at import time
+MOCK_PORT = _free_port()
+os.environ.update({
+    "DEFINITE_API_KEY": "test",
+    "DEFINITE_API_BASE_URL": f"http://127.0.0.1:{MOCK_PORT}",
+    "DEFINITE_HEALTH_INTERVAL_S": "0",
+    "DEFINITE_WARM_CONNECTIONS": "0",
+    "DEFINITE_CACHE_TTL_S": "0",
+    "DEFINITE_PROGRESS_INTERVAL_S": "0.2",
+    "LOG_LEVEL": "CRITICAL",
+})
+
+import httpx  # noqa: E402
+from mcp.shared.memory import create_connected_server_and_client_session  # noqa: E402
+
+import definite_mcp  # noqa: E402
+from definite_mcp.mock_server import MockServer, MockConfig  # noqa: E402
+from definite_mcp.progress import CallStatus, StatusPoller, with_progress  # noqa: E402
+
+SLOW_SQL = "SELECT 1 /* mock: latency=1000 rows=1000 */"
+
+
+async def test_progress_with_token(server, client):
+    """A client that sends a progressToken gets notifications with rows scanned"""
+    print("1. Slow query with a progress callback...")
+    messages = []
+
+    async def on_progress(progress, total, message=None):
+        messages.append(message)
+
+    before = server.stats.get("status_requests", 0)
+    await client.call_tool("run_sql_query", {"sql": SLOW_SQL}, progress_callback=on_progress)
+    polled = server.stats.get("status_requests", 0) - before
+    ok = len(messages) >= 2 and polled > 0 and any("rows scanned" in (m or "") for m in messages)
+    print(f"{'✅' if ok else '❌'} {len(messages)} notification(s), {polled} status poll(s)")
+    return ok
+
+
+async def test_no_progress_without_token(server, client):
+    """Without a progressToken nothing is sent and the status endpoint is left alone"""
+    print("2. Slow query without a progress callback...")
+    before = server.stats.get("status_requests", 0)
+    await client.call_tool("run_sql_query", {"sql": SLOW_SQL.replace("SELECT 1", "SELECT 2")})
+    polled = server.stats.get("status_requests", 0) - before
+    ok = polled == 0
+    print(f"{'✅' if ok else '❌'} {polled} status poll(s)")
+    return ok
+
+
+async def test_report_without_message():
+    """A report function without a message parameter (older mcp) still gets called"""
+    print("3. Report function without a message parameter...")
+    calls = []
+
+    async def report(progress, total=None):
+        calls.append((progress, total))
+
+    await with_progress(asyncio.sleep(0.5), report, lambda: None, 0.2, total_s=5)
+    ok = len(calls) >= 2
+    print(f"{'✅' if ok else '❌'} {len(calls)} call(s)")
+    return ok
+
+
+async def test_poller_gives_up_and_backs_off():
+    """403 disables the poller for good; 503 makes it back off instead of polling every interval"""
+    print("4. Status endpoint answering 403 and 503...")
+    results = []
+    for code in (403, 503):
+        hits = []
+
+        def handler(request, code=code):
+            hits.append(request)
+            return httpx.Response(code)
+
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            poller = StatusPoller(client, "/v1/query/status", {}, timeout_s=1.0)
+            status = CallStatus("rid", 1)
+            status.running(1, "http://mock")
+            for _ in range(5):
+                await poller.poll(status)
+        results.append((code, len(hits), poller.supported))
+    ok = results == [(403, 1, False), (503, 1, True)]
+    print(f"{'✅' if ok else '❌'} (status, polls, still supported): {results}")
+    return ok
+
+
+async def main():
+    async with MockServer(MockConfig(), port=MOCK_PORT) as server:
+        async with create_connected_server_and_client_session(definite_mcp.mcp._mcp_server) as client:
+            results = [
+                await test_progress_with_token(server, client),
+                await test_no_progress_without_token(server, client),
+            ]
+    results += [
+        await test_report_without_message(),
+        await test_poller_gives_up_and_backs_off(),
+    ]
+    print()
+    print("All passed" if all(results) else "Some checks failed")
+    return 0 if all(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
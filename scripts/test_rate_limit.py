@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Offline check of the client-side rate limiter against the bundled mock
+API: queries are paced to the configured rate, and hedges and cancels
+count against the same API-key bucket instead of going around it.
+
+    python scripts/test_rate_limit.py
+"""
+
+import os
+import sys
+import time
+import socket
+import asyncio
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+# The server reads its configuration at import time
+MOCK_PORT = _free_port()
+os.environ.update({
+    "DEFINITE_API_KEY": "test",
+    "DEFINITE_API_BASE_URL": f"http://127.0.0.1:{MOCK_PORT}",
+    "DEFINITE_HEALTH_INTERVAL_S": "0",
+    "DEFINITE_WARM_CONNECTIONS": "0",
+    "DEFINITE_CACHE_TTL_S": "0",
+    "DEFINITE_RATE_LIMIT_RPS": "4",
+    "DEFINITE_RATE_LIMIT_BURST": "1",
+    "DEFINITE_HEDGE": "1",
+    "DEFINITE_HEDGE_MIN_SAMPLES": "1",
+    "DEFINITE_HEDGE_MIN_DELAY_S": "0.05",
+    "LOG_LEVEL": "CRITICAL",
+})
+
+import definite_mcp  # noqa: E402
+from definite_mcp.mock_server import MockServer, MockConfig  # noqa: E402
+
+KEY_BUCKET = f"key:{definite_mcp._API_KEY_ID}"
+
+
+def _bucket() -> dict:
+    return definite_mcp._RATE_LIMITER.snapshot()[KEY_BUCKET]
+
+
+def _hedges(outcome: str) -> float:
+    series = definite_mcp._METRICS.snapshot()["counters"].get("hedges_total", [])
+    return sum(s["value"] for s in series if s["labels"].get("outcome") == outcome)
+
+
+async def test_queries_paced():
+    """Five queries at 4/s with a burst of 1 take about a second"""
+    print("1. Five queries at 4 requests/second...")
+    t0 = time.monotonic()
+    await asyncio.gather(*(definite_mcp.run_sql_query(f"SELECT {i}") for i in range(5)))
+    elapsed = time.monotonic() - t0
+    ok = elapsed >= 0.9
+    print(f"{'✅' if ok else '❌'} took {elapsed:.2f}s")
+    return ok
+
+
+async def test_hedge_needs_spare_token():
+    """A hedge is skipped, not queued, when the bucket has no token to spare"""
+    print("2. Slow query that would be hedged while the bucket is empty...")
+    await asyncio.sleep(0.3)   # let the bucket refill its single token
+    before_skipped, before_launched = _hedges("rate_limited"), _hedges("launched")
+    await definite_mcp.run_sql_query("SELECT 10 /* mock: latency=400 */")
+    skipped = _hedges("rate_limited") - before_skipped
+    launched = _hedges("launched") - before_launched
+    ok = skipped == 1 and launched == 0
+    print(f"{'✅' if ok else '❌'} hedges skipped: {skipped:g}, launched: {launched:g}, bucket: {_bucket()}")
+    return ok
+
+
+async def test_cancel_takes_a_token(server):
+    """A cancel waits for its own token like any other request"""
+    print("3. Cancelled query right after its attempt took the last token...")
+    await asyncio.sleep(0.3)
+    delayed = _bucket()["delayed"]
+    cancels = server.stats.get("cancel_requests", 0)
+    task = asyncio.ensure_future(definite_mcp.run_sql_query("SELECT 11 /* mock: latency=2000 */", timeout_s=0))
+    await asyncio.sleep(0.05)
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+    await asyncio.sleep(0.5)
+    waited = _bucket()["delayed"] - delayed
+    sent = server.stats.get("cancel_requests", 0) - cancels
+    ok = waited == 1 and sent == 1
+    print(f"{'✅' if ok else '❌'} cancel sent: {sent}, waited for a token: {waited}")
+    return ok
+
+
+async def main():
+    async with MockServer(MockConfig(), port=MOCK_PORT) as server:
+        results = [
+            await test_queries_paced(),
+            await test_hedge_needs_spare_token(),
+            await test_cancel_takes_a_token(server),
+        ]
+    print()
+    print("All passed" if all(results) else "Some checks failed")
+    return 0 if all(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -9,6 +9,8 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 # Import the module
 import src.definite_mcp as mcp_module
+from src.definite_mcp.health import HealthMonitor
+from src.definite_mcp.routing import EndpointRouter
 
 # Make sure API key is set
 if not os.environ.get("DEFINITE_API_KEY"):
@@ -21,11 +23,18 @@ async def test_retry():
     print("Expected: 3 quick failures (1s each) with exponential backoff, then a longer wait")
     print("---")
 
-    # Save original URL
+    # Save original URL and router
     original_url = mcp_module.API_BASE_URL
+    original_router = mcp_module._ROUTER
 
-    # Set non-routable IP to force connection timeout
+    # Set non-routable IP to force connection timeout; calls are routed
+    # through _ROUTER (which skips endpoints _HEALTH reports down), so
+    # point it there too
     mcp_module.API_BASE_URL = "http://192.0.2.1"  # Non-routable IP per RFC 5737
+    mcp_module._ROUTER = EndpointRouter([mcp_module.API_BASE_URL])
+    mcp_module._HEALTH[mcp_module.API_BASE_URL] = HealthMonitor(
+        mcp_module._HTTP, f"{mcp_module.API_BASE_URL}/v1/healthz", interval_s=0,
+    )
 
     try:
         result = await mcp_module.make_api_request("query", {"sql": "SELECT 1 as test"})
@@ -33,8 +42,10 @@ async def test_retry():
     except Exception as e:
         print(f"\nFinal error (as expected): {type(e).__name__}: {str(e)[:100]}...")
 
-    # Restore original URL
+    # Restore original URL and router
+    del mcp_module._HEALTH[mcp_module.API_BASE_URL]
     mcp_module.API_BASE_URL = original_url
+    mcp_module._ROUTER = original_router
     print("\n---")
     print("Test completed. The retry logic should have shown 3 connection timeout messages.")
 
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Offline check of the status-aware retry policy against the bundled mock
+API: which statuses are retried, Retry-After handling, the process-wide
+retry budget, and the backoff jitter modes.
+
+    python scripts/test_retry_policy.py
+"""
+
+import os
+import sys
+import time
+import socket
+import asyncio
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+# The server reads its configuration at import time
+MOCK_PORT = _free_port()
+os.environ.update({
+    "DEFINITE_API_KEY": "test",
+    "DEFINITE_API_BASE_URL": f"http://127.0.0.1:{MOCK_PORT}",
+    "DEFINITE_HEALTH_INTERVAL_S": "0",
+    "DEFINITE_WARM_CONNECTIONS": "0",
+    "DEFINITE_CACHE_TTL_S": "0",
+    "DEFINITE_RETRIES": "3",
+    "DEFINITE_BACKOFF_BASE_S": "0.01",
+    "DEFINITE_RETRY_JITTER": "none",
+    "DEFINITE_RETRY_AFTER_MAX_S": "1",
+    "DEFINITE_RETRY_BUDGET_MIN": "1000000",
+    "DEFINITE_BREAKER_FAILURES": "0",
+    "LOG_LEVEL": "CRITICAL",
+})
+
+import definite_mcp  # noqa: E402
+from definite_mcp.retry import RetryPolicy, RetryBudget  # noqa: E402
+from definite_mcp.mock_server import MockServer, MockConfig  # noqa: E402
+
+
+async def _attempts(server, sql: str) -> int:
+    before = server.stats.get("query", 0)
+    await definite_mcp.run_sql_query(sql)
+    return server.stats.get("query", 0) - before
+
+
+async def test_retryable_statuses(server):
+    """503 is retried up to the attempt limit; 500 and 400 are not retried"""
+    print("1. Queries failing with 503, 500 and 400...")
+    attempts = {status: await _attempts(server, f"SELECT {status} /* mock: status={status} */")
+                for status in (503, 500, 400)}
+    ok = attempts == {503: 3, 500: 1, 400: 1}
+    print(f"{'✅' if ok else '❌'} attempts by status: {attempts}")
+    return ok
+
+
+async def test_retry_after(server):
+    """A 429's Retry-After sets the wait; one past the maximum is not waited out"""
+    print("2. 429 with Retry-After 0.3s, then with Retry-After 5s...")
+    server.config.retry_after_s = 0.3
+    t0 = time.monotonic()
+    honoured = await _attempts(server, "SELECT 1 /* mock: rate_limit_rate=1 */")
+    waited = time.monotonic() - t0
+    server.config.retry_after_s = 5
+    t0 = time.monotonic()
+    too_long = await _attempts(server, "SELECT 2 /* mock: rate_limit_rate=1 */")
+    gave_up = time.monotonic() - t0
+    ok = honoured == 3 and waited >= 0.6 and too_long == 1 and gave_up < 0.5
+    print(f"{'✅' if ok else '❌'} 0.3s: {honoured} attempts in {waited:.2f}s, "
+          f"5s: {too_long} attempt(s) in {gave_up:.2f}s")
+    return ok
+
+
+async def test_budget(server):
+    """Once the retry budget is spent, failing calls get a single attempt"""
+    print("3. Two 503 calls with a budget of two retries...")
+    definite_mcp._RETRY_BUDGET = RetryBudget(ratio=0.0, min_retries=2)
+    first = await _attempts(server, "SELECT 3 /* mock: status=503 */")
+    second = await _attempts(server, "SELECT 4 /* mock: status=503 */")
+    snapshot = definite_mcp._RETRY_BUDGET.snapshot()
+    ok = first == 3 and second == 1 and snapshot["exhausted"] == 1
+    print(f"{'✅' if ok else '❌'} attempts: {first} then {second}, budget: {snapshot}")
+    return ok
+
+
+async def test_jitter_modes():
+    """'none' doubles exactly, 'full' stays within the ceiling, and unknown modes are rejected"""
+    print("4. Backoff delays per jitter mode...")
+    none = RetryPolicy(5, base_s=0.1, max_s=0.3, jitter="none")
+    full = RetryPolicy(5, base_s=0.1, max_s=0.3, jitter="full")
+    exact = [round(none.delay(attempt), 3) for attempt in (1, 2, 3, 4)]
+    spread = [full.delay(3) for _ in range(200)]
+    try:
+        RetryPolicy(5, 0.1, 0.3, jitter="bogus")
+        rejected = False
+    except ValueError:
+        rejected = True
+    ok = exact == [0.1, 0.2, 0.3, 0.3] and all(0 <= d <= 0.3 for d in spread) \
+        and len(set(spread)) > 1 and rejected
+    print(f"{'✅' if ok else '❌'} none: {exact}, full: {min(spread):.3f}-{max(spread):.3f}")
+    return ok
+
+
+async def main():
+    async with MockServer(MockConfig(), port=MOCK_PORT) as server:
+        results = [
+            await test_retryable_statuses(server),
+            await test_retry_after(server),
+            await test_budget(server),
+            await test_jitter_modes(),
+        ]
+    print()
+    print("All passed" if all(results) else "Some checks failed")
+    return 0 if all(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
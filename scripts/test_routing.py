@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Offline check of latency-weighted routing across several endpoints, using
+two bundled mock APIs (one fast, one slow) and a port nobody listens on:
+a connect error fails over at once, every endpoint gets sampled, traffic
+favours the fast endpoint, and the dead one is left alone afterwards.
+
+    python scripts/test_routing.py
+"""
+
+import os
+import sys
+import time
+import socket
+import asyncio
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+# The server reads its configuration at import time
+FAST_PORT, SLOW_PORT, DEAD_PORT = _free_port(), _free_port(), _free_port()
+DEAD = f"http://127.0.0.1:{DEAD_PORT}"
+FAST = f"http://127.0.0.1:{FAST_PORT}"
+SLOW = f"http://127.0.0.1:{SLOW_PORT}"
+os.environ.update({
+    "DEFINITE_API_KEY": "test",
+    # The dead endpoint first, so the first call tries it
+    "DEFINITE_API_BASE_URL": f"{DEAD},{FAST},{SLOW}",
+    "DEFINITE_HEALTH_INTERVAL_S": "0",
+    "DEFINITE_WARM_CONNECTIONS": "0",
+    "DEFINITE_CACHE_TTL_S": "0",
+    "DEFINITE_BACKOFF_BASE_S": "2",
+    "LOG_LEVEL": "CRITICAL",
+})
+
+import definite_mcp  # noqa: E402
+from definite_mcp.routing import EndpointRouter  # noqa: E402
+from definite_mcp.mock_server import MockServer, MockConfig  # noqa: E402
+
+
+def _failovers(url: str) -> float:
+    series = definite_mcp._METRICS.snapshot()["counters"].get("failovers_total", [])
+    return sum(s["value"] for s in series if s["labels"].get("endpoint") == url)
+
+
+async def test_failover(fast, slow):
+    """A refused connection moves the attempt to another endpoint without a backoff"""
+    print("1. First call, dead endpoint first in the list...")
+    t0 = time.monotonic()
+    result = await definite_mcp.run_sql_query("SELECT 1")
+    elapsed = time.monotonic() - t0
+    served = fast.stats.get("query", 0) + slow.stats.get("query", 0)
+    ok = "error" not in result and _failovers(DEAD) == 1 and served == 1 and elapsed < 1.0
+    print(f"{'✅' if ok else '❌'} {result.get('error', 'ok')} in {elapsed * 1000:.0f}ms, "
+          f"{_failovers(DEAD):g} failover(s)")
+    return ok
+
+
+async def test_weighted_by_latency(fast, slow):
+    """Both live endpoints get a latency estimate, then most calls go to the fast one"""
+    print("2. 20 sequential calls, one endpoint 200ms slower...")
+    before = fast.stats.get("query", 0), slow.stats.get("query", 0)
+    for i in range(20):
+        await definite_mcp.run_sql_query(f"SELECT {10 + i}")
+    to_fast = fast.stats.get("query", 0) - before[0]
+    to_slow = slow.stats.get("query", 0) - before[1]
+    snap = definite_mcp._ROUTER.snapshot()
+    ok = snap[FAST]["ewma_ms"] is not None and snap[SLOW]["ewma_ms"] is not None \
+        and snap[SLOW]["ewma_ms"] > snap[FAST]["ewma_ms"] and to_fast >= 17
+    print(f"{'✅' if ok else '❌'} fast {to_fast}, slow {to_slow}; "
+          f"ewma fast {snap[FAST]['ewma_ms']}ms, slow {snap[SLOW]['ewma_ms']}ms")
+    return ok
+
+
+async def test_dead_left_alone():
+    """After its connect failure the dead endpoint is not tried again"""
+    print("3. Requests sent to the dead endpoint overall...")
+    dead = definite_mcp._ROUTER.snapshot()[DEAD]
+    ok = dead["requests"] == 1 and dead["failures"] == 1
+    print(f"{'✅' if ok else '❌'} {dead}")
+    return ok
+
+
+async def test_load_spreads():
+    """Equal latencies: in-flight requests push the next pick to the idle endpoint"""
+    print("4. Picks across two equally fast endpoints under load...")
+    router = EndpointRouter(["a", "b"])
+    router.observe("a", 50)
+    router.observe("b", 50)
+    picks = []
+    for _ in range(4):
+        endpoint = router.pick()
+        router.started(endpoint)
+        picks.append(endpoint.url)
+    ok = sorted(picks) == ["a", "a", "b", "b"]
+    print(f"{'✅' if ok else '❌'} picks {picks}")
+    return ok
+
+
+async def main():
+    async with MockServer(MockConfig(), port=FAST_PORT) as fast, \
+            MockServer(MockConfig(latency="200"), port=SLOW_PORT) as slow:
+        results = [
+            await test_failover(fast, slow),
+            await test_weighted_by_latency(fast, slow),
+            await test_dead_left_alone(),
+            await test_load_spreads(),
+        ]
+    print()
+    print("All passed" if all(results) else "Some checks failed")
+    return 0 if all(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
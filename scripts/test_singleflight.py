@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Offline check of in-flight request coalescing against the bundled mock
+API: identical concurrent reads share one upstream query, writes never
+do, and the shared query lives exactly as long as someone waits on it.
+
+    python scripts/test_singleflight.py
+"""
+
+import os
+import sys
+import socket
+import asyncio
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+# The server reads its configuration at import time
+MOCK_PORT = _free_port()
+os.environ.update({
+    "DEFINITE_API_KEY": "test",
+    "DEFINITE_API_BASE_URL": f"http://127.0.0.1:{MOCK_PORT}",
+    "DEFINITE_HEALTH_INTERVAL_S": "0",
+    "DEFINITE_WARM_CONNECTIONS": "0",
+    "DEFINITE_CACHE_TTL_S": "0",
+    "LOG_LEVEL": "CRITICAL",
+})
+
+import definite_mcp  # noqa: E402
+from definite_mcp.mock_server import MockServer, MockConfig  # noqa: E402
+
+
+def _counts(server) -> tuple:
+    return server.stats.get("query", 0), server.stats.get("cancel_requests", 0)
+
+
+async def test_reads_coalesce(server):
+    """Five concurrent identical reads send one query and get the same result"""
+    print("1. Five concurrent identical SELECTs...")
+    before = _counts(server)[0]
+    coalesced = definite_mcp._INFLIGHT.coalesced
+    results = await asyncio.gather(*(
+        definite_mcp.run_sql_query("SELECT 1 /* mock: latency=200 */") for _ in range(5)
+    ))
+    sent = _counts(server)[0] - before
+    joined = definite_mcp._INFLIGHT.coalesced - coalesced
+    ok = sent == 1 and joined == 4 and all(r == results[0] for r in results) and "error" not in results[0]
+    print(f"{'✅' if ok else '❌'} {sent} upstream query(ies), {joined} caller(s) coalesced")
+    return ok
+
+
+async def test_writes_not_coalesced(server):
+    """Concurrent identical writes each reach the API"""
+    print("2. Three concurrent identical INSERTs...")
+    before = _counts(server)[0]
+    await asyncio.gather(*(
+        definite_mcp.run_sql_query("INSERT INTO t VALUES (1) /* mock: latency=200 */") for _ in range(3)
+    ))
+    sent = _counts(server)[0] - before
+    ok = sent == 3
+    print(f"{'✅' if ok else '❌'} {sent} upstream query(ies)")
+    return ok
+
+
+async def test_one_waiter_leaves(server):
+    """A caller that gives up doesn't take the shared query from the others"""
+    print("3. Three callers share a query and one is cancelled...")
+    queries, cancels = _counts(server)
+    tasks = [asyncio.ensure_future(definite_mcp.run_sql_query("SELECT 3 /* mock: latency=300 */"))
+             for _ in range(3)]
+    await asyncio.sleep(0.1)
+    tasks[0].cancel()
+    results = await asyncio.gather(*tasks[1:])
+    await asyncio.sleep(0.1)
+    sent, cancelled = (a - b for a, b in zip(_counts(server), (queries, cancels)))
+    ok = sent == 1 and cancelled == 0 and all("error" not in r for r in results)
+    print(f"{'✅' if ok else '❌'} {sent} upstream query(ies), {cancelled} cancel(s), "
+          f"{sum('error' not in r for r in results)} of 2 remaining callers answered")
+    return ok
+
+
+async def test_last_waiter_leaves(server):
+    """When every caller gives up the shared query is cancelled upstream"""
+    print("4. Two callers share a query and both are cancelled...")
+    cancels = _counts(server)[1]
+    tasks = [asyncio.ensure_future(definite_mcp.run_sql_query("SELECT 4 /* mock: latency=2000 */", timeout_s=0))
+             for _ in range(2)]
+    await asyncio.sleep(0.1)
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    await asyncio.sleep(0.2)
+    cancelled = _counts(server)[1] - cancels
+    ok = cancelled == 1 and definite_mcp._INFLIGHT.stats()["in_flight"] == 0
+    print(f"{'✅' if ok else '❌'} {cancelled} cancel(s), in flight: {definite_mcp._INFLIGHT.stats()['in_flight']}")
+    return ok
+
+
+async def main():
+    async with MockServer(MockConfig(), port=MOCK_PORT) as server:
+        results = [
+            await test_reads_coalesce(server),
+            await test_writes_not_coalesced(server),
+            await test_one_waiter_leaves(server),
+            await test_last_waiter_leaves(server),
+        ]
+    print()
+    print("All passed" if all(results) else "Some checks failed")
+    return 0 if all(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -28,7 +28,7 @@ async def simulate_timeout_with_mock():
     original_make_api_request = definite_mcp.make_api_request
 
     # Create a function that will timeout
-    async def mock_timeout_request(endpoint: str, payload: dict):
+    async def mock_timeout_request(endpoint: str, payload: dict, **kwargs):
         # Simulate a request that takes too long
         raise httpx.ReadTimeout("The read operation timed out")
 
@@ -70,7 +70,7 @@ async def simulate_connect_timeout():
 
     original_make_api_request = definite_mcp.make_api_request
 
-    async def mock_connect_timeout(endpoint: str, payload: dict):
+    async def mock_connect_timeout(endpoint: str, payload: dict, **kwargs):
         raise httpx.ConnectTimeout("Connection timeout")
 
     definite_mcp.make_api_request = mock_connect_timeout
@@ -105,7 +105,7 @@ async def simulate_generic_timeout():
 
     original_make_api_request = definite_mcp.make_api_request
 
-    async def mock_generic_timeout(endpoint: str, payload: dict):
+    async def mock_generic_timeout(endpoint: str, payload: dict, **kwargs):
         raise httpx.TimeoutException("Request timed out")
 
     definite_mcp.make_api_request = mock_generic_timeout
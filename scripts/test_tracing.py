@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Offline check of per-attempt phase timings against the bundled mock API:
+server time shows up as ttfb, a slow body as download, a new connection
+as connect, and a timed-out attempt still reports where its time went.
+
+    python scripts/test_tracing.py
+"""
+
+import os
+import sys
+import socket
+import asyncio
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+# The server reads its configuration at import time
+MOCK_PORT = _free_port()
+os.environ.update({
+    "DEFINITE_API_KEY": "test",
+    "DEFINITE_API_BASE_URL": f"http://127.0.0.1:{MOCK_PORT}",
+    "DEFINITE_HEALTH_INTERVAL_S": "0",
+    "DEFINITE_WARM_CONNECTIONS": "0",
+    "DEFINITE_CACHE_TTL_S": "0",
+    "DEFINITE_RETRIES": "1",
+    "DEFINITE_ATTEMPT_DEADLINE_S": "0.3",
+    "LOG_LEVEL": "CRITICAL",
+})
+
+import definite_mcp  # noqa: E402
+from definite_mcp.mock_server import MockServer, MockConfig  # noqa: E402
+
+
+def _phase(phase: str) -> dict:
+    """The request_phase_seconds histogram summary for one phase on /v1/query."""
+    series = definite_mcp._METRICS.snapshot()["histograms"]["request_phase_seconds"]
+    for s in series:
+        if s["labels"]["phase"] == phase and s["labels"]["path"] == "/v1/query":
+            return s
+    return {"count": 0, "mean_ms": None}
+
+
+async def test_ttfb_and_connect():
+    """A 200ms query lands in ttfb; the first attempt on a fresh pool pays a connect"""
+    print("1. A 200ms query on a fresh connection...")
+    await definite_mcp.run_sql_query("SELECT 1 /* mock: latency=200 */")
+    ttfb, connect, total = _phase("ttfb"), _phase("connect"), _phase("total")
+    ok = ttfb["count"] == 1 and ttfb["mean_ms"] >= 200 and connect["count"] == 1 \
+        and total["mean_ms"] >= ttfb["mean_ms"]
+    print(f"{'✅' if ok else '❌'} ttfb {ttfb['mean_ms']}ms, connect {connect['mean_ms']}ms, "
+          f"total {total['mean_ms']}ms")
+    return ok
+
+
+async def test_download():
+    """A body trickled out over ~250ms lands in download, not ttfb"""
+    print("2. A 3KB body at 10KB/s...")
+    before = _phase("download")
+    await definite_mcp.run_sql_query("SELECT 2 /* mock: rows=60 bps=10000 */")
+    after = _phase("download")
+    slow_ms = after["mean_ms"] * after["count"] - (before["mean_ms"] or 0) * before["count"]
+    ok = after["count"] == before["count"] + 1 and slow_ms >= 150
+    print(f"{'✅' if ok else '❌'} download took {slow_ms:.0f}ms")
+    return ok
+
+
+async def test_failed_attempt_timings():
+    """A call that times out reports where its last attempt spent the time"""
+    print("3. A query slower than the 0.3s attempt deadline...")
+    result = await definite_mcp.run_sql_query("SELECT 3 /* mock: latency=1000 */")
+    timings = result.get("request_details", {}).get("timings_ms") or {}
+    ok = "error" in result and timings.get("total", 0) >= 300 and timings.get("ttfb", 0) >= 290
+    print(f"{'✅' if ok else '❌'} timings {timings}")
+    return ok
+
+
+async def test_prometheus_buckets():
+    """Phase histograms are exported as cumulative Prometheus buckets in seconds"""
+    print("4. Prometheus export of the phase histograms...")
+    text = definite_mcp._METRICS.render_prometheus()
+    lines = [line for line in text.splitlines()
+             if line.startswith("definite_mcp_request_phase_seconds_bucket") and 'phase="ttfb"' in line]
+    counts = [float(line.rsplit(" ", 1)[1]) for line in lines]
+    ok = bool(lines) and 'le="+Inf"' in lines[-1] and counts == sorted(counts)
+    print(f"{'✅' if ok else '❌'} {len(lines)} ttfb bucket line(s), +Inf count {counts[-1] if counts else None}")
+    return ok
+
+
+async def main():
+    async with MockServer(MockConfig(), port=MOCK_PORT):
+        results = [
+            await test_ttfb_and_connect(),
+            await test_download(),
+            await test_failed_attempt_timings(),
+            await test_prometheus_buckets(),
+        ]
+    print()
+    print("All passed" if all(results) else "Some checks failed")
+    return 0 if all(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Offline check of connection pre-warming against the bundled mock API: the
+warmer keeps pooled connections alive past the keepalive expiry while
+there is traffic, stops once the endpoint has been quiet for the window,
+and is started again by the next call.
+
+    python scripts/test_warmup.py
+"""
+
+import os
+import sys
+import socket
+import asyncio
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+# The server reads its configuration at import time
+MOCK_PORT = _free_port()
+os.environ.update({
+    "DEFINITE_API_KEY": "test",
+    "DEFINITE_API_BASE_URL": f"http://127.0.0.1:{MOCK_PORT}",
+    "DEFINITE_HEALTH_INTERVAL_S": "0",
+    "DEFINITE_CACHE_TTL_S": "0",
+    # Warm two connections every 0.2s, for 1s after the last call
+    "DEFINITE_KEEPALIVE_EXPIRY_S": "0.4",
+    "DEFINITE_WARM_CONNECTIONS": "2",
+    "DEFINITE_WARM_WINDOW_S": "1",
+    "LOG_LEVEL": "CRITICAL",
+})
+
+import definite_mcp  # noqa: E402
+from definite_mcp.mock_server import MockServer, MockConfig  # noqa: E402
+
+
+def _connects() -> int:
+    """How many attempts so far opened a new connection."""
+    for s in definite_mcp._METRICS.snapshot()["histograms"]["request_phase_seconds"]:
+        if s["labels"]["phase"] == "connect" and s["labels"]["path"] == "/v1/query":
+            return s["count"]
+    return 0
+
+
+async def test_connection_kept_warm(server):
+    """A call after twice the keepalive expiry reuses a warmed connection"""
+    print("1. Two calls 0.8s apart, keepalive expiry 0.4s...")
+    await definite_mcp.run_sql_query("SELECT 1")
+    connects = _connects()
+    await asyncio.sleep(0.8)
+    result = await definite_mcp.run_sql_query("SELECT 2")
+    warmer = definite_mcp._WARMER.snapshot()
+    ok = "error" not in result and _connects() == connects and warmer["warmups"] >= 2 \
+        and warmer["failures"] == 0 and server.stats.get("health", 0) == warmer["warmups"]
+    print(f"{'✅' if ok else '❌'} new connections for the second call: {_connects() - connects}, "
+          f"warm-up pings {warmer['warmups']}")
+    return ok
+
+
+async def test_stops_when_quiet():
+    """With no calls for the window the warmer stops pinging"""
+    print("2. 2s without calls, 1s warm window...")
+    await asyncio.sleep(1.5)
+    stopped = definite_mcp._WARMER.snapshot()
+    await asyncio.sleep(0.5)
+    later = definite_mcp._WARMER.snapshot()
+    ok = not stopped["running"] and later["warmups"] == stopped["warmups"]
+    print(f"{'✅' if ok else '❌'} running {stopped['running']}, "
+          f"pings while quiet {later['warmups'] - stopped['warmups']}")
+    return ok
+
+
+async def test_restarted_by_call():
+    """The next call starts the warmer again"""
+    print("3. A call after going quiet...")
+    before = definite_mcp._WARMER.snapshot()["warmups"]
+    await definite_mcp.run_sql_query("SELECT 3")
+    await asyncio.sleep(0.5)
+    warmer = definite_mcp._WARMER.snapshot()
+    ok = warmer["running"] and warmer["warmups"] > before
+    print(f"{'✅' if ok else '❌'} running {warmer['running']}, new pings {warmer['warmups'] - before}")
+    return ok
+
+
+async def main():
+    async with MockServer(MockConfig(), port=MOCK_PORT) as server:
+        results = [
+            await test_connection_kept_warm(server),
+            await test_stops_when_quiet(),
+            await test_restarted_by_call(),
+        ]
+        await definite_mcp._WARMER.stop()
+    print()
+    print("All passed" if all(results) else "Some checks failed")
+    return 0 if all(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
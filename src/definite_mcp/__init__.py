@@ -11,20 +11,60 @@ Key client transport changes vs. the original:
 - http2=False (avoid ALPN/HTTP2 stalls)
 - Fast connect timeout + per-attempt overall deadline + retries
 - Better diagnostics: X-Request-Id, custom User-Agent, phase tagging, DNS log
+- Background health monitor instead of a blocking preflight per request
+- In-process TTL/LRU result cache in front of the API
+- Identical in-flight requests are coalesced into one upstream POST
+- Background job mode (submit / status / fetch / cancel) for long-running queries
+- Batched multi-query tools with bounded concurrency
+- Circuit breakers per base URL and per integration fail fast while down
+- Status-aware retries (429/502/503/504) with jitter, Retry-After and a retry budget
+- Optional hedged attempts past the observed p95 time-to-first-byte
+- Per-attempt phase timings (connect/TLS/write/TTFB/download) via httpx trace hooks
+- Metrics via the definite://metrics resource and an optional Prometheus textfile
+- Async DNS resolution (off the event loop) with a TTL cache feeding the connection pool
+- Happy-eyeballs connects: staggered racing across resolved addresses/families
+- Several base URLs with EWMA latency-weighted routing and connect-error failover
+- Optional pool pre-warming at startup and for a short window after traffic
+- Optional adaptive HTTP/2 (DEFINITE_HTTP2=auto) with per-host HTTP/1.1 fallback
+- Adaptive (AIMD) concurrency limit on upstream attempts; excess calls queue
+- Fast/slow priority lanes with weighted-fair admission and load shedding
+- End-to-end call deadline (timeout_s) shared by queueing, attempts and retries
+- Cancelled or timed-out calls abort their HTTP request and ask the API to cancel the query
+- Idempotency-Key per call so retries reattach to a still-running query instead of re-running it
+- MCP progress notifications (elapsed, attempt, queue position, rows scanned) while queries wait
+- Optional token-bucket rate limits per API key and per integration
 """
 
 import os
 import sys
 import json
 import uuid
+import hashlib
 import time
-import socket
 import asyncio
 import logging
-from typing import Optional, Dict, Any
+from contextlib import asynccontextmanager
+from typing import Optional, Dict, Any, AsyncIterator, List, Iterable, Set
 from dotenv import load_dotenv
 import httpx
-from mcp.server.fastmcp import FastMCP
+from mcp.server.fastmcp import FastMCP, Context
+
+from .breaker import BreakerRegistry, CircuitBreaker, CircuitOpenError, HALF_OPEN
+from .cache import ResultCache, cache_key, is_read_only
+from .deadline import Deadline, DeadlineExceeded
+from .dns import DnsCache, CachingBackend, install_backend
+from .health import HealthMonitor
+from .jobs import JobRegistry, JobLimitError
+from .limiter import AdaptiveLimiter, LaneClassifier, OverloadedError, LANES, SLOW
+from .progress import CallStatus, StatusPoller, ProgressFn, with_progress
+from .protocol import ProtocolSelector, http2_available
+from .ratelimit import RateLimiter, parse_overrides
+from .metrics import LatencyWindow, MetricsRegistry, TextfileExporter, Sample
+from .retry import RetryPolicy, RetryBudget, parse_retry_after
+from .routing import Endpoint, EndpointRouter, attach_endpoint, endpoint_of
+from .singleflight import SingleFlight
+from .warmup import ConnectionWarmer
+from .tracing import RequestTrace, PhaseHistograms, CURRENT_TRACE, attach_timings, timings_of
 
 # -------------------------
 # Environment / logging
@@ -40,24 +80,26 @@ LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
 logging.basicConfig(stream=sys.stderr, level=LOG_LEVEL)
 log = logging.getLogger("definite-mcp")
 
-mcp = FastMCP("definite-api")
-
 API_KEY = os.getenv("DEFINITE_API_KEY")
-API_BASE_URL = os.getenv("DEFINITE_API_BASE_URL", "https://api.definite.app").rstrip("/")
-
-print("Definite MCP Server starting...", file=sys.stderr)
-print(f"API Base URL: {API_BASE_URL}", file=sys.stderr)
-print(f"API Key configured: {'Yes' if bool(API_KEY) else 'No'}", file=sys.stderr)
-
-if not API_KEY:
-    print("ERROR: DEFINITE_API_KEY environment variable is required", file=sys.stderr)
-    print("Make sure to set DEFINITE_API_KEY in your MCP configuration", file=sys.stderr)
-    sys.exit(1)
+# One URL, or a comma-separated list (regional edges, a mirror) to route across;
+# API_BASE_URL is the first and serves as the client's default
+API_BASE_URLS = [
+    u.strip().rstrip("/")
+    for u in os.getenv("DEFINITE_API_BASE_URL", "https://api.definite.app").split(",")
+    if u.strip()
+] or ["https://api.definite.app"]
+API_BASE_URL = API_BASE_URLS[0]
 
 # -------------------------
 # HTTP client config
 # -------------------------
 
+def _env_flag(name: str, default: bool = False) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
 # Fast connect to detect bad routes quickly;
 # generous read for long-running queries; short pool to avoid head-of-line waits.
 CONNECT_TIMEOUT_S = float(os.getenv("DEFINITE_CONNECT_TIMEOUT_S", "2.0"))
@@ -68,16 +110,130 @@ POOL_TIMEOUT_S = float(os.getenv("DEFINITE_POOL_TIMEOUT_S", "2.0"))
 # Overall per-attempt deadline (connect + TLS + write + first-byte)
 ATTEMPT_DEADLINE_S = float(os.getenv("DEFINITE_ATTEMPT_DEADLINE_S", "15.0"))
 
+# Overall budget per tool call across queueing, attempts and retry backoff
+# (0 = unbounded); the query tools' timeout_s argument overrides it
+CALL_TIMEOUT_S = float(os.getenv("DEFINITE_CALL_TIMEOUT_S", "60.0"))
+
+# When a call is cancelled or runs out of time mid-attempt, POST
+# {"request_id": <X-Request-Id>} here so the warehouse stops the query
+# (empty disables)
+CANCEL_PATH = os.getenv("DEFINITE_CANCEL_PATH", "/v1/query/cancel")
+
+# Send the call's request id as Idempotency-Key on every attempt, so a retry
+# after a read/deadline timeout reattaches to the query still running
+# server-side instead of starting it again
+IDEMPOTENCY_KEYS = _env_flag("DEFINITE_IDEMPOTENCY_KEYS", True)
+
+# Progress notifications every INTERVAL while a query tool waits (0 = off),
+# for clients that asked for them; QUERY_STATUS_PATH is polled for rows
+# scanned so far and is no longer asked once it answers 404 (empty = never)
+PROGRESS_INTERVAL_S = float(os.getenv("DEFINITE_PROGRESS_INTERVAL_S", "2.0"))
+QUERY_STATUS_PATH = os.getenv("DEFINITE_QUERY_STATUS_PATH", "/v1/query/status")
+
 # Retry policy
 RETRIES = int(os.getenv("DEFINITE_RETRIES", "4"))
 BACKOFF_BASE_S = float(os.getenv("DEFINITE_BACKOFF_BASE_S", "0.5"))
+BACKOFF_MAX_S = float(os.getenv("DEFINITE_BACKOFF_MAX_S", "8.0"))
+RETRY_JITTER = os.getenv("DEFINITE_RETRY_JITTER", "full").lower()   # full | decorrelated | none
+RETRY_AFTER_MAX_S = float(os.getenv("DEFINITE_RETRY_AFTER_MAX_S", "30.0"))
+# Retries allowed per 10s window: min + ratio * requests (process-wide)
+RETRY_BUDGET_RATIO = float(os.getenv("DEFINITE_RETRY_BUDGET_RATIO", "0.2"))
+RETRY_BUDGET_MIN = int(os.getenv("DEFINITE_RETRY_BUDGET_MIN", "10"))
+
+# Circuit breakers: open after N consecutive failed calls, trial after reset (0 disables);
+# integration breakers count timeouts and 502/503/504, not a query's own 500
+BREAKER_FAILURES = int(os.getenv("DEFINITE_BREAKER_FAILURES", "5"))
+BREAKER_RESET_S = float(os.getenv("DEFINITE_BREAKER_RESET_S", "30.0"))
+
+# Hedging: if an attempt has no response headers by the endpoint's observed
+# p95 time-to-first-byte, race a second attempt on a separate connection pool
+HEDGE_ENABLED = _env_flag("DEFINITE_HEDGE")
+HEDGE_QUANTILE = float(os.getenv("DEFINITE_HEDGE_QUANTILE", "0.95"))
+HEDGE_MIN_DELAY_S = float(os.getenv("DEFINITE_HEDGE_MIN_DELAY_S", "0.5"))
+HEDGE_MIN_SAMPLES = int(os.getenv("DEFINITE_HEDGE_MIN_SAMPLES", "20"))
+
+# Prometheus textfile export (unset path disables it)
+METRICS_TEXTFILE = os.getenv("DEFINITE_METRICS_TEXTFILE")
+METRICS_INTERVAL_S = float(os.getenv("DEFINITE_METRICS_INTERVAL_S", "15.0"))
+
+# DNS cache: answers are reused for TTL seconds; a failed re-resolution keeps
+# serving the previous answer for up to STALE seconds (TTL 0 disables caching)
+DNS_TTL_S = float(os.getenv("DEFINITE_DNS_TTL_S", "60.0"))
+DNS_STALE_S = float(os.getenv("DEFINITE_DNS_STALE_S", "300.0"))
+# Happy eyeballs: start the next address after this long without a connection
+# (0 tries addresses one after another instead of racing them)
+CONNECT_STAGGER_S = float(os.getenv("DEFINITE_CONNECT_STAGGER_S", "0.25"))
+
+# Background health monitor (0 disables probing)
+HEALTH_INTERVAL_S = float(os.getenv("DEFINITE_HEALTH_INTERVAL_S", "30.0"))
+HEALTH_TIMEOUT_S = float(os.getenv("DEFINITE_HEALTH_TIMEOUT_S", "5.0"))
+
+# Result cache (TTL 0 or max bytes 0 disables caching)
+CACHE_TTL_S = float(os.getenv("DEFINITE_CACHE_TTL_S", "60.0"))
+CACHE_MAX_BYTES = int(os.getenv("DEFINITE_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+# Background query jobs: attempts may run up to the read timeout
+JOB_MAX_CONCURRENCY = int(os.getenv("DEFINITE_JOB_MAX_CONCURRENCY", "4"))
+JOB_RESULT_TTL_S = float(os.getenv("DEFINITE_JOB_RESULT_TTL_S", "900.0"))
+JOB_MAX_RETAINED = int(os.getenv("DEFINITE_JOB_MAX_RETAINED", "100"))
+JOB_ATTEMPT_DEADLINE_S = float(os.getenv("DEFINITE_JOB_ATTEMPT_DEADLINE_S", str(READ_TIMEOUT_S)))
+
+# Batched query tools
+BATCH_MAX_CONCURRENCY = int(os.getenv("DEFINITE_BATCH_MAX_CONCURRENCY", "8"))
+BATCH_MAX_QUERIES = int(os.getenv("DEFINITE_BATCH_MAX_QUERIES", "50"))
+
+# Idle pooled connections are closed after this long; keep it below the
+# server/load balancer idle timeout so we never reuse a dropped connection
+KEEPALIVE_EXPIRY_S = float(os.getenv("DEFINITE_KEEPALIVE_EXPIRY_S", "5.0"))
+
+# Keep this many connections per endpoint open at startup and for WINDOW
+# seconds after the last real call (0 disables warming); past the window the
+# keepalive expiry closes them instead of idle pings keeping them alive
+WARM_CONNECTIONS = int(os.getenv("DEFINITE_WARM_CONNECTIONS", "0"))
+WARM_WINDOW_S = float(os.getenv("DEFINITE_WARM_WINDOW_S", "60.0"))
+
+# HTTP/2: "off" keeps every host on the HTTP/1.1 pool; "auto" multiplexes
+# calls over HTTP/2 (needs the `h2` package, e.g. `pip install httpx[http2]`)
+# and falls back per host on failed negotiation or repeated connect/protocol errors
+HTTP2_MODE = os.getenv("DEFINITE_HTTP2", "off").strip().lower()
+HTTP2_MAX_FAILURES = int(os.getenv("DEFINITE_HTTP2_MAX_FAILURES", "2"))
+HTTP2_RETRY_S = float(os.getenv("DEFINITE_HTTP2_RETRY_S", "300.0"))
+if HTTP2_MODE == "auto" and not http2_available():
+    log.warning("DEFINITE_HTTP2=auto but the h2 package is not installed; using HTTP/1.1")
+    HTTP2_MODE = "off"
 
 # Client concurrency limits
 LIMITS = httpx.Limits(
     max_connections=int(os.getenv("DEFINITE_MAX_CONNECTIONS", "50")),
     max_keepalive_connections=int(os.getenv("DEFINITE_MAX_KEEPALIVE", "20")),
+    keepalive_expiry=KEEPALIVE_EXPIRY_S,
 )
 
+# Adaptive concurrency: in-flight attempts start at INITIAL and move between
+# MIN and MAX (default: the pool size) with observed latency and overload
+# (MAX 0 disables the limiter)
+CONCURRENCY_INITIAL = int(os.getenv("DEFINITE_CONCURRENCY_INITIAL", "20"))
+CONCURRENCY_MIN = int(os.getenv("DEFINITE_CONCURRENCY_MIN", "2"))
+CONCURRENCY_MAX = int(os.getenv("DEFINITE_CONCURRENCY_MAX", str(LIMITS.max_connections or 50)))
+
+# Priority lanes: queries that took SLOW_QUERY_MS or more last time (and
+# background jobs) queue in the slow lane. Freed slots go fast:slow by
+# FAST_LANE_WEIGHT:1, the slow lane holds at most SLOW_LANE_SHARE of the
+# limit, and a lane with QUEUE_MAX_DEPTH waiters rejects new calls as overloaded
+SLOW_QUERY_MS = float(os.getenv("DEFINITE_SLOW_QUERY_MS", "2000"))
+FAST_LANE_WEIGHT = int(os.getenv("DEFINITE_FAST_LANE_WEIGHT", "4"))
+SLOW_LANE_SHARE = float(os.getenv("DEFINITE_SLOW_LANE_SHARE", "0.75"))
+QUEUE_MAX_DEPTH = int(os.getenv("DEFINITE_QUEUE_MAX_DEPTH", "64"))
+
+# Client-side rate limits in requests/second (0 = unlimited); BURST defaults
+# to the rate. INTEGRATION_RATE_LIMITS overrides single integrations:
+# "<integration_id>=<rps>[:<burst>],..."
+RATE_LIMIT_RPS = float(os.getenv("DEFINITE_RATE_LIMIT_RPS", "0"))
+RATE_LIMIT_BURST = float(os.getenv("DEFINITE_RATE_LIMIT_BURST", "0")) or None
+INTEGRATION_RATE_LIMIT_RPS = float(os.getenv("DEFINITE_INTEGRATION_RATE_LIMIT_RPS", "0"))
+INTEGRATION_RATE_LIMIT_BURST = float(os.getenv("DEFINITE_INTEGRATION_RATE_LIMIT_BURST", "0")) or None
+INTEGRATION_RATE_LIMITS = parse_overrides(os.getenv("DEFINITE_INTEGRATION_RATE_LIMITS", ""))
+
 TIMEOUT = httpx.Timeout(
     connect=CONNECT_TIMEOUT_S,
     read=READ_TIMEOUT_S,
@@ -95,74 +251,619 @@ _HTTP = httpx.AsyncClient(
     follow_redirects=True,
 )
 
+_METRICS = MetricsRegistry()
+_METRICS.describe("requests_total", "Upstream API calls by path and result")
+_METRICS.describe("attempts_total", "HTTP attempts sent (including retries and hedges)")
+_METRICS.describe("retries_total", "Retries by the phase/status that triggered them")
+_METRICS.describe("hedges_total", "Hedged attempts launched, won, or skipped for lack of a rate-limit token")
+_METRICS.describe("failovers_total", "Attempts moved to another endpoint after a connect error")
+_METRICS.describe("cancels_total", "Best-effort upstream query cancels by result")
+_METRICS.describe("idempotent_replays_total", "Attempts answered by reattaching to an earlier execution")
+_METRICS.describe("request_bytes_total", "Request body bytes sent")
+_METRICS.describe("response_bytes_total", "Response body bytes received")
+
+# Hedged attempts use their own small pool so they never queue behind
+# (or reuse) the connection the primary attempt is stuck on
+_HEDGE_HTTP = httpx.AsyncClient(
+    base_url=API_BASE_URL,
+    timeout=TIMEOUT,
+    limits=httpx.Limits(max_connections=10, max_keepalive_connections=5),
+    trust_env=False,
+    http2=False,
+    follow_redirects=True,
+)
+
+# Both pools resolve names through one async DNS cache instead of calling
+# getaddrinfo() on the event loop
+_DNS = DnsCache(ttl_s=DNS_TTL_S, stale_s=DNS_STALE_S)
+_DNS_BACKEND = CachingBackend(_DNS, stagger_s=CONNECT_STAGGER_S)
+install_backend(_HTTP, _DNS_BACKEND)
+install_backend(_HEDGE_HTTP, _DNS_BACKEND)
+
+_PROTOCOLS = ProtocolSelector(
+    API_BASE_URLS, mode=HTTP2_MODE, max_failures=HTTP2_MAX_FAILURES, retry_s=HTTP2_RETRY_S,
+)
+
+# HTTP/2 client for hosts in auto mode: concurrent calls share one
+# multiplexed connection instead of opening one TCP/TLS connection each
+_HTTP2: Optional[httpx.AsyncClient] = None
+if _PROTOCOLS.enabled:
+    _HTTP2 = httpx.AsyncClient(
+        base_url=API_BASE_URL,
+        timeout=TIMEOUT,
+        limits=LIMITS,
+        trust_env=False,
+        http2=True,
+        follow_redirects=True,
+    )
+    install_backend(_HTTP2, _DNS_BACKEND)
+
+# Phases of a failed HTTP/2 attempt that suggest the protocol is the problem;
+# read and deadline timeouts are slow queries, which HTTP/1.1 wouldn't fix
+_HTTP2_FAILURE_PHASES = {"connect_timeout", "connect_error", "protocol_error"}
+
+def _client_for(base_url: str) -> httpx.AsyncClient:
+    if _HTTP2 is not None and _PROTOCOLS.use_http2(base_url):
+        return _HTTP2
+    return _HTTP
+
 def _timeout_string() -> str:
     return (
         f"connect: {CONNECT_TIMEOUT_S:.0f}s, read: {READ_TIMEOUT_S:.0f}s, "
         f"write: {WRITE_TIMEOUT_S:.0f}s, pool: {POOL_TIMEOUT_S:.0f}s, "
-        f"attempt_deadline: {ATTEMPT_DEADLINE_S:.0f}s, retries: {RETRIES}, "
-        f"http2: false, trust_env: false"
+        f"attempt_deadline: {ATTEMPT_DEADLINE_S:.0f}s, call_timeout: {CALL_TIMEOUT_S:.0f}s, retries: {RETRIES}, "
+        f"retry_jitter: {RETRY_JITTER}, hedge: {str(HEDGE_ENABLED).lower()}, "
+        f"cache_ttl: {CACHE_TTL_S:.0f}s, dns_ttl: {DNS_TTL_S:.0f}s, "
+        f"keepalive_expiry: {KEEPALIVE_EXPIRY_S:g}s, warm_connections: {WARM_CONNECTIONS}, "
+        f"concurrency: {CONCURRENCY_MIN}-{CONCURRENCY_MAX}, queue_max_depth: {QUEUE_MAX_DEPTH}, "
+        f"rate_limit: {RATE_LIMIT_RPS:g}/s, "
+        f"http2: {HTTP2_MODE}, idempotency_keys: {str(IDEMPOTENCY_KEYS).lower()}, trust_env: false"
     )
 
 # -------------------------
 # Diagnostics helpers
 # -------------------------
 
-def _resolve_dns_once(host: str) -> None:
-    """Log DNS resolution results for visibility."""
+# Probes /v1/healthz on every endpoint in the background; 404 is fine
+# (no route), we only care about reachability and fast response.
+_HEALTH: Dict[str, HealthMonitor] = {
+    url: HealthMonitor(
+        _HTTP,
+        f"{url}/v1/healthz",
+        interval_s=HEALTH_INTERVAL_S,
+        timeout_s=HEALTH_TIMEOUT_S,
+    )
+    for url in API_BASE_URLS
+}
+
+# Re-warms an endpoint's connections once it has been idle for half the
+# keepalive expiry, i.e. before the pool would drop them, but only within
+# WARM_WINDOW_S of startup or of the last real response
+_WARMER = ConnectionWarmer(
+    _HTTP,
+    API_BASE_URLS,
+    client_for=_client_for,
+    connections=min(WARM_CONNECTIONS, LIMITS.max_keepalive_connections or WARM_CONNECTIONS),
+    idle_s=KEEPALIVE_EXPIRY_S / 2,
+    window_s=WARM_WINDOW_S,
+    timeout_s=HEALTH_TIMEOUT_S,
+)
+
+# Routes each attempt to the endpoint with the best latency * load score;
+# a connect failure counts as a connect-timeout's worth of latency
+_ROUTER = EndpointRouter(API_BASE_URLS, failure_penalty_ms=CONNECT_TIMEOUT_S * 1000)
+
+_RETRY_POLICY = RetryPolicy(
+    max_attempts=RETRIES,
+    base_s=BACKOFF_BASE_S,
+    max_s=BACKOFF_MAX_S,
+    jitter=RETRY_JITTER,
+    retry_after_max_s=RETRY_AFTER_MAX_S,
+)
+_RETRY_BUDGET = RetryBudget(ratio=RETRY_BUDGET_RATIO, min_retries=RETRY_BUDGET_MIN)
+
+# Paces attempts per API key and integration so bursts queue here instead of
+# coming back as 429s; keyed by a fingerprint so the key never shows up in metrics
+_RATE_LIMITER = RateLimiter(
+    key_rate=RATE_LIMIT_RPS,
+    key_burst=RATE_LIMIT_BURST,
+    integration_rate=INTEGRATION_RATE_LIMIT_RPS,
+    integration_burst=INTEGRATION_RATE_LIMIT_BURST,
+    overrides=INTEGRATION_RATE_LIMITS,
+)
+_API_KEY_ID = hashlib.sha256((API_KEY or "").encode()).hexdigest()[:12]
+
+# Gates every primary attempt (not hedges, which have their own pool)
+_LIMITER = AdaptiveLimiter(
+    initial=CONCURRENCY_INITIAL,
+    min_limit=CONCURRENCY_MIN,
+    max_limit=CONCURRENCY_MAX,
+    fast_weight=FAST_LANE_WEIGHT,
+    slow_share=SLOW_LANE_SHARE,
+    max_queue=QUEUE_MAX_DEPTH,
+)
+# Picks each call's lane from its last run time (keyed like the result cache)
+_LANES = LaneClassifier(slow_ms=SLOW_QUERY_MS)
+
+_BREAKERS = BreakerRegistry(failure_threshold=BREAKER_FAILURES, reset_timeout_s=BREAKER_RESET_S)
+
+# Time-to-first-byte per path, used to decide when to hedge
+_TTFB: Dict[str, LatencyWindow] = {}
+
+# Phase timing histograms keyed by (phase, path, integration)
+_PHASE_HISTS = PhaseHistograms()
+
+async def _post_once(
+    client: httpx.AsyncClient,
+    base_url: str,
+    path: str,
+    json_body: Dict[str, Any],
+    headers: Dict[str, str],
+    first_byte: Optional[asyncio.Event] = None,
+    trace: Optional[RequestTrace] = None,
+) -> httpx.Response:
+    """Single POST that records time-to-first-byte and reads the full body."""
+    t0 = time.monotonic()
+    request = client.build_request(
+        "POST", f"{base_url}{path}", json=json_body, headers=headers,
+        extensions={"trace": trace} if trace is not None else None,
+    )
+    _METRICS.inc("attempts_total", path=path)
+    _METRICS.inc("request_bytes_total", len(request.content), path=path)
+    # Lets the DNS backend report resolution time; unset for (untraced) hedges
+    token = CURRENT_TRACE.set(trace)
     try:
-        addrs = socket.getaddrinfo(host, 443, proto=socket.IPPROTO_TCP)
-        uniq = sorted({f"{fam}/{socktype}/{proto}@{addr[0]}" for fam, socktype, proto, _, addr in addrs})
-        log.info("DNS %s -> %s", host, uniq)
-    except Exception as e:
-        log.debug("DNS resolution failed for %s: %s", host, e)
+        resp = await client.send(request, stream=True)
+    finally:
+        CURRENT_TRACE.reset(token)
+    ttfb_ms = (time.monotonic() - t0) * 1000
+    _TTFB.setdefault(path, LatencyWindow()).observe(ttfb_ms)
+    _ROUTER.observe(base_url, ttfb_ms)
+    if client is _HTTP2:
+        _PROTOCOLS.record_response(base_url, resp.http_version)
+    if client is not _HEDGE_HTTP:
+        _WARMER.touch(base_url)
+    if first_byte is not None:
+        first_byte.set()
+    try:
+        await resp.aread()
+    finally:
+        await resp.aclose()
+    _METRICS.inc("response_bytes_total", len(resp.content), path=path)
+    return resp
 
-_DNS_LOGGED = False
+def _hedge_delay(path: str) -> Optional[float]:
+    """Seconds to wait before hedging, or None when hedging doesn't apply."""
+    if not HEDGE_ENABLED:
+        return None
+    window = _TTFB.get(path)
+    if window is None or len(window) < HEDGE_MIN_SAMPLES:
+        return None
+    return max(HEDGE_MIN_DELAY_S, (window.quantile(HEDGE_QUANTILE) or 0.0) / 1000)
 
-async def _preflight_health() -> None:
+async def _hedged_post(
+    client: httpx.AsyncClient,
+    base_url: str,
+    path: str,
+    json_body: Dict[str, Any],
+    headers: Dict[str, str],
+    hedge_after_s: float,
+    trace: Optional[RequestTrace] = None,
+) -> httpx.Response:
     """
-    Optional preflight to validate the network path. 404 is fine (no route),
-    we only care about reachability and fast response.
+    Start the primary attempt; if it has no response headers after
+    hedge_after_s, race a second attempt on _HEDGE_HTTP. The first response
+    the retry loop would not retry wins and the loser is cancelled; a 429/502/503/504
+    or an error from one side waits for the other. Only the primary is traced.
     """
+    first_byte = asyncio.Event()
+    primary = asyncio.ensure_future(_post_once(client, base_url, path, json_body, headers, first_byte, trace))
+    tasks = [primary]
     try:
-        r = await asyncio.wait_for(
-            _HTTP.head("/v1/healthz", headers={"User-Agent": "definite-mcp/health"}),
-            timeout=5.0,
+        waiter = asyncio.ensure_future(first_byte.wait())
+        try:
+            await asyncio.wait({primary, waiter}, timeout=hedge_after_s,
+                               return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            waiter.cancel()
+        if primary.done() or first_byte.is_set():
+            return await primary
+        # A hedge is an extra request under the same key: only send it on a
+        # spare rate-limit token, never by queueing for one
+        if not _RATE_LIMITER.try_acquire(_API_KEY_ID, json_body.get("integration_id") or "default"):
+            _METRICS.inc("hedges_total", outcome="rate_limited")
+            return await primary
+
+        _METRICS.inc("hedges_total", outcome="launched")
+        log.info("[%s] hedging %s after %.0fms", headers.get("X-Request-Id"), path, hedge_after_s * 1000)
+        hedge = asyncio.ensure_future(_post_once(_HEDGE_HTTP, base_url, path, json_body, headers))
+        tasks.append(hedge)
+        pending = set(tasks)
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None and not _RETRY_POLICY.retryable_status(task.result().status_code):
+                    if task is hedge:
+                        _METRICS.inc("hedges_total", outcome="won")
+                    return task.result()
+        # Neither is final: prefer a response (its Retry-After drives the
+        # backoff), else surface the primary's error
+        for task in tasks:
+            if task.exception() is None:
+                return task.result()
+        return primary.result()
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+
+async def _attempt(
+    base_url: str,
+    path: str,
+    json_body: Dict[str, Any],
+    headers: Dict[str, str],
+    attempt_deadline_s: float,
+    queued_s: float = 0.0,
+) -> httpx.Response:
+    """
+    One retry-loop attempt, hedged when enabled, bounded by the attempt deadline.
+    Phase timings (plus queued_s spent in the limiters) go to _PHASE_HISTS
+    and onto any exception raised.
+    """
+    trace = RequestTrace()
+    if queued_s > 0:
+        trace.add("queue_wait", queued_s * 1000)
+    client = _client_for(base_url)
+    hedge_after_s = _hedge_delay(path)
+    if hedge_after_s is None or hedge_after_s >= attempt_deadline_s:
+        coro = _post_once(client, base_url, path, json_body, headers, trace=trace)
+    else:
+        coro = _hedged_post(client, base_url, path, json_body, headers, hedge_after_s, trace)
+    try:
+        return await asyncio.wait_for(coro, timeout=attempt_deadline_s)
+    except Exception as e:
+        attach_timings(e, trace.finish())
+        if client is _HTTP2 and _phase_for_exception(e) in _HTTP2_FAILURE_PHASES:
+            _PROTOCOLS.record_failure(base_url, _phase_for_exception(e))
+        raise
+    finally:
+        timings = trace.finish()
+        _PHASE_HISTS.record(path, json_body.get("integration_id") or "default", timings)
+        log.debug("[%s] timings %s", headers.get("X-Request-Id"), timings)
+
+# Phases that say the API itself is unreachable vs. the integration being slow
+_BASE_FAILURE_PHASES = {"connect_timeout", "connect_error", "protocol_error"}
+_INTEGRATION_FAILURE_PHASES = {"read_timeout", "attempt_deadline_timeout"}
+_INTEGRATION_FAILURE_STATUSES = {502, 503, 504}
+# Failures and statuses that tell the concurrency limiter to back off
+_OVERLOAD_PHASES = {"read_timeout", "attempt_deadline_timeout", "pool_timeout"}
+_OVERLOAD_STATUSES = {429, 503}
+# Failures before the request reached the API, so there is nothing to cancel
+_UNSENT_PHASES = {"connect_timeout", "connect_error", "pool_timeout"}
+
+# Fire-and-forget cancel requests, kept referenced until they finish
+_CANCELS: Set["asyncio.Task[None]"] = set()
+
+def _cancel_upstream(base_url: str, headers: Dict[str, str], integration: str = "default") -> None:
+    """Ask base_url to stop the query sent with headers' X-Request-Id, without waiting."""
+    if not CANCEL_PATH:
+        return
+    task = asyncio.get_running_loop().create_task(_send_cancel(base_url, headers, integration))
+    _CANCELS.add(task)
+    task.add_done_callback(_CANCELS.discard)
+
+async def _send_cancel(base_url: str, headers: Dict[str, str], integration: str) -> None:
+    rid = headers.get("X-Request-Id")
+    # The cancel is its own request, not a repeat of the query
+    cancel_headers = {k: v for k, v in headers.items() if k != "Idempotency-Key"}
+    # It counts against the rate limit like any other request; worth the
+    # wait, since it stops a query that would keep the warehouse busy
+    await _RATE_LIMITER.acquire(_API_KEY_ID, integration)
+    try:
+        # The hedge pool is never saturated by the attempts being cancelled
+        resp = await asyncio.wait_for(
+            _HEDGE_HTTP.post(f"{base_url}{CANCEL_PATH}", json={"request_id": rid}, headers=cancel_headers),
+            timeout=HEALTH_TIMEOUT_S,
         )
-        log.info("Preflight /v1/healthz status=%s", r.status_code)
     except Exception as e:
-        # Non-fatal: this is a hint if the path is broken
-        log.warning("Preflight /v1/healthz failed: %s", e)
+        log.warning("[%s] cancel request to %s failed: %r", rid, base_url, e)
+        _METRICS.inc("cancels_total", result=_phase_for_exception(e))
+        return
+    log.info("[%s] cancel sent to %s: HTTP %s", rid, base_url, resp.status_code)
+    _METRICS.inc("cancels_total", result="ok" if resp.status_code < 400 else f"http_{resp.status_code}")
 
-async def _post_with_retries(path: str, json_body: Dict[str, Any], headers: Dict[str, str]) -> httpx.Response:
+def _typical_attempt_s(path: str) -> float:
+    """Median time to first byte on path, the least a retry needs to be worth starting."""
+    window = _TTFB.get(path)
+    median = window.quantile(0.5) if window is not None else None
+    return (median or 0.0) / 1000
+
+def _check_breakers(trials: Set[CircuitBreaker], *breakers: CircuitBreaker) -> None:
     """
-    POST with fast connect, per-attempt deadline, exponential backoff retries.
+    Raise CircuitOpenError if any breaker is blocked, before letting any of
+    them start a half-open trial that this call would then never report.
+    Breakers whose trial this call already holds (in trials) let it retry;
+    trials it starts are added.
     """
+    pending = [b for b in breakers if not (b in trials and b.state == HALF_OPEN)]
+    for breaker in pending:
+        if breaker.blocked:
+            breaker.check()
+    for breaker in pending:
+        if breaker.check():
+            trials.add(breaker)
+
+def _endpoint_usable(endpoint: Endpoint) -> bool:
+    """Routable unless its circuit is open or its last health probe failed."""
+    if _BREAKERS.get(f"url:{endpoint.url}").blocked:
+        return False
+    return _HEALTH[endpoint.url].healthy is not False
+
+async def _post_with_retries(
+    path: str,
+    json_body: Dict[str, Any],
+    headers: Dict[str, str],
+    attempt_deadline_s: float = ATTEMPT_DEADLINE_S,
+    lane: str = "fast",
+    deadline: Optional[Deadline] = None,
+    status: Optional[CallStatus] = None,
+) -> httpx.Response:
+    """
+    POST with fast connect, per-attempt deadline and jittered backoff retries.
+    Transport errors and retryable statuses (429/502/503/504) are retried per
+    _RETRY_POLICY while the process-wide _RETRY_BUDGET allows it.
+    Fails fast with CircuitOpenError while the base URL or integration breaker is open.
+    Each attempt goes to the best endpoint per _ROUTER; after a connect error
+    the next attempt fails over to another endpoint right away, without backoff.
+    Each attempt waits for a concurrency slot in `lane` and raises
+    OverloadedError if that lane's queue is full.
+    With a bounded `deadline`, queueing and each attempt only get the time
+    left, a retry is skipped when its backoff plus a typical attempt would
+    not fit, and running out raises DeadlineExceeded.
+    An attempt abandoned by cancellation or the deadline closes its
+    connection, and giving up on a request the API received (cancelled,
+    out of time, attempts or budget) sends a best-effort cancel for its
+    X-Request-Id.
+    Progress (queueing, attempts, backoff) is recorded on `status`.
+    """
+    rid = headers.get("X-Request-Id")
+    policy = _RETRY_POLICY
+    integration = json_body.get("integration_id") or "default"
+    integration_breaker = _BREAKERS.get(f"integration:{integration}")
+    deadline = deadline or Deadline()
+    status = status or CallStatus(rid or "", policy.max_attempts)
+    _RETRY_BUDGET.record_request()
+    unreachable: List[str] = []   # endpoints that failed to connect during this call
     attempt = 0
-    backoff = BACKOFF_BASE_S
-    while True:
-        attempt += 1
-        try:
-            log.info("[%s] POST %s attempt %d/%d", headers.get("X-Request-Id"), path, attempt, RETRIES)
-            # Per-attempt overall deadline (connect+TLS+write+first-byte)
-            resp = await asyncio.wait_for(
-                _HTTP.post(path, json=json_body, headers=headers),
-                timeout=ATTEMPT_DEADLINE_S,
+    delay = 0.0
+    integration_failed = False   # did the latest attempt fail in an integration-level way
+    trials: Set[CircuitBreaker] = set()   # half-open trials this call holds
+    try:
+        while True:
+            attempt += 1
+            # Rate limit first so no concurrency slot is held while paced, then
+            # wait for a slot before picking, so the pick is fresh
+            deadline.check(f"before attempt {attempt}")
+            status.waiting(attempt)
+            queued_s = await deadline.wait(_RATE_LIMITER.acquire(_API_KEY_ID, integration), "waiting on the rate limit")
+            queued_s += await deadline.wait(
+                _LIMITER.acquire(lane, on_queued=lambda position: status.queued(lane, position)),
+                "waiting for a concurrency slot",
             )
-            resp.raise_for_status()
-            return resp
-        except (httpx.ConnectTimeout, httpx.ConnectError,
-                httpx.ReadTimeout, httpx.RemoteProtocolError,
-                httpx.PoolTimeout, asyncio.TimeoutError) as e:
-            log.warning("[%s] attempt %d/%d %s: %s",
-                        headers.get("X-Request-Id"), attempt, RETRIES, e.__class__.__name__, e)
-            if attempt >= RETRIES:
+            if queued_s > 0.001:
+                log.debug("[%s] queued %.0fms by the rate/concurrency limits (%s lane)", rid, queued_s * 1000, lane)
+            endpoint = _ROUTER.pick(exclude=unreachable, usable=_endpoint_usable)
+            base_breaker = _BREAKERS.get(f"url:{endpoint.url}")
+            try:
+                _check_breakers(trials, base_breaker, integration_breaker)
+            except CircuitOpenError as e:
+                _LIMITER.release(lane=lane)
+                attach_endpoint(e, endpoint.url)
+                if e.name == integration_breaker.name:
+                    # Opened by another call meanwhile; don't count ours on top
+                    integration_failed = False
                 raise
-            await asyncio.sleep(backoff)
-            backoff *= 2.0
+            _ROUTER.started(endpoint)
+            status.running(attempt, endpoint.url)
+            attempt_t0 = time.monotonic()
+            latency_ms: Optional[float] = None
+            overloaded = False
+            # Per-attempt overall deadline (connect+TLS+write+first-byte), cut
+            # short when the call's own deadline comes first
+            this_deadline_s = deadline.cap(attempt_deadline_s)
+            try:
+                log.info("[%s] POST %s%s attempt %d/%d", rid, endpoint.url, path, attempt, policy.max_attempts)
+                resp = await _attempt(endpoint.url, path, json_body, headers, this_deadline_s, queued_s)
+            except asyncio.CancelledError:
+                log.info("[%s] cancelled during attempt %d", rid, attempt)
+                _cancel_upstream(endpoint.url, headers, integration)
+                raise
+            except policy.retry_exceptions as e:
+                attach_endpoint(e, endpoint.url)
+                log.warning("[%s] attempt %d/%d %s: %s",
+                            rid, attempt, policy.max_attempts, e.__class__.__name__, e)
+                phase = _phase_for_exception(e)
+                if phase == "attempt_deadline_timeout" and this_deadline_s < attempt_deadline_s:
+                    # Our own call budget ran out, not a sign the API is slow or down
+                    exceeded = DeadlineExceeded(deadline.timeout_s or 0.0, f"during attempt {attempt}")
+                    attach_endpoint(exceeded, endpoint.url)
+                    attach_timings(exceeded, timings_of(e))
+                    _cancel_upstream(endpoint.url, headers, integration)
+                    raise exceeded from e
+                overloaded = phase in _OVERLOAD_PHASES
+                integration_failed = phase in _INTEGRATION_FAILURE_PHASES
+                failover = False
+                if phase in _BASE_FAILURE_PHASES:
+                    base_breaker.record_failure()
+                    _ROUTER.failed(endpoint.url)
+                    if endpoint.url not in unreachable:
+                        unreachable.append(endpoint.url)
+                    failover = len(unreachable) < len(_ROUTER)
+                retry = attempt < policy.max_attempts
+                if retry:
+                    next_delay = 0.0 if failover else (policy.delay(attempt, delay) or 0.0)
+                    if not deadline.allows(next_delay + _typical_attempt_s(path)):
+                        log.warning("[%s] no time left for another attempt", rid)
+                        retry = False
+                    else:
+                        retry = _RETRY_BUDGET.try_spend()
+                if not retry:
+                    if phase not in _UNSENT_PHASES:
+                        # Nobody will read the result of a query that may still be running
+                        _cancel_upstream(endpoint.url, headers, integration)
+                    raise
+                delay = next_delay
+                status.backing_off(delay, phase)
+                _METRICS.inc("retries_total", phase=phase)
+                if failover:
+                    _METRICS.inc("failovers_total", endpoint=endpoint.url)
+                    log.warning("[%s] failing over from %s", rid, endpoint.url)
+            else:
+                latency_ms = (time.monotonic() - attempt_t0) * 1000
+                overloaded = resp.status_code in _OVERLOAD_STATUSES
+                if resp.headers.get("Idempotent-Replayed") == "true":
+                    _METRICS.inc("idempotent_replays_total", path=path)
+                    log.info("[%s] attempt %d reattached to the original execution", rid, attempt)
+                base_breaker.record_success()
+                # A 500 is usually the query's own error; only gateway errors
+                # say the integration is unavailable
+                integration_failed = resp.status_code in _INTEGRATION_FAILURE_STATUSES
+                if not integration_failed:
+                    integration_breaker.record_success()
+                if not policy.retryable_status(resp.status_code):
+                    resp.raise_for_status()
+                    return resp
+                retry_after = parse_retry_after(resp.headers.get("Retry-After"))
+                next_delay = policy.delay(attempt, delay, retry_after) if attempt < policy.max_attempts else None
+                if next_delay is None or not deadline.allows(next_delay + _typical_attempt_s(path)) \
+                        or not _RETRY_BUDGET.try_spend():
+                    if resp.status_code != 429:
+                        # A gateway error may have left the query running
+                        # behind it; a 429 was turned away before it started
+                        _cancel_upstream(endpoint.url, headers, integration)
+                    resp.raise_for_status()
+                delay = next_delay
+                status.backing_off(delay, f"HTTP {resp.status_code}")
+                _METRICS.inc("retries_total", phase=f"http_{resp.status_code}")
+                log.warning("[%s] attempt %d/%d HTTP %s (retry-after=%s)",
+                            rid, attempt, policy.max_attempts, resp.status_code, retry_after)
+            finally:
+                _ROUTER.finished(endpoint)
+                _LIMITER.release(latency_ms, overloaded, lane)
+            await asyncio.sleep(delay)
+    except Exception:
+        # One failure per call, however many attempts it took
+        if integration_failed:
+            integration_breaker.record_failure()
+        raise
+    finally:
+        # A trial that ended without a verdict (cancelled, failed elsewhere)
+        # must not block the breaker until it is deemed abandoned
+        for breaker in trials:
+            breaker.release_trial()
+
+_CACHE = ResultCache(max_bytes=CACHE_MAX_BYTES, default_ttl_s=CACHE_TTL_S)
+_INFLIGHT = SingleFlight()
+# Deadline of each coalesced request: the most generous of its callers',
+# since each caller's own wait already stops at its own deadline
+_FLIGHT_DEADLINES: Dict[Any, Deadline] = {}
+
+# Status of each upstream call in flight, by cache key, so every caller
+# coalesced onto it can report its progress
+_CALLS: Dict[Any, CallStatus] = {}
+_STATUS_POLLER = StatusPoller(
+    _HEDGE_HTTP,
+    QUERY_STATUS_PATH,
+    headers={"Authorization": f"Bearer {API_KEY}", "User-Agent": "definite-mcp/0.2"},
+    timeout_s=min(HEALTH_TIMEOUT_S, PROGRESS_INTERVAL_S or HEALTH_TIMEOUT_S),
+    # Polls are optional: only on a spare token of the API key's rate limit
+    admit=lambda: _RATE_LIMITER.try_acquire(_API_KEY_ID),
+)
 
-async def make_api_request(endpoint: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+async def make_api_request(
+    endpoint: str,
+    payload: Dict[str, Any],
+    use_cache: bool = True,
+    attempt_deadline_s: float = ATTEMPT_DEADLINE_S,
+    lane: Optional[str] = None,
+    deadline: Optional[Deadline] = None,
+    progress: Optional[ProgressFn] = None,
+) -> Dict[str, Any]:
     """
     Make an authenticated request to the Definite API with robust connect handling.
+    Successful results of read-only queries are cached by (endpoint, payload,
+    integration_id); use_cache=False skips the lookup but still refreshes the
+    entry. Writes are never served from the cache, and once sent they drop
+    the integration's cached results.
+    Concurrent identical read-only calls share one upstream request; every
+    write is sent on its own.
+    lane ("fast"/"slow") overrides the lane _LANES infers from past run times.
+    deadline bounds the whole call, including waiting on a coalesced request;
+    the shared request itself runs until its last caller's deadline.
+    progress, if given, is called every PROGRESS_INTERVAL_S while waiting.
+    """
+    key = cache_key(endpoint, payload)
+    read_only = is_read_only(payload)
+    if read_only and use_cache and _CACHE.enabled:
+        cached = _CACHE.get(key)
+        if cached is not None:
+            log.debug("cache hit %s %s", endpoint, key[2])
+            return cached
+
+    lane = _LANES.lane_for(key, lane)
+    deadline = deadline or Deadline()
+    if read_only:
+        # Calls with another attempt budget or lane (e.g. a job) don't share
+        flight_key = (key, attempt_deadline_s, lane)
+        shared = _FLIGHT_DEADLINES.get(flight_key)
+        if shared is None:
+            shared = _FLIGHT_DEADLINES[flight_key] = deadline.copy()
+        else:
+            shared.extend(deadline)
+        call = _INFLIGHT.do(flight_key, lambda: _send_coalesced(
+            flight_key, shared, endpoint, payload, key, attempt_deadline_s, lane,
+        ))
+    else:
+        call = _send(endpoint, payload, key, attempt_deadline_s, lane, deadline)
+    if progress is not None and PROGRESS_INTERVAL_S > 0:
+        call = with_progress(
+            call, progress, lambda: _CALLS.get(key), PROGRESS_INTERVAL_S,
+            total_s=deadline.timeout_s, poller=_STATUS_POLLER,
+        )
+    try:
+        return await deadline.wait(call, "waiting for the API", grace_s=0.1)
+    finally:
+        if not read_only:
+            # Whatever the outcome, the write may have changed what reads return
+            _CACHE.invalidate_integration(key[2])
+
+async def _send_coalesced(
+    flight_key: Any,
+    shared: Deadline,
+    endpoint: str,
+    payload: Dict[str, Any],
+    key: Any,
+    attempt_deadline_s: float,
+    lane: str,
+) -> Dict[str, Any]:
+    """_send for every caller coalesced on flight_key, bounded by their shared deadline."""
+    try:
+        return await _send(endpoint, payload, key, attempt_deadline_s, lane, shared)
+    finally:
+        if _FLIGHT_DEADLINES.get(flight_key) is shared:
+            del _FLIGHT_DEADLINES[flight_key]
+
+async def _send(
+    endpoint: str,
+    payload: Dict[str, Any],
+    key: Any,
+    attempt_deadline_s: float,
+    lane: str = "fast",
+    deadline: Optional[Deadline] = None,
+) -> Dict[str, Any]:
+    """
+    One upstream POST (with retries) for a coalesced call. All attempts
+    share one request id, which doubles as the Idempotency-Key.
     """
     rid = str(uuid.uuid4())
     headers = {
@@ -171,31 +872,42 @@ async def make_api_request(endpoint: str, payload: Dict[str, Any]) -> Dict[str,
         "User-Agent": "definite-mcp/0.2",
         "X-Request-Id": rid,
     }
+    if IDEMPOTENCY_KEYS:
+        headers["Idempotency-Key"] = rid
 
-    # One-time DNS visibility
-    global _DNS_LOGGED
-    if not _DNS_LOGGED:
-        _DNS_LOGGED = True
-        try:
-            host = API_BASE_URL.split("://", 1)[1].split("/", 1)[0]
-            _resolve_dns_once(host)
-        except Exception:
-            pass
-
-    # Optional preflight (does not fail the main call)
-    await _preflight_health()
+    # Health is probed in the background; never block the call on it
+    for monitor in _HEALTH.values():
+        monitor.ensure_started()
+    _WARMER.ensure_started()
+    _METRICS_EXPORTER.ensure_started()
+    if all(monitor.healthy is False for monitor in _HEALTH.values()):
+        log.warning("[%s] health monitor reports API unreachable: %s",
+                    rid, _HEALTH[API_BASE_URL].snapshot().get("last_error"))
 
     path = f"/v1/{endpoint.lstrip('/')}"
     t0 = time.monotonic()
+    status = _CALLS[key] = CallStatus(rid, _RETRY_POLICY.max_attempts)
     try:
-        resp = await _post_with_retries(path, payload, headers)
+        resp = await _post_with_retries(path, payload, headers, attempt_deadline_s, lane, deadline, status)
+        # Server time of the last attempt, excluding time spent queued here
+        _LANES.observe(key, resp.elapsed.total_seconds() * 1000)
         log.info("[%s] OK %s %s in %.0fms", rid, resp.status_code, path, (time.monotonic() - t0) * 1000)
-        return resp.json()
+        _METRICS.inc("requests_total", path=path, result="ok")
+        result = resp.json()
+        if _CACHE.enabled and is_read_only(payload):
+            _CACHE.put(key, result, len(resp.content))
+        return result
     except Exception as e:
+        if _phase_for_exception(e) in _INTEGRATION_FAILURE_PHASES:
+            _LANES.observe(key, attempt_deadline_s * 1000)
+        _METRICS.inc("requests_total", path=path, result=_result_label(e))
         # Re-raise; callers convert into structured error payloads
         log.error("[%s] POST %s failed after %.0fms: %s",
                   rid, path, (time.monotonic() - t0) * 1000, repr(e))
         raise
+    finally:
+        if _CALLS.get(key) is status:
+            del _CALLS[key]
 
 # -------------------------
 # Error helpers
@@ -214,39 +926,37 @@ def _phase_for_exception(exc: Exception) -> str:
         return "connect_error"
     if isinstance(exc, httpx.RemoteProtocolError):
         return "protocol_error"
+    if isinstance(exc, CircuitOpenError):
+        return "circuit_open"
+    if isinstance(exc, OverloadedError):
+        return "overloaded"
+    if isinstance(exc, DeadlineExceeded):
+        return "deadline_exceeded"
     return exc.__class__.__name__
 
-def _common_request_details(endpoint: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+def _result_label(exc: Exception) -> str:
+    if isinstance(exc, httpx.HTTPStatusError):
+        return f"http_{exc.response.status_code}"
+    return _phase_for_exception(exc)
+
+def _common_request_details(
+    endpoint: str,
+    payload: Dict[str, Any],
+    base_url: Optional[str] = None,
+) -> Dict[str, Any]:
     return {
-        "url": f"{API_BASE_URL}/v1/{endpoint}",
+        "url": f"{base_url or API_BASE_URL}/v1/{endpoint}",
         "payload": payload,
         "api_key_configured": bool(API_KEY),
         "timeouts": _timeout_string(),
     }
 
-# -------------------------
-# MCP tools
-# -------------------------
-
-@mcp.tool()
-async def run_sql_query(sql: str, integration_id: Optional[str] = None) -> Dict[str, Any]:
+def _error_payload(e: Exception, payload: Dict[str, Any], echo: Dict[str, Any]) -> Dict[str, Any]:
     """
-    Execute a SQL query on a Definite database integration.
+    Convert a make_api_request exception into the structured error tools return.
+    `echo` carries the caller's original query (e.g. {"query": sql}).
     """
-    payload: Dict[str, Any] = {"sql": sql}
-    if integration_id:
-        payload["integration_id"] = integration_id
-    else:
-        # Fallback default integration id from env if present
-        _TABLE_INTEGRATION_ID = os.getenv("_TABLE_INTEGRATION_ID")
-        if _TABLE_INTEGRATION_ID:
-            payload["integration_id"] = _TABLE_INTEGRATION_ID
-
-    try:
-        result = await make_api_request("query", payload)
-        return result
-
-    except httpx.HTTPStatusError as e:
+    if isinstance(e, httpx.HTTPStatusError):
         # Server responded with non-2xx
         error_detail = e.response.text
         # Try to extract nested "message" and trim "Something went wrong:"
@@ -260,43 +970,66 @@ async def run_sql_query(sql: str, integration_id: Optional[str] = None) -> Dict[
                     "error": msg,
                     "status": "failed",
                     "http_status": e.response.status_code,
-                    "query": sql,
+                    **echo,
                     "request_details": _common_request_details("query", payload),
                 }
-        except (json.JSONDecodeError, KeyError):
+        except (json.JSONDecodeError, KeyError, AttributeError):
             pass
 
         return {
             "error": f"HTTP {e.response.status_code}: {error_detail}",
             "status": "failed",
-            "query": sql,
+            **echo,
             "request_details": _common_request_details("query", payload),
         }
 
-    except Exception as e:
-        # Transport or attempt-deadline errors
-        phase = _phase_for_exception(e)
-        msg = str(e) or f"Query failed with {e.__class__.__name__}"
+    if isinstance(e, OverloadedError):
+        # Shed before sending anything; nothing upstream to diagnose
         return {
-            "error": msg,
+            "error": str(e),
             "status": "failed",
-            "query": sql,
-            "exception_type": f"{e.__class__.__module__}.{e.__class__.__name__}",
-            "request_details": {
-                **_common_request_details("query", payload),
-                "phase": phase,
-            },
+            "overloaded": True,
+            "lane": e.lane,
+            **echo,
         }
 
+    # Transport or attempt-deadline errors
+    phase = _phase_for_exception(e)
+    msg = str(e) or f"Query failed with {e.__class__.__name__}"
+    base_url = endpoint_of(e) or API_BASE_URL
+    details = {
+        **_common_request_details("query", payload, base_url),
+        "phase": phase,
+        "timings_ms": timings_of(e),
+        "health": _HEALTH[base_url].snapshot(),
+        "circuits": _BREAKERS.snapshot(),
+    }
+    if len(_ROUTER) > 1:
+        details["endpoints"] = _ROUTER.snapshot()
+    return {
+        "error": msg,
+        "status": "failed",
+        **echo,
+        "exception_type": f"{e.__class__.__module__}.{e.__class__.__name__}",
+        "request_details": details,
+    }
 
-@mcp.tool()
-async def run_cube_query(
-    cube_query: Dict[str, Any],
-    integration_id: Optional[str] = None
-) -> Dict[str, Any]:
-    """
-    Execute a Cube query on a Definite Cube integration.
-    """
+# -------------------------
+# Query helpers
+# -------------------------
+
+def _sql_payload(sql: str, integration_id: Optional[str]) -> Dict[str, Any]:
+    payload: Dict[str, Any] = {"sql": sql}
+    if integration_id:
+        payload["integration_id"] = integration_id
+    else:
+        # Fallback default integration id from env if present
+        _TABLE_INTEGRATION_ID = os.getenv("_TABLE_INTEGRATION_ID")
+        if _TABLE_INTEGRATION_ID:
+            payload["integration_id"] = _TABLE_INTEGRATION_ID
+    return payload
+
+def _cube_payload(cube_query: Dict[str, Any], integration_id: Optional[str]) -> Dict[str, Any]:
     payload: Dict[str, Any] = {"cube_query": cube_query}
     if integration_id:
         payload["integration_id"] = integration_id
@@ -305,49 +1038,449 @@ async def run_cube_query(
         _CUBE_INTEGRATION_ID = os.getenv("_CUBE_INTEGRATION_ID")
         if _CUBE_INTEGRATION_ID:
             payload["integration_id"] = _CUBE_INTEGRATION_ID
+    return payload
 
+def _progress_fn(ctx: Optional[Context]) -> Optional[ProgressFn]:
+    """ctx.report_progress if the client asked for progress (sent a progressToken)."""
+    if ctx is None:
+        return None
     try:
-        result = await make_api_request("query", payload)
-        return result
+        meta = ctx.request_context.meta
+    except ValueError:   # not inside a request
+        return None
+    if meta is None or getattr(meta, "progressToken", None) is None:
+        return None
+    return ctx.report_progress
 
-    except httpx.HTTPStatusError as e:
-        error_detail = e.response.text
-        try:
-            error_json = json.loads(error_detail)
-            msg = error_json.get("message", "")
-            if msg:
-                if "Something went wrong:" in msg:
-                    msg = msg.split("Something went wrong:", 1)[1].strip() or msg
-                return {
-                    "error": msg,
-                    "status": "failed",
-                    "http_status": e.response.status_code,
-                    "cube_query": cube_query,
-                    "request_details": _common_request_details("query", payload),
-                }
-        except (json.JSONDecodeError, KeyError):
-            pass
+def _call_deadline(timeout_s: Optional[float]) -> Deadline:
+    """Deadline for one tool call: timeout_s if given, else DEFINITE_CALL_TIMEOUT_S."""
+    return Deadline(CALL_TIMEOUT_S if timeout_s is None else timeout_s)
 
-        return {
-            "error": f"HTTP {e.response.status_code}: {error_detail}",
-            "status": "failed",
-            "cube_query": cube_query,
-            "request_details": _common_request_details("query", payload),
-        }
+def _lane_error(lane: Optional[str]) -> Optional[Dict[str, Any]]:
+    if lane is None or lane in LANES:
+        return None
+    return {"error": f"Unknown lane {lane!r}; expected one of {', '.join(LANES)}", "status": "failed"}
 
+async def _run_query(
+    payload: Dict[str, Any],
+    echo: Dict[str, Any],
+    use_cache: bool = True,
+    attempt_deadline_s: float = ATTEMPT_DEADLINE_S,
+    lane: Optional[str] = None,
+    deadline: Optional[Deadline] = None,
+    progress: Optional[ProgressFn] = None,
+) -> Dict[str, Any]:
+    """Run one /v1/query call and return its result or structured error."""
+    error = _lane_error(lane)
+    if error is not None:
+        return {**error, **echo}
+    try:
+        return await make_api_request(
+            "query", payload, use_cache=use_cache, attempt_deadline_s=attempt_deadline_s,
+            lane=lane, deadline=deadline, progress=progress,
+        )
     except Exception as e:
-        phase = _phase_for_exception(e)
-        msg = str(e) or f"Query failed with {e.__class__.__name__}"
+        return _error_payload(e, payload, echo)
+
+async def _run_batch(
+    items: List[Dict[str, Any]],
+    max_concurrency: Optional[int],
+    use_cache: bool,
+    lane: Optional[str] = None,
+    timeout_s: Optional[float] = None,
+) -> Dict[str, Any]:
+    """
+    Run (payload, echo) items concurrently over the shared client, at most
+    max_concurrency at a time, and return results in input order.
+    One deadline covers the whole batch.
+    """
+    error = _lane_error(lane)
+    if error is not None:
+        return error
+    if len(items) > BATCH_MAX_QUERIES:
         return {
-            "error": msg,
+            "error": f"Too many queries in one batch ({len(items)} > {BATCH_MAX_QUERIES})",
             "status": "failed",
-            "cube_query": cube_query,
-            "exception_type": f"{e.__class__.__module__}.{e.__class__.__name__}",
-            "request_details": {
-                **_common_request_details("query", payload),
-                "phase": phase,
-            },
         }
+    limit = min(max_concurrency or BATCH_MAX_CONCURRENCY, BATCH_MAX_CONCURRENCY)
+    sem = asyncio.Semaphore(max(1, limit))
+    deadline = _call_deadline(timeout_s)
+
+    async def one(index: int, item: Dict[str, Any]) -> Dict[str, Any]:
+        async with sem:
+            t0 = time.monotonic()
+            result = await _run_query(item["payload"], item["echo"], use_cache, lane=lane, deadline=deadline)
+            ok = not (isinstance(result, dict) and result.get("status") == "failed")
+            return {
+                "index": index,
+                "ok": ok,
+                "elapsed_ms": round((time.monotonic() - t0) * 1000, 1),
+                "result": result,
+            }
+
+    t0 = time.monotonic()
+    results = await asyncio.gather(*(one(i, item) for i, item in enumerate(items)))
+    failed = sum(1 for r in results if not r["ok"])
+    return {
+        "results": results,
+        "succeeded": len(results) - failed,
+        "failed": failed,
+        "max_concurrency": limit,
+        "elapsed_ms": round((time.monotonic() - t0) * 1000, 1),
+    }
+
+_JOBS = JobRegistry(
+    max_concurrency=JOB_MAX_CONCURRENCY,
+    result_ttl_s=JOB_RESULT_TTL_S,
+    max_jobs=JOB_MAX_RETAINED,
+)
+
+def _submit_job(kind: str, payload: Dict[str, Any], echo: Dict[str, Any]) -> Dict[str, Any]:
+    try:
+        job = _JOBS.submit(
+            kind,
+            # Background jobs are long by definition; keep them out of the fast lane
+            lambda: _run_query(payload, echo, attempt_deadline_s=JOB_ATTEMPT_DEADLINE_S, lane=SLOW),
+        )
+    except JobLimitError as e:
+        return {"error": str(e), "status": "failed", **echo}
+    return job.describe()
+
+# -------------------------
+# Metrics
+# -------------------------
+
+_BREAKER_STATE_VALUES = {"closed": 0, "half_open": 1, "open": 2}
+
+def _rss_bytes() -> Optional[int]:
+    """Current resident set size (Linux), falling back to peak RSS elsewhere."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+    except (ImportError, OSError):
+        return None
+
+def _pool_samples(client: httpx.AsyncClient, name: str) -> Iterable[Sample]:
+    # httpx keeps its httpcore pool private; this is read-only introspection
+    pool = getattr(getattr(client, "_transport", None), "_pool", None)
+    connections = list(getattr(pool, "connections", []) or [])
+    idle = sum(1 for c in connections if c.is_idle())
+    help_text = "Pooled connections by state"
+    yield ("pool_connections", "gauge", help_text, {"client": name, "state": "in_use"}, len(connections) - idle)
+    yield ("pool_connections", "gauge", help_text, {"client": name, "state": "idle"}, idle)
+
+def _state_samples() -> Iterable[Sample]:
+    """Pull gauges from the components that own their own state."""
+    cache = _CACHE.stats()
+    for field in ("hits", "misses", "evictions", "expirations", "rejections"):
+        yield (f"cache_{field}_total", "counter", f"Result cache {field}", {}, cache[field])
+    yield ("cache_entries", "gauge", "Result cache entries", {}, cache["entries"])
+    yield ("cache_bytes", "gauge", "Result cache size in bytes", {}, cache["bytes"])
+
+    inflight = _INFLIGHT.stats()
+    yield ("inflight_requests", "gauge", "Distinct upstream requests in flight", {}, inflight["in_flight"])
+    yield ("coalesced_total", "counter", "Calls served by joining an in-flight request", {}, inflight["coalesced"])
+
+    for key, snap in _BREAKERS.snapshot().items():
+        yield ("circuit_state", "gauge", "Circuit state (0=closed, 1=half_open, 2=open)",
+               {"circuit": key}, _BREAKER_STATE_VALUES[snap["state"]])
+        yield ("circuit_opened_total", "counter", "Times a circuit opened",
+               {"circuit": key}, snap["times_opened"])
+
+    dns = _DNS.snapshot()
+    for result in ("hits", "misses", "stale_served", "errors"):
+        yield ("dns_lookups_total", "counter", "DNS cache lookups by result", {"result": result}, dns[result])
+    connects = _DNS_BACKEND.snapshot()
+    yield ("connect_races_total", "counter", "Connections raced across several addresses", {}, connects["races"])
+    yield ("connect_fallbacks_total", "counter",
+           "Connections won by an address family other than the first tried", {}, connects["fallbacks"])
+
+    limiter = _LIMITER.snapshot()
+    if _LIMITER.enabled:
+        yield ("concurrency_limit", "gauge", "Current adaptive concurrency limit", {}, limiter["limit"])
+        yield ("concurrency_in_flight", "gauge", "Attempts holding a concurrency slot", {}, limiter["in_flight"])
+        yield ("concurrency_queue_depth", "gauge", "Attempts waiting for a concurrency slot", {},
+               limiter["queue_depth"])
+        yield ("concurrency_queued_total", "counter", "Attempts that had to wait for a slot", {}, limiter["queued"])
+        yield ("concurrency_limit_decreases_total", "counter", "Times the concurrency limit backed off", {},
+               limiter["decreases"])
+        for lane, snap in limiter["lanes"].items():
+            yield ("lane_in_flight", "gauge", "Attempts holding a concurrency slot per lane",
+                   {"lane": lane}, snap["in_flight"])
+            yield ("lane_queue_depth", "gauge", "Attempts waiting for a slot per lane",
+                   {"lane": lane}, snap["queue_depth"])
+            yield ("lane_shed_total", "counter", "Calls rejected as overloaded because the lane queue was full",
+                   {"lane": lane}, snap["shed"])
+
+    for name, bucket in _RATE_LIMITER.snapshot().items():
+        yield ("rate_limit_delayed_total", "counter", "Attempts delayed by a client-side rate limit",
+               {"bucket": name}, bucket["delayed"])
+        yield ("rate_limit_wait_seconds_total", "counter", "Time attempts spent waiting on a rate limit",
+               {"bucket": name}, bucket["wait_s_total"])
+        yield ("rate_limit_skipped_total", "counter",
+               "Optional requests (hedges, status polls) skipped for lack of a rate-limit token",
+               {"bucket": name}, bucket["skipped"])
+
+    warmer = _WARMER.snapshot()
+    yield ("warmup_requests_total", "counter", "Connection warm-up requests by result",
+           {"result": "ok"}, warmer["warmups"])
+    yield ("warmup_requests_total", "counter", "Connection warm-up requests by result",
+           {"result": "failed"}, warmer["failures"])
+
+    budget = _RETRY_BUDGET.snapshot()
+    yield ("retry_budget_exhausted_total", "counter", "Retries denied by the retry budget", {}, budget["exhausted"])
+
+    for url, monitor in _HEALTH.items():
+        reachable = monitor.healthy
+        if reachable is not None:
+            yield ("api_reachable", "gauge", "Last health probe succeeded (1) or failed (0)",
+                   {"endpoint": url}, int(reachable))
+
+    for url, snap in _ROUTER.snapshot().items():
+        if snap["ewma_ms"] is not None:
+            yield ("endpoint_latency_ewma_seconds", "gauge", "EWMA time to response headers per endpoint",
+                   {"endpoint": url}, snap["ewma_ms"] / 1000)
+        yield ("endpoint_in_flight", "gauge", "Requests in flight per endpoint", {"endpoint": url}, snap["in_flight"])
+
+    for status, n in _JOBS.stats().items():
+        yield ("jobs", "gauge", "Background query jobs by status", {"status": status}, n)
+
+    rss = _rss_bytes()
+    if rss is not None:
+        yield ("process_resident_memory_bytes", "gauge", "Resident memory of this server process", {}, rss)
+
+    yield from _pool_samples(_HTTP, "primary")
+    yield from _pool_samples(_HEDGE_HTTP, "hedge")
+    if _HTTP2 is not None:
+        yield from _pool_samples(_HTTP2, "http2")
+
+    for url, snap in _PROTOCOLS.snapshot().items():
+        for protocol in ("http2", "http1.1"):
+            yield ("endpoint_protocol", "gauge", "Protocol each endpoint is currently using (1 = in use)",
+                   {"endpoint": url, "protocol": protocol}, int(snap["protocol"] == protocol))
+        yield ("http2_fallbacks_total", "counter", "Times an endpoint fell back from HTTP/2 to HTTP/1.1",
+               {"endpoint": url}, snap["fallbacks"])
+
+    for (phase, path, integration), hist in _PHASE_HISTS.items():
+        if phase != "total":
+            continue
+        for q in (0.5, 0.95, 0.99):
+            value = hist.quantile(q)
+            if value is not None:
+                yield ("request_latency_quantile_seconds", "gauge",
+                       "Estimated attempt latency quantiles",
+                       {"path": path, "integration": integration, "quantile": str(q)}, value / 1000)
+
+def _phase_histograms():
+    for (phase, path, integration), hist in _PHASE_HISTS.items():
+        yield {"phase": phase, "path": path, "integration": integration}, hist
+
+_METRICS.register_collector(_state_samples)
+_METRICS.register_histograms(
+    "request_phase_seconds", "Attempt phase durations", _phase_histograms,
+)
+
+_METRICS_EXPORTER = TextfileExporter(_METRICS, METRICS_TEXTFILE, METRICS_INTERVAL_S)
+
+# -------------------------
+# MCP server
+# -------------------------
+
+@asynccontextmanager
+async def _lifespan(server: FastMCP) -> AsyncIterator[None]:
+    # Probe and warm up immediately so the first tool call already has
+    # health state and an open connection
+    for monitor in _HEALTH.values():
+        monitor.ensure_started()
+    _WARMER.ensure_started()
+    _METRICS_EXPORTER.ensure_started()
+    try:
+        yield
+    finally:
+        try:
+            for monitor in _HEALTH.values():
+                await monitor.stop()
+            await _WARMER.stop()
+            await _METRICS_EXPORTER.stop()
+            if _CANCELS:
+                # Let pending upstream cancels go out before the clients close
+                await asyncio.wait(set(_CANCELS), timeout=HEALTH_TIMEOUT_S)
+        finally:
+            # Close the clients even if stopping a background task failed
+            await _HTTP.aclose()
+            await _HEDGE_HTTP.aclose()
+            if _HTTP2 is not None:
+                await _HTTP2.aclose()
+
+mcp = FastMCP("definite-api", lifespan=_lifespan)
+
+# -------------------------
+# MCP tools
+# -------------------------
+
+@mcp.tool()
+async def run_sql_query(
+    sql: str,
+    integration_id: Optional[str] = None,
+    use_cache: bool = True,
+    lane: Optional[str] = None,
+    timeout_s: Optional[float] = None,
+    ctx: Optional[Context] = None,
+) -> Dict[str, Any]:
+    """
+    Execute a SQL query on a Definite database integration.
+    Set use_cache=False to bypass recently cached results.
+    Set lane="fast" or "slow" to override the scheduling lane inferred from past run times.
+    timeout_s bounds the whole call, retries included (0 = no limit).
+    """
+    return await _run_query(
+        _sql_payload(sql, integration_id), {"query": sql}, use_cache,
+        lane=lane, deadline=_call_deadline(timeout_s),
+        progress=_progress_fn(ctx),
+    )
+
+
+@mcp.tool()
+async def run_cube_query(
+    cube_query: Dict[str, Any],
+    integration_id: Optional[str] = None,
+    use_cache: bool = True,
+    lane: Optional[str] = None,
+    timeout_s: Optional[float] = None,
+    ctx: Optional[Context] = None,
+) -> Dict[str, Any]:
+    """
+    Execute a Cube query on a Definite Cube integration.
+    Set use_cache=False to bypass recently cached results.
+    Set lane="fast" or "slow" to override the scheduling lane inferred from past run times.
+    timeout_s bounds the whole call, retries included (0 = no limit).
+    """
+    return await _run_query(
+        _cube_payload(cube_query, integration_id), {"cube_query": cube_query}, use_cache,
+        lane=lane, deadline=_call_deadline(timeout_s),
+        progress=_progress_fn(ctx),
+    )
+
+
+@mcp.tool()
+async def run_sql_queries(
+    queries: List[str],
+    integration_id: Optional[str] = None,
+    max_concurrency: Optional[int] = None,
+    use_cache: bool = True,
+    lane: Optional[str] = None,
+    timeout_s: Optional[float] = None,
+) -> Dict[str, Any]:
+    """
+    Execute several SQL queries concurrently on one integration.
+    Results come back in input order, each with its own timing and error.
+    lane="fast"/"slow" applies to every query; by default each one's is inferred.
+    timeout_s bounds the whole batch (0 = no limit).
+    """
+    items = [
+        {"payload": _sql_payload(sql, integration_id), "echo": {"query": sql}}
+        for sql in queries
+    ]
+    return await _run_batch(items, max_concurrency, use_cache, lane, timeout_s)
+
+
+@mcp.tool()
+async def run_cube_queries(
+    cube_queries: List[Dict[str, Any]],
+    integration_id: Optional[str] = None,
+    max_concurrency: Optional[int] = None,
+    use_cache: bool = True,
+    lane: Optional[str] = None,
+    timeout_s: Optional[float] = None,
+) -> Dict[str, Any]:
+    """
+    Execute several Cube queries concurrently on one integration.
+    Results come back in input order, each with its own timing and error.
+    lane="fast"/"slow" applies to every query; by default each one's is inferred.
+    timeout_s bounds the whole batch (0 = no limit).
+    """
+    items = [
+        {"payload": _cube_payload(q, integration_id), "echo": {"cube_query": q}}
+        for q in cube_queries
+    ]
+    return await _run_batch(items, max_concurrency, use_cache, lane, timeout_s)
+
+
+@mcp.tool()
+async def submit_sql_query(sql: str, integration_id: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Start a long-running SQL query in the background and return its job_id.
+    Poll with get_query_status, collect with fetch_query_result, or stop
+    it with cancel_query_job.
+    """
+    return _submit_job("sql", _sql_payload(sql, integration_id), {"query": sql})
+
+
+@mcp.tool()
+async def submit_cube_query(
+    cube_query: Dict[str, Any],
+    integration_id: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Start a long-running Cube query in the background and return its job_id.
+    Poll with get_query_status, collect with fetch_query_result, or stop
+    it with cancel_query_job.
+    """
+    return _submit_job(
+        "cube", _cube_payload(cube_query, integration_id), {"cube_query": cube_query},
+    )
+
+
+@mcp.tool()
+async def get_query_status(job_id: str) -> Dict[str, Any]:
+    """
+    Report the status of a background query job.
+    """
+    job = _JOBS.get(job_id)
+    if job is None:
+        return {"error": f"Unknown or expired job_id: {job_id}", "status": "failed"}
+    return job.describe()
+
+
+@mcp.tool()
+async def fetch_query_result(job_id: str) -> Dict[str, Any]:
+    """
+    Return the result of a finished background query job and release it.
+    Returns the job status instead if the query is still running.
+    """
+    job = _JOBS.pop(job_id)
+    if job is None:
+        return {"error": f"Unknown or expired job_id: {job_id}", "status": "failed"}
+    if job.result is None:
+        return job.describe()
+    return job.result
+
+
+@mcp.tool()
+async def cancel_query_job(job_id: str) -> Dict[str, Any]:
+    """
+    Cancel a queued or running background query job; a running query is
+    also cancelled on the API. Finished jobs are left as they are.
+    """
+    job = await _JOBS.cancel(job_id)
+    if job is None:
+        return {"error": f"Unknown or expired job_id: {job_id}", "status": "failed"}
+    return job.describe()
+
+@mcp.resource(
+    "definite://metrics",
+    name="metrics",
+    description="Request, retry, cache, circuit, pool and latency metrics for this server",
+    mime_type="application/json",
+)
+def metrics_resource() -> str:
+    return json.dumps(_METRICS.snapshot(), indent=2)
 
 # -------------------------
 # Entrypoint
@@ -355,8 +1488,19 @@ async def run_cube_query(
 
 def main():
     """Entry point for the definite-mcp command"""
-    # Note: FastMCP is long-lived; we intentionally keep _HTTP open for reuse.
-    # If you add a shutdown hook in the future, call: await _HTTP.aclose()
+    print("Definite MCP Server starting...", file=sys.stderr)
+    print(f"API Base URL: {', '.join(API_BASE_URLS)}", file=sys.stderr)
+    print(f"API Key configured: {'Yes' if bool(API_KEY) else 'No'}", file=sys.stderr)
+
+    # Checked here rather than at import so submodules (mock server, bench)
+    # can be imported without credentials
+    if not API_KEY:
+        print("ERROR: DEFINITE_API_KEY environment variable is required", file=sys.stderr)
+        print("Make sure to set DEFINITE_API_KEY in your MCP configuration", file=sys.stderr)
+        sys.exit(1)
+
+    # Note: FastMCP is long-lived; _HTTP stays open for reuse and is
+    # closed by _lifespan on shutdown.
     mcp.run()
 
 if __name__ == "__main__":
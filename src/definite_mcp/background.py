@@ -0,0 +1,50 @@
+"""
+Lifecycle for the server's long-running background loops.
+
+The health monitor, connection warmer and metrics textfile exporter each
+run one loop per event loop: started lazily from the request path,
+restarted if it died or belongs to a loop that has since gone away, and
+cancelled on shutdown.
+"""
+
+import asyncio
+from typing import Any, Callable, Coroutine, Optional
+
+
+def retrieve_exception(task: asyncio.Future) -> None:
+    """Retrieve the exception so an unawaited failure isn't logged as lost."""
+    if not task.cancelled():
+        task.exception()
+
+
+class BackgroundTask:
+    """
+    At most one running `run()` coroutine on the current event loop.
+    """
+
+    def __init__(self, run: Callable[[], Coroutine[Any, Any, None]], name: str) -> None:
+        self._run = run
+        self.name = name
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def ensure_started(self) -> bool:
+        """Start the loop on the running event loop; True if it wasn't already running there."""
+        loop = asyncio.get_running_loop()
+        if self.running and self._task.get_loop() is loop:
+            return False
+        self._task = loop.create_task(self._run(), name=self.name)
+        return True
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is None or task.done():
+            return
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
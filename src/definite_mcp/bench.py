@@ -0,0 +1,258 @@
+"""
+Load-testing harness for the Definite MCP server.
+
+Spawns the server (`python -m definite_mcp`, i.e. main()) over stdio like a
+real MCP client would, points it at a mock Definite API, and drives
+concurrent run_sql_query / run_cube_query tool calls. Reports throughput,
+latency percentiles, error rate and the server's RSS.
+
+    definite-mcp-bench --requests 500 --concurrency 32 --mock-latency lognormal:80,0.6 \
+        --server-env DEFINITE_MAX_CONNECTIONS=10
+
+By default an in-process mock_server is started; pass --base-url to target
+an already running mock (or any other API) instead.
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+from typing import Optional, Dict, Any, List, Tuple
+
+from mcp import ClientSession, StdioServerParameters
+from mcp.client.stdio import stdio_client
+
+from .mock_server import MockServer, add_mock_arguments, config_from_args
+
+_SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def percentile(sorted_values: List[float], q: float) -> Optional[float]:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(1, min(len(sorted_values), int(round(q * len(sorted_values) + 0.5))))
+    return sorted_values[rank - 1]
+
+
+def _parse_mix(spec: str) -> List[Tuple[str, float]]:
+    """"sql=0.8,cube=0.2" -> [("sql", 0.8), ("cube", 0.2)]"""
+    mix = []
+    for part in spec.split(","):
+        kind, _, weight = part.partition("=")
+        kind = kind.strip()
+        if kind not in ("sql", "cube"):
+            raise argparse.ArgumentTypeError(f"unknown query kind {kind!r} in --mix")
+        mix.append((kind, float(weight or 1)))
+    return mix
+
+
+def _tool_failed(result: Any) -> Optional[str]:
+    """Return an error label if a CallToolResult represents a failure."""
+    if getattr(result, "isError", False):
+        return "tool_error"
+    payload = getattr(result, "structuredContent", None)
+    if isinstance(payload, dict) and "result" in payload and len(payload) == 1:
+        payload = payload["result"]
+    if payload is None:
+        for block in getattr(result, "content", None) or []:
+            text = getattr(block, "text", None)
+            if text:
+                try:
+                    payload = json.loads(text)
+                except json.JSONDecodeError:
+                    pass
+                break
+    if isinstance(payload, dict) and payload.get("status") == "failed":
+        details = payload.get("request_details") or {}
+        return str(payload.get("http_status") or details.get("phase") or "failed")
+    return None
+
+
+class _Workload:
+    """Deterministic stream of (tool name, arguments) calls."""
+
+    def __init__(self, args: argparse.Namespace) -> None:
+        self.rng = random.Random(args.seed)
+        self.mix = args.mix
+        self.rows = args.result_rows
+        self.repeat_ratio = args.repeat_ratio
+        self._issued: List[Tuple[str, Dict[str, Any]]] = []
+
+    def next(self, i: int) -> Tuple[str, Dict[str, Any]]:
+        if self._issued and self.rng.random() < self.repeat_ratio:
+            return self.rng.choice(self._issued)
+        kinds, weights = zip(*self.mix)
+        kind = self.rng.choices(kinds, weights)[0]
+        rows = self.rng.choice(self.rows)
+        if kind == "sql":
+            call = ("run_sql_query", {"sql": f"SELECT {i} /* mock: rows={rows} */"})
+        else:
+            call = ("run_cube_query", {"cube_query": {
+                "measures": ["bench.count"], "limit": i, "mock": {"rows": rows},
+            }})
+        self._issued.append(call)
+        return call
+
+
+async def _drive(session: ClientSession, args: argparse.Namespace) -> Dict[str, Any]:
+    workload = _Workload(args)
+    latencies: List[float] = []
+    errors: Dict[str, int] = {}
+    next_index = 0
+    lock = asyncio.Lock()
+
+    async def worker() -> None:
+        nonlocal next_index
+        while True:
+            async with lock:
+                if next_index >= args.requests:
+                    return
+                i = next_index
+                next_index += 1
+                name, arguments = workload.next(i)
+            t0 = time.perf_counter()
+            try:
+                result = await session.call_tool(name, arguments)
+                label = _tool_failed(result)
+            except Exception as e:
+                label = e.__class__.__name__
+            latencies.append((time.perf_counter() - t0) * 1000)
+            if label:
+                errors[label] = errors.get(label, 0) + 1
+
+    for i in range(args.warmup):
+        name, arguments = workload.next(-1 - i)
+        await session.call_tool(name, arguments)
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+    elapsed = time.perf_counter() - t0
+
+    ordered = sorted(latencies)
+    n_errors = sum(errors.values())
+    return {
+        "requests": len(latencies),
+        "concurrency": args.concurrency,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(len(latencies) / elapsed, 2) if elapsed > 0 else None,
+        "latency_ms": {
+            "p50": _round(percentile(ordered, 0.50)),
+            "p95": _round(percentile(ordered, 0.95)),
+            "p99": _round(percentile(ordered, 0.99)),
+            "max": _round(ordered[-1] if ordered else None),
+            "mean": _round(sum(ordered) / len(ordered) if ordered else None),
+        },
+        "error_rate": round(n_errors / len(latencies), 4) if latencies else None,
+        "errors": errors,
+    }
+
+
+def _round(v: Optional[float]) -> Optional[float]:
+    return round(v, 2) if v is not None else None
+
+
+async def _server_rss(session: ClientSession) -> Optional[int]:
+    try:
+        res = await session.read_resource("definite://metrics")  # type: ignore[arg-type]
+        snapshot = json.loads(res.contents[0].text)  # type: ignore[union-attr]
+        series = snapshot["gauges"].get("process_resident_memory_bytes") or []
+        return int(series[0]["value"]) if series else None
+    except Exception:
+        return None
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    mock: Optional[MockServer] = None
+    base_url = args.base_url
+    if not base_url:
+        mock = await MockServer(config_from_args(args)).start()
+        base_url = mock.base_url
+
+    env = dict(os.environ)
+    env.update({
+        "DEFINITE_API_KEY": env.get("DEFINITE_API_KEY") or "bench",
+        "DEFINITE_API_BASE_URL": base_url,
+        "LOG_LEVEL": args.server_log_level,
+        "PYTHONPATH": os.pathsep.join(p for p in (_SRC_DIR, env.get("PYTHONPATH")) if p),
+    })
+    if not args.cache:
+        env["DEFINITE_CACHE_TTL_S"] = "0"
+    for item in args.server_env:
+        key, _, value = item.partition("=")
+        env[key] = value
+
+    params = StdioServerParameters(command=sys.executable, args=["-m", "definite_mcp"], env=env)
+    try:
+        async with stdio_client(params) as (read, write):
+            async with ClientSession(read, write) as session:
+                t0 = time.perf_counter()
+                await session.initialize()
+                init_ms = (time.perf_counter() - t0) * 1000
+                report = await _drive(session, args)
+                report["initialize_ms"] = round(init_ms, 2)
+                report["server_rss_bytes"] = await _server_rss(session)
+    finally:
+        if mock is not None:
+            report_mock = dict(mock.stats)
+            await mock.stop()
+        else:
+            report_mock = None
+    report["base_url"] = base_url
+    report["mock_stats"] = report_mock
+    report["server_env"] = args.server_env
+    return report
+
+
+def _print_report(report: Dict[str, Any]) -> None:
+    lat = report["latency_ms"]
+    rss = report.get("server_rss_bytes")
+    print(f"requests       {report['requests']} @ concurrency {report['concurrency']}")
+    print(f"elapsed        {report['elapsed_s']}s")
+    print(f"throughput     {report['throughput_rps']} req/s")
+    print(f"latency (ms)   p50={lat['p50']} p95={lat['p95']} p99={lat['p99']} "
+          f"max={lat['max']} mean={lat['mean']}")
+    print(f"error rate     {report['error_rate']} {report['errors'] or ''}")
+    print(f"server RSS     {rss / (1024 * 1024):.1f} MiB" if rss else "server RSS     n/a")
+    print(f"initialize     {report['initialize_ms']}ms")
+    if report.get("mock_stats"):
+        print(f"mock           {report['mock_stats']}")
+
+
+def _parse_args(argv: Optional[list] = None) -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Load test the Definite MCP server over stdio")
+    p.add_argument("--requests", type=int, default=200, help="total tool calls")
+    p.add_argument("--concurrency", type=int, default=16, help="concurrent in-flight tool calls")
+    p.add_argument("--warmup", type=int, default=5, help="sequential calls before measuring")
+    p.add_argument("--mix", type=_parse_mix, default=_parse_mix("sql=0.8,cube=0.2"),
+                   help='query mix, e.g. "sql=0.8,cube=0.2"')
+    p.add_argument("--result-rows", type=lambda s: [int(x) for x in s.split(",")], default=[10],
+                   help="comma-separated result sizes to sample from, e.g. 10,1000,100000")
+    p.add_argument("--repeat-ratio", type=float, default=0.0,
+                   help="fraction of calls that repeat an earlier query (cache/coalescing)")
+    p.add_argument("--cache", action="store_true", help="leave the server's result cache enabled")
+    p.add_argument("--seed", type=int, default=1)
+    p.add_argument("--base-url", default=None, help="use this API instead of an in-process mock")
+    p.add_argument("--server-env", action="append", default=[], metavar="KEY=VALUE",
+                   help="extra environment for the server (repeatable)")
+    p.add_argument("--server-log-level", default="WARNING")
+    p.add_argument("--json", action="store_true", help="print the report as JSON")
+    add_mock_arguments(p, prefix="mock-")
+    return p.parse_args(argv)
+
+
+def main(argv: Optional[list] = None) -> None:
+    """Entry point for the definite-mcp-bench command"""
+    args = _parse_args(argv)
+    report = asyncio.run(run(args))
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        _print_report(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Circuit breakers for the Definite API.
+
+A breaker opens after `failure_threshold` consecutive failures and fails
+calls fast while open. After `reset_timeout_s` it goes half-open and lets a
+single trial request through: success closes it, failure re-opens it.
+"""
+
+import time
+import logging
+from typing import Optional, Dict, Any
+
+log = logging.getLogger("definite-mcp")
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of sending a request while a breaker is open."""
+
+    def __init__(self, name: str, retry_after_s: float) -> None:
+        super().__init__(
+            f"Circuit breaker open for {name}; failing fast (retry in {retry_after_s:.1f}s)"
+        )
+        self.name = name
+        self.retry_after_s = retry_after_s
+
+
+class CircuitBreaker:
+    def __init__(self, name: str, failure_threshold: int, reset_timeout_s: float) -> None:
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout_s = reset_timeout_s
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.times_opened = 0
+        self._trial_started: Optional[float] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.failure_threshold > 0
+
+    @property
+    def blocked(self) -> bool:
+        """Whether check() would raise right now, without its side effects."""
+        if not self.enabled or self.state == CLOSED:
+            return False
+        now = time.monotonic()
+        if self.state == OPEN:
+            return now < self.opened_at + self.reset_timeout_s
+        return self._trial_started is not None and now - self._trial_started < self.reset_timeout_s
+
+    def check(self) -> bool:
+        """
+        Raise CircuitOpenError unless a request may be sent now. Returns True
+        when the caller now holds the half-open trial, and must report it.
+        """
+        if not self.enabled or self.state == CLOSED:
+            return False
+        now = time.monotonic()
+        if self.state == OPEN:
+            remaining = self.opened_at + self.reset_timeout_s - now
+            if remaining > 0:
+                raise CircuitOpenError(self.name, remaining)
+            self.state = HALF_OPEN
+            self._trial_started = None
+            log.info("circuit %s half-open; sending trial request", self.name)
+        # Half-open: exactly one trial at a time. A trial that never reports
+        # back (e.g. cancelled) is considered abandoned after the reset timeout.
+        if self._trial_started is not None and now - self._trial_started < self.reset_timeout_s:
+            raise CircuitOpenError(self.name, self._trial_started + self.reset_timeout_s - now)
+        self._trial_started = now
+        return True
+
+    def release_trial(self) -> None:
+        """Give up a half-open trial without a verdict, so the next request may probe."""
+        if self.state == HALF_OPEN:
+            self._trial_started = None
+
+    def record_success(self) -> None:
+        if self.state != CLOSED:
+            log.info("circuit %s closed", self.name)
+        self.state = CLOSED
+        self.failures = 0
+        self._trial_started = None
+
+    def record_failure(self) -> None:
+        if not self.enabled:
+            return
+        self.failures += 1
+        if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != OPEN:
+                self.times_opened += 1
+                log.warning("circuit %s open after %d failure(s)", self.name, self.failures)
+            self.state = OPEN
+            self.opened_at = time.monotonic()
+            self._trial_started = None
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "times_opened": self.times_opened,
+        }
+
+
+class BreakerRegistry:
+    """Lazily creates one breaker per key (base URL, integration id, ...)."""
+
+    def __init__(self, failure_threshold: int, reset_timeout_s: float) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_timeout_s = reset_timeout_s
+        self._breakers: Dict[str, CircuitBreaker] = {}
+
+    def get(self, key: str) -> CircuitBreaker:
+        breaker = self._breakers.get(key)
+        if breaker is None:
+            breaker = CircuitBreaker(key, self.failure_threshold, self.reset_timeout_s)
+            self._breakers[key] = breaker
+        return breaker
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        return {key: b.snapshot() for key, b in self._breakers.items()}
@@ -0,0 +1,162 @@
+"""
+In-process result cache for Definite API queries.
+
+Entries carry their own TTL and an approximate byte size (the size of the
+response body they were decoded from). When the total size exceeds the
+memory ceiling, least-recently-used entries are evicted first.
+
+Only read-only queries are cached (see is_read_only); a write must reach
+the API every time it is sent.
+"""
+
+import re
+import json
+import time
+import functools
+from collections import OrderedDict
+from typing import Optional, Dict, Any, Tuple, Hashable
+
+CacheKey = Tuple[str, str, Optional[str]]
+
+
+def cache_key(endpoint: str, payload: Dict[str, Any]) -> CacheKey:
+    """
+    Key on (endpoint, normalized payload, integration_id). SQL is stripped of
+    surrounding whitespace; everything else is compared as canonical JSON.
+    """
+    body = dict(payload)
+    integration_id = body.pop("integration_id", None)
+    if isinstance(body.get("sql"), str):
+        body["sql"] = body["sql"].strip()
+    normalized = json.dumps(body, sort_keys=True, separators=(",", ":"), default=str)
+    return (endpoint.strip("/"), normalized, integration_id)
+
+
+# Comments and quoted strings/identifiers, which may contain any keyword
+_SQL_NOISE = re.compile(r"--[^\n]*|/\*.*?\*/|'(?:[^']|'')*'|\"(?:[^\"]|\"\")*\"", re.S)
+_READ_STATEMENTS = {"select", "with", "show", "describe", "desc"}
+# Writes that can hide inside a read statement (data-modifying CTEs, SELECT INTO)
+_WRITE_WORDS = re.compile(
+    r"\b(insert|update|delete|merge|into|create|drop|alter|truncate|copy|grant|revoke|attach|detach)\b",
+    re.I,
+)
+
+
+def is_read_only(payload: Dict[str, Any]) -> bool:
+    """
+    True for Cube queries and for SQL made only of SELECT/WITH/SHOW/DESCRIBE
+    statements with no write keyword anywhere. Errs on the side of False.
+    """
+    sql = payload.get("sql")
+    return _sql_is_read_only(sql) if isinstance(sql, str) else True
+
+
+@functools.lru_cache(maxsize=1024)
+def _sql_is_read_only(sql: str) -> bool:
+    code = _SQL_NOISE.sub(" ", sql)
+    statements = [s for s in code.split(";") if s.strip()]
+    if not statements:
+        return False
+    for statement in statements:
+        first = re.match(r"[\s(]*(\w+)", statement)
+        if first is None or first.group(1).lower() not in _READ_STATEMENTS:
+            return False
+    return _WRITE_WORDS.search(code) is None
+
+
+class ResultCache:
+    """TTL + byte-size-aware LRU. Not thread-safe; use from one event loop."""
+
+    def __init__(self, max_bytes: int, default_ttl_s: float) -> None:
+        self.max_bytes = max_bytes
+        self.default_ttl_s = default_ttl_s
+        # key -> (expires_at, size, value); order is LRU -> MRU
+        self._entries: "OrderedDict[Hashable, Tuple[float, int, Any]]" = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.rejections = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0 and self.default_ttl_s > 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, size, value = entry
+        if expires_at <= time.monotonic():
+            self._drop(key, size)
+            self.expirations += 1
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key: Hashable, value: Any, size: int, ttl_s: Optional[float] = None) -> bool:
+        """Store `value`; returns False if it is larger than the whole cache."""
+        ttl = self.default_ttl_s if ttl_s is None else ttl_s
+        if ttl <= 0:
+            return False
+        if size > self.max_bytes:
+            self.rejections += 1
+            return False
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._bytes -= old[1]
+        self._entries[key] = (time.monotonic() + ttl, size, value)
+        self._bytes += size
+        self._evict()
+        return True
+
+    def invalidate(self, key: Optional[Hashable] = None) -> None:
+        """Drop one key, or everything when key is None."""
+        if key is None:
+            self._entries.clear()
+            self._bytes = 0
+            return
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._drop(key, entry[1])
+
+    def invalidate_integration(self, integration_id: Optional[str]) -> None:
+        """Drop every entry for one integration (keys are CacheKey tuples)."""
+        for key, (_, size, _) in list(self._entries.items()):
+            if isinstance(key, tuple) and key[2] == integration_id:
+                self._drop(key, size)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 3) if lookups else None,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "rejections": self.rejections,
+        }
+
+    def _drop(self, key: Hashable, size: int) -> None:
+        del self._entries[key]
+        self._bytes -= size
+
+    def _evict(self) -> None:
+        now = time.monotonic()
+        # Expired entries go first, then LRU until we fit
+        if self._bytes > self.max_bytes:
+            for key, (expires_at, size, _) in list(self._entries.items()):
+                if expires_at <= now:
+                    self._drop(key, size)
+                    self.expirations += 1
+        while self._bytes > self.max_bytes and self._entries:
+            key, (_, size, _) = self._entries.popitem(last=False)
+            self._bytes -= size
+            self.evictions += 1
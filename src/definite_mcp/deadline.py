@@ -0,0 +1,83 @@
+"""
+End-to-end deadline for one tool call.
+
+A Deadline is created once per call and threaded through queueing,
+attempts and retry backoff, so each step only gets the time that is left:
+attempt deadlines are capped at the remaining budget, limiter waits give
+up when it runs out, and a retry is skipped when its backoff plus a
+typical attempt would not fit.
+"""
+
+import time
+import asyncio
+from typing import Optional, Awaitable, TypeVar
+
+T = TypeVar("T")
+
+
+class DeadlineExceeded(Exception):
+    """The call's overall timeout ran out."""
+
+    def __init__(self, timeout_s: float, during: str) -> None:
+        super().__init__(f"Call timeout of {timeout_s:g}s exceeded {during}")
+        self.timeout_s = timeout_s
+        self.during = during
+
+
+class Deadline:
+    """Overall time budget for one call; timeout_s None or <= 0 means unbounded."""
+
+    __slots__ = ("timeout_s", "expires_at")
+
+    def __init__(self, timeout_s: Optional[float] = None) -> None:
+        self.timeout_s = timeout_s if timeout_s is not None and timeout_s > 0 else None
+        self.expires_at = time.monotonic() + self.timeout_s if self.timeout_s is not None else None
+
+    def copy(self) -> "Deadline":
+        other = Deadline()
+        other.timeout_s, other.expires_at = self.timeout_s, self.expires_at
+        return other
+
+    def extend(self, other: "Deadline") -> None:
+        """Stretch this budget to also cover other's (work shared by several calls)."""
+        if self.expires_at is None or other.expires_at is None:
+            self.timeout_s = self.expires_at = None
+        elif other.expires_at > self.expires_at:
+            self.timeout_s, self.expires_at = other.timeout_s, other.expires_at
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left, or None when unbounded."""
+        if self.expires_at is None:
+            return None
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def cap(self, seconds: float) -> float:
+        """seconds, shortened to what is left of the budget."""
+        remaining = self.remaining()
+        return seconds if remaining is None else min(seconds, remaining)
+
+    def allows(self, seconds: float) -> bool:
+        """Whether `seconds` more still fit within the budget."""
+        remaining = self.remaining()
+        return remaining is None or seconds < remaining
+
+    def check(self, during: str) -> None:
+        if self.remaining() == 0.0:
+            raise DeadlineExceeded(self.timeout_s or 0.0, during)
+
+    async def wait(self, aw: Awaitable[T], during: str, grace_s: float = 0.0) -> T:
+        """
+        Await aw, raising DeadlineExceeded if the budget (plus grace_s) runs
+        out first. A grace lets work that enforces the same deadline itself
+        fail with its own, more specific error.
+        """
+        remaining = self.remaining()
+        if remaining is None:
+            return await aw
+        try:
+            return await asyncio.wait_for(aw, timeout=remaining + grace_s)
+        except asyncio.TimeoutError:
+            if self.remaining():
+                # aw's own timeout (e.g. an attempt deadline), not ours
+                raise
+            raise DeadlineExceeded(self.timeout_s or 0.0, during) from None
@@ -0,0 +1,335 @@
+"""
+Non-blocking DNS resolution with a TTL cache, plugged into httpcore.
+
+getaddrinfo() runs in the event loop's default executor, never on the loop
+thread itself. Answers are cached per (host, port) for ttl_s; concurrent
+lookups of the same name share one resolution, and when a re-resolution
+fails the last good answer keeps being served for up to stale_s so a
+resolver blip doesn't fail calls that would otherwise connect fine.
+
+getaddrinfo() does not expose record TTLs, so ttl_s is a fixed upper bound;
+keep it at or below the TTL the API's records are published with.
+
+CachingBackend is an httpcore network backend that resolves through the
+cache, so the connection pool never calls the blocking resolver itself.
+With several addresses it races them "happy eyeballs" style (RFC 8305):
+families are interleaved, starting with the one that last won for the host,
+and the next attempt starts after stagger_s or as soon as the previous one
+fails. The first connection wins and the rest are cancelled, so one
+blackholed address costs a stagger delay instead of a full connect timeout.
+TLS still verifies against the original hostname (httpcore passes it as
+server_hostname separately).
+"""
+
+import time
+import socket
+import asyncio
+import logging
+import ipaddress
+from itertools import zip_longest
+from typing import Optional, Dict, Any, List, Set, Tuple, Iterable
+
+import httpx
+import httpcore
+from httpcore import AsyncNetworkBackend, AsyncNetworkStream
+from httpcore._backends.auto import AutoBackend
+
+from .tracing import CURRENT_TRACE
+from .background import retrieve_exception
+
+log = logging.getLogger("definite-mcp")
+
+# (address family, address) in resolver order
+Address = Tuple[int, str]
+
+
+class _Entry:
+    __slots__ = ("addresses", "resolved_at", "expires_at")
+
+    def __init__(self, addresses: List[Address], ttl_s: float) -> None:
+        self.addresses = addresses
+        self.resolved_at = time.monotonic()
+        self.expires_at = self.resolved_at + ttl_s
+
+
+def _literal(host: str) -> Optional[Address]:
+    try:
+        ip = ipaddress.ip_address(host.strip("[]"))
+    except ValueError:
+        return None
+    return (socket.AF_INET6 if ip.version == 6 else socket.AF_INET, str(ip))
+
+
+class DnsCache:
+    """Async resolver with per-name TTL caching. Use from one event loop."""
+
+    def __init__(self, ttl_s: float = 60.0, stale_s: float = 300.0) -> None:
+        self.ttl_s = ttl_s
+        self.stale_s = stale_s
+        self._entries: Dict[Tuple[str, int], _Entry] = {}
+        self._pending: Dict[Tuple[str, int], "asyncio.Task[List[Address]]"] = {}
+        self.hits = 0
+        self.misses = 0
+        self.stale_served = 0
+        self.errors = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_s > 0
+
+    async def resolve(self, host: str, port: int) -> List[Address]:
+        """Addresses for host:port, from cache when fresh. Raises OSError on failure."""
+        literal = _literal(host)
+        if literal is not None:
+            return [literal]
+
+        key = (host, port)
+        entry = self._entries.get(key)
+        if entry is not None and time.monotonic() < entry.expires_at:
+            self.hits += 1
+            return entry.addresses
+
+        self.misses += 1
+        task = self._pending.get(key)
+        if task is None or task.get_loop() is not asyncio.get_running_loop():
+            task = asyncio.ensure_future(self._lookup(host, port))
+            self._pending[key] = task
+            task.add_done_callback(lambda _t, k=key, t=task: self._forget(k, t))
+        try:
+            # Shielded: one caller giving up must not cancel the shared lookup
+            return await asyncio.shield(task)
+        except OSError:
+            self.errors += 1
+            if entry is not None and time.monotonic() - entry.expires_at < self.stale_s:
+                self.stale_served += 1
+                log.warning("DNS re-resolution of %s failed; serving cached %s",
+                            host, [a for _, a in entry.addresses])
+                return entry.addresses
+            raise
+
+    def invalidate(self, host: str, port: int) -> None:
+        """Drop a cached answer, e.g. after every cached address refused to connect."""
+        self._entries.pop((host, port), None)
+
+    async def _lookup(self, host: str, port: int) -> List[Address]:
+        loop = asyncio.get_running_loop()
+        infos = await loop.getaddrinfo(host, port, type=socket.SOCK_STREAM, proto=socket.IPPROTO_TCP)
+        addresses: List[Address] = []
+        for family, _type, _proto, _name, sockaddr in infos:
+            address = (family, sockaddr[0])
+            if address not in addresses:
+                addresses.append(address)
+        if not addresses:
+            raise socket.gaierror(f"no addresses for {host}")
+
+        previous = self._entries.get((host, port))
+        if previous is None or previous.addresses != addresses:
+            log.info("DNS %s -> %s", host, [a for _, a in addresses])
+        if self.enabled:
+            self._entries[(host, port)] = _Entry(addresses, self.ttl_s)
+        return addresses
+
+    def _forget(self, key: Tuple[str, int], task: "asyncio.Task[List[Address]]") -> None:
+        if self._pending.get(key) is task:
+            del self._pending[key]
+        retrieve_exception(task)
+
+    def snapshot(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        return {
+            "ttl_s": self.ttl_s,
+            "hits": self.hits,
+            "misses": self.misses,
+            "stale_served": self.stale_served,
+            "errors": self.errors,
+            "entries": {
+                f"{host}:{port}": {
+                    "addresses": [a for _, a in e.addresses],
+                    "age_s": round(now - e.resolved_at, 1),
+                }
+                for (host, port), e in sorted(self._entries.items())
+            },
+        }
+
+
+def interleave(addresses: List[Address], preferred: Optional[int] = None) -> List[Address]:
+    """Alternate address families, starting with `preferred` when present."""
+    if not addresses:
+        return []
+    families = {family for family, _ in addresses}
+    first = preferred if preferred in families else addresses[0][0]
+    primary = [a for a in addresses if a[0] == first]
+    other = [a for a in addresses if a[0] != first]
+    return [a for pair in zip_longest(primary, other) for a in pair if a is not None]
+
+
+class CachingBackend(AsyncNetworkBackend):
+    """httpcore network backend that resolves through a DnsCache and races addresses."""
+
+    def __init__(
+        self,
+        cache: DnsCache,
+        backend: Optional[AsyncNetworkBackend] = None,
+        stagger_s: float = 0.25,
+    ) -> None:
+        self.cache = cache
+        self.stagger_s = stagger_s
+        self._backend = backend if backend is not None else AutoBackend()
+        # host -> address family of the last successful connection
+        self._preferred: Dict[str, int] = {}
+        self.races = 0
+        self.fallbacks = 0
+
+    async def connect_tcp(
+        self,
+        host: str,
+        port: int,
+        timeout: Optional[float] = None,
+        local_address: Optional[str] = None,
+        socket_options: Optional[Iterable[Any]] = None,
+    ) -> AsyncNetworkStream:
+        t0 = time.monotonic()
+        try:
+            addresses = await asyncio.wait_for(self.cache.resolve(host, port), timeout)
+        except asyncio.TimeoutError as e:
+            raise httpcore.ConnectTimeout(f"DNS resolution of {host} timed out") from e
+        except OSError as e:
+            raise httpcore.ConnectError(f"DNS resolution of {host} failed: {e}") from e
+        finally:
+            trace = CURRENT_TRACE.get()
+            if trace is not None:
+                trace.add("dns", (time.monotonic() - t0) * 1000)
+
+        deadline = t0 + timeout if timeout is not None else None
+        ordered = interleave(addresses, self._preferred.get(host))
+        try:
+            if len(ordered) == 1 or self.stagger_s <= 0:
+                family, stream = await self._connect_in_order(ordered, port, deadline, local_address, socket_options)
+            else:
+                family, stream = await self._race(ordered, port, deadline, local_address, socket_options)
+        except (httpcore.ConnectError, httpcore.ConnectTimeout):
+            # Every address failed: the answer may be outdated, re-resolve next time
+            self.cache.invalidate(host, port)
+            raise
+        if family != ordered[0][0]:
+            self.fallbacks += 1
+        self._preferred[host] = family
+        return stream
+
+    async def _connect(
+        self,
+        address: str,
+        port: int,
+        deadline: Optional[float],
+        local_address: Optional[str],
+        socket_options: Optional[Iterable[Any]],
+    ) -> AsyncNetworkStream:
+        timeout = max(0.0, deadline - time.monotonic()) if deadline is not None else None
+        return await self._backend.connect_tcp(
+            address, port, timeout=timeout,
+            local_address=local_address, socket_options=socket_options,
+        )
+
+    async def _connect_in_order(
+        self,
+        addresses: List[Address],
+        port: int,
+        deadline: Optional[float],
+        local_address: Optional[str],
+        socket_options: Optional[Iterable[Any]],
+    ) -> Tuple[int, AsyncNetworkStream]:
+        last_exc: Optional[Exception] = None
+        for family, address in addresses:
+            try:
+                return family, await self._connect(address, port, deadline, local_address, socket_options)
+            except (httpcore.ConnectError, httpcore.ConnectTimeout) as e:
+                last_exc = e
+        assert last_exc is not None
+        raise last_exc
+
+    async def _race(
+        self,
+        addresses: List[Address],
+        port: int,
+        deadline: Optional[float],
+        local_address: Optional[str],
+        socket_options: Optional[Iterable[Any]],
+    ) -> Tuple[int, AsyncNetworkStream]:
+        """Staggered connection attempts; the first to connect wins."""
+        self.races += 1
+        queue = list(addresses)
+        attempts: Dict["asyncio.Task[AsyncNetworkStream]", int] = {}
+        pending: Set["asyncio.Task[AsyncNetworkStream]"] = set()
+        winner: Optional["asyncio.Task[AsyncNetworkStream]"] = None
+        last_exc: Optional[BaseException] = None
+        try:
+            while winner is None and (queue or pending):
+                if queue:
+                    family, address = queue.pop(0)
+                    task = asyncio.ensure_future(
+                        self._connect(address, port, deadline, local_address, socket_options))
+                    attempts[task] = family
+                    pending.add(task)
+                wait_s = self.stagger_s if queue else None
+                if deadline is not None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise httpcore.ConnectTimeout("connect timed out")
+                    wait_s = remaining if wait_s is None else min(wait_s, remaining)
+                # Returns early when an attempt fails, so the next one starts right away
+                done, pending = await asyncio.wait(pending, timeout=wait_s, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        winner = task
+                        break
+                    last_exc = task.exception()
+        finally:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*attempts, return_exceptions=True)
+            # An attempt may have connected alongside the winner; don't leak it
+            for task in attempts:
+                if task is not winner and not task.cancelled() and task.exception() is None:
+                    await task.result().aclose()
+
+        if winner is not None:
+            return attempts[winner], winner.result()
+        if isinstance(last_exc, (httpcore.ConnectError, httpcore.ConnectTimeout)):
+            raise last_exc
+        raise httpcore.ConnectError(repr(last_exc)) from last_exc
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "stagger_s": self.stagger_s,
+            "races": self.races,
+            "fallbacks": self.fallbacks,
+            "preferred_family": {
+                host: "ipv6" if family == socket.AF_INET6 else "ipv4"
+                for host, family in sorted(self._preferred.items())
+            },
+        }
+
+    async def connect_unix_socket(
+        self,
+        path: str,
+        timeout: Optional[float] = None,
+        socket_options: Optional[Iterable[Any]] = None,
+    ) -> AsyncNetworkStream:
+        return await self._backend.connect_unix_socket(path, timeout=timeout, socket_options=socket_options)
+
+    async def sleep(self, seconds: float) -> None:
+        await self._backend.sleep(seconds)
+
+
+def install_backend(client: httpx.AsyncClient, backend: AsyncNetworkBackend) -> bool:
+    """
+    Point client's connection pool at backend. httpx doesn't expose this, so
+    it reaches into the default transport; returns False (leaving the stock
+    resolver in place) if the internals don't look as expected.
+    """
+    pool = getattr(getattr(client, "_transport", None), "_pool", None)
+    if pool is None or not hasattr(pool, "_network_backend"):
+        log.debug("cannot install DNS cache on %r; using the default resolver", client)
+        return False
+    pool._network_backend = backend
+    return True
@@ -0,0 +1,121 @@
+"""
+Background health monitor for the Definite API.
+
+Probes the health endpoint on an interval and keeps a rolling view of
+reachability and latency. The request path reads that view via
+snapshot() / healthy without ever waiting on a probe.
+"""
+
+import time
+import asyncio
+import logging
+from collections import deque
+from typing import Optional, Dict, Any, Deque, Tuple
+
+import httpx
+
+from .background import BackgroundTask
+
+log = logging.getLogger("definite-mcp")
+
+
+class HealthMonitor:
+    """
+    Periodically HEADs `url` on `client`. Any HTTP response (404 included)
+    counts as reachable; only transport errors and timeouts count as down.
+    """
+
+    def __init__(
+        self,
+        client: httpx.AsyncClient,
+        url: str = "/v1/healthz",
+        interval_s: float = 30.0,
+        timeout_s: float = 5.0,
+        window: int = 20,
+    ) -> None:
+        self.client = client
+        self.url = url
+        self.interval_s = interval_s
+        self.timeout_s = timeout_s
+        # (monotonic ts, reachable, latency_ms)
+        self._samples: Deque[Tuple[float, bool, float]] = deque(maxlen=max(1, window))
+        self._consecutive_failures = 0
+        self._last_status: Optional[int] = None
+        self._last_error: Optional[str] = None
+        self._loop = BackgroundTask(self._run, "definite-mcp-health")
+
+    @property
+    def enabled(self) -> bool:
+        return self.interval_s > 0
+
+    @property
+    def healthy(self) -> Optional[bool]:
+        """True/False after the first probe; None while unknown."""
+        if not self._samples:
+            return None
+        return self._samples[-1][1]
+
+    def ensure_started(self) -> None:
+        """Start the probe loop on the running event loop if it isn't already."""
+        if not self.enabled:
+            return
+        self._loop.ensure_started()
+
+    async def stop(self) -> None:
+        await self._loop.stop()
+
+    async def probe(self) -> bool:
+        """Run one probe and record the outcome."""
+        t0 = time.monotonic()
+        try:
+            r = await asyncio.wait_for(
+                self.client.head(self.url, headers={"User-Agent": "definite-mcp/health"}),
+                timeout=self.timeout_s,
+            )
+        except Exception as e:
+            self._record(False, (time.monotonic() - t0) * 1000)
+            self._last_error = f"{e.__class__.__name__}: {e}"
+            log.warning("Health %s failed (%d in a row): %s",
+                        self.url, self._consecutive_failures, self._last_error)
+            return False
+        self._record(True, (time.monotonic() - t0) * 1000)
+        self._last_status = r.status_code
+        self._last_error = None
+        log.debug("Health %s status=%s", self.url, r.status_code)
+        return True
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current rolling state; cheap and non-blocking."""
+        ok_latencies = sorted(ms for _, ok, ms in self._samples if ok)
+        last_ts = self._samples[-1][0] if self._samples else None
+        return {
+            "reachable": self.healthy,
+            "consecutive_failures": self._consecutive_failures,
+            "success_ratio": (
+                round(sum(1 for _, ok, _ in self._samples if ok) / len(self._samples), 3)
+                if self._samples else None
+            ),
+            "latency_ms_p50": (
+                round(ok_latencies[len(ok_latencies) // 2], 1) if ok_latencies else None
+            ),
+            "last_status": self._last_status,
+            "last_error": self._last_error,
+            "last_probe_age_s": (
+                round(time.monotonic() - last_ts, 1) if last_ts is not None else None
+            ),
+            "samples": len(self._samples),
+        }
+
+    def _record(self, ok: bool, latency_ms: float) -> None:
+        self._samples.append((time.monotonic(), ok, latency_ms))
+        self._consecutive_failures = 0 if ok else self._consecutive_failures + 1
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.probe()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:  # never let the monitor die
+                log.debug("Health loop error: %r", e)
+            await asyncio.sleep(self.interval_s)
@@ -0,0 +1,138 @@
+"""
+In-process registry for background query jobs.
+
+Jobs run with bounded concurrency on the server's event loop. Finished jobs
+keep their result until it is fetched or the retention TTL passes.
+"""
+
+import time
+import uuid
+import asyncio
+import logging
+from typing import Optional, Dict, Any, Awaitable, Callable
+
+log = logging.getLogger("definite-mcp")
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+FINISHED = (SUCCEEDED, FAILED, CANCELLED)
+
+
+class JobLimitError(RuntimeError):
+    """Raised when too many jobs are already queued or retained."""
+
+
+class Job:
+    __slots__ = ("id", "kind", "status", "created_at", "started_at",
+                 "finished_at", "result", "task")
+
+    def __init__(self, kind: str) -> None:
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.status = QUEUED
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.result: Optional[Dict[str, Any]] = None
+        self.task: Optional[asyncio.Task] = None
+
+    def describe(self) -> Dict[str, Any]:
+        now = time.time()
+        end = self.finished_at or now
+        return {
+            "job_id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "queued_s": round((self.started_at or end) - self.created_at, 3),
+            "running_s": round(end - self.started_at, 3) if self.started_at else None,
+            "result_ready": self.status in FINISHED,
+        }
+
+
+class JobRegistry:
+    """
+    `fn` passed to submit() returns the tool-level result dict; a dict with
+    status == "failed" marks the job failed, anything else succeeded.
+    """
+
+    def __init__(self, max_concurrency: int, result_ttl_s: float, max_jobs: int) -> None:
+        self.max_concurrency = max(1, max_concurrency)
+        self.result_ttl_s = result_ttl_s
+        self.max_jobs = max_jobs
+        self._jobs: Dict[str, Job] = {}
+        self._sem: Optional[asyncio.Semaphore] = None
+
+    def submit(self, kind: str, fn: Callable[[], Awaitable[Dict[str, Any]]]) -> Job:
+        self._purge()
+        if len(self._jobs) >= self.max_jobs:
+            raise JobLimitError(
+                f"Too many query jobs ({len(self._jobs)}); fetch results or wait for them to expire"
+            )
+        if self._sem is None:
+            self._sem = asyncio.Semaphore(self.max_concurrency)
+        job = Job(kind)
+        job.task = asyncio.get_running_loop().create_task(
+            self._run(job, fn), name=f"definite-mcp-job-{job.id}"
+        )
+        self._jobs[job.id] = job
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        self._purge()
+        return self._jobs.get(job_id)
+
+    def pop(self, job_id: str) -> Optional[Job]:
+        """Remove and return a finished job; running jobs stay registered."""
+        job = self.get(job_id)
+        if job is not None and job.status in FINISHED:
+            del self._jobs[job_id]
+        return job
+
+    async def cancel(self, job_id: str) -> Optional[Job]:
+        """Cancel an unfinished job and wait for it to record the cancellation."""
+        job = self.get(job_id)
+        if job is not None and job.task is not None and not job.task.done():
+            job.task.cancel()
+            await asyncio.gather(job.task, return_exceptions=True)
+            if job.finished_at is None:
+                # Cancelled before _run() got to start, so nothing recorded it
+                job.status = CANCELLED
+                job.result = {"error": "Query job was cancelled", "status": "failed"}
+                job.finished_at = time.time()
+        return job
+
+    def stats(self) -> Dict[str, int]:
+        counts: Dict[str, int] = {}
+        for job in self._jobs.values():
+            counts[job.status] = counts.get(job.status, 0) + 1
+        return counts
+
+    async def _run(self, job: Job, fn: Callable[[], Awaitable[Dict[str, Any]]]) -> None:
+        assert self._sem is not None
+        try:
+            async with self._sem:
+                job.status = RUNNING
+                job.started_at = time.time()
+                job.result = await fn()
+                job.status = FAILED if job.result.get("status") == "failed" else SUCCEEDED
+        except asyncio.CancelledError:
+            job.status = CANCELLED
+            job.result = {"error": "Query job was cancelled", "status": "failed"}
+        except Exception as e:
+            job.status = FAILED
+            job.result = {"error": str(e) or e.__class__.__name__, "status": "failed"}
+            log.exception("job %s crashed", job.id)
+        finally:
+            job.finished_at = time.time()
+            log.info("job %s %s in %.0fms", job.id, job.status,
+                     (job.finished_at - job.created_at) * 1000)
+
+    def _purge(self) -> None:
+        cutoff = time.time() - self.result_ttl_s
+        for job_id, job in list(self._jobs.items()):
+            if job.finished_at is not None and job.finished_at < cutoff:
+                del self._jobs[job_id]
@@ -0,0 +1,269 @@
+"""
+Adaptive concurrency limit (AIMD) for upstream attempts, with priority lanes.
+
+At most `limit` attempts are in flight at once; callers beyond that wait
+instead of piling onto the connection pool and failing with PoolTimeout.
+The limit adapts to what the API can currently take:
+
+    increase   +1/limit per successful attempt (about +1 per round of
+               requests), only while the limit is actually being used
+    decrease   limit * backoff on an overload signal (429/503, read or
+               deadline timeouts, pool timeouts) or when a lane's recent
+               latency (short EWMA) exceeds `tolerance` x its own long-run
+               EWMA; at most once per recent round-trip so one burst of
+               failures counts as one signal
+
+Each lane keeps its own latency EWMAs: a shift in the fast/slow traffic mix
+would otherwise read as a latency change and move the limit.
+
+The limit stays within [min_limit, max_limit].
+
+Waiters queue in one of two lanes, "fast" (interactive queries) and "slow"
+(long analytical queries). Freed slots go to the lanes by smooth weighted
+round-robin (FIFO within a lane), and the slow lane may hold at most
+`slow_share` of the limit, so short calls keep flowing while long ones
+occupy the pool. A lane whose queue already holds `max_queue` waiters sheds
+new callers with OverloadedError instead of queueing them indefinitely.
+LaneClassifier picks the lane for a call from how long it took last time.
+"""
+
+import time
+import asyncio
+import logging
+from collections import OrderedDict, deque
+from typing import Optional, Deque, Dict, Any, Hashable, Callable
+
+log = logging.getLogger("definite-mcp")
+
+FAST = "fast"
+SLOW = "slow"
+LANES = (FAST, SLOW)
+
+
+class OverloadedError(RuntimeError):
+    """Raised instead of queueing when a lane's wait queue is full."""
+
+    def __init__(self, lane: str, queue_depth: int) -> None:
+        super().__init__(
+            f"Server overloaded: {queue_depth} calls already waiting in the {lane} lane; retry later"
+        )
+        self.lane = lane
+        self.queue_depth = queue_depth
+
+
+class _Lane:
+    __slots__ = ("weight", "waiters", "in_flight", "queued", "shed", "current", "short_ms", "long_ms")
+
+    def __init__(self, weight: int) -> None:
+        self.weight = max(1, weight)
+        self.waiters: Deque["asyncio.Future[None]"] = deque()
+        self.in_flight = 0
+        self.queued = 0
+        self.shed = 0
+        self.current = 0   # smooth weighted round-robin credit
+        self.short_ms: Optional[float] = None
+        self.long_ms: Optional[float] = None
+
+    def observe(self, ms: float) -> None:
+        self.short_ms = ms if self.short_ms is None else self.short_ms + 0.2 * (ms - self.short_ms)
+        self.long_ms = ms if self.long_ms is None else self.long_ms + 0.02 * (ms - self.long_ms)
+
+
+class AdaptiveLimiter:
+    """AIMD concurrency limiter with weighted-fair lane queues. Use from one event loop."""
+
+    def __init__(
+        self,
+        initial: int = 20,
+        min_limit: int = 1,
+        max_limit: int = 50,
+        backoff: float = 0.9,
+        tolerance: float = 2.0,
+        fast_weight: int = 4,
+        slow_weight: int = 1,
+        slow_share: float = 0.75,
+        max_queue: int = 64,
+    ) -> None:
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max_limit
+        self.limit = float(min(max(initial, self.min_limit), max(max_limit, self.min_limit)))
+        self.backoff = backoff
+        self.tolerance = tolerance
+        self.slow_share = slow_share
+        self.max_queue = max_queue
+        self.in_flight = 0
+        self._lanes: Dict[str, _Lane] = {FAST: _Lane(fast_weight), SLOW: _Lane(slow_weight)}
+        self._last_decrease = 0.0
+        self.queued = 0
+        self.decreases = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_limit > 0
+
+    @property
+    def queue_depth(self) -> int:
+        return sum(len(lane.waiters) for lane in self._lanes.values())
+
+    def _admissible(self, name: str) -> bool:
+        """The slow lane never takes the last (1 - slow_share) of the slots."""
+        if name != SLOW:
+            return True
+        return self._lanes[SLOW].in_flight < max(1, int(self.limit * self.slow_share))
+
+    async def acquire(
+        self,
+        lane: str = FAST,
+        on_queued: Optional[Callable[[Callable[[], int]], None]] = None,
+    ) -> float:
+        """
+        Wait for a slot in `lane`; returns seconds spent queued. Pair with
+        release(lane=...). Raises OverloadedError if the lane's queue is full.
+        If the caller has to queue, on_queued gets a function returning its
+        current 1-based position in the lane.
+        """
+        if not self.enabled:
+            return 0.0
+        state = self._lanes[lane]
+        if self.in_flight < int(self.limit) and not state.waiters and self._admissible(lane):
+            self.in_flight += 1
+            state.in_flight += 1
+            return 0.0
+        if self.max_queue > 0 and len(state.waiters) >= self.max_queue:
+            state.shed += 1
+            raise OverloadedError(lane, len(state.waiters))
+
+        t0 = time.monotonic()
+        fut: "asyncio.Future[None]" = asyncio.get_running_loop().create_future()
+        state.waiters.append(fut)
+        state.queued += 1
+        self.queued += 1
+        if on_queued is not None:
+            on_queued(lambda: state.waiters.index(fut) + 1 if fut in state.waiters else 0)
+        try:
+            await fut
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled():
+                # Granted a slot just as we were cancelled: hand it on
+                self.in_flight -= 1
+                state.in_flight -= 1
+                self._wake()
+            else:
+                try:
+                    state.waiters.remove(fut)
+                except ValueError:
+                    pass
+            raise
+        return time.monotonic() - t0
+
+    def release(self, latency_ms: Optional[float] = None, overloaded: bool = False, lane: str = FAST) -> None:
+        """
+        Free a slot taken in `lane`. latency_ms is the attempt's latency when
+        it got a usable response; overloaded marks a signal that the API is
+        saturated. Neither (e.g. a 4xx or connect error) leaves the limit unchanged.
+        """
+        if not self.enabled:
+            return
+        saturated = self.in_flight + self.queue_depth >= int(self.limit)
+        self.in_flight = max(0, self.in_flight - 1)
+        state = self._lanes[lane]
+        state.in_flight = max(0, state.in_flight - 1)
+        if overloaded:
+            self._decrease("overload", state)
+        elif latency_ms is not None:
+            state.observe(latency_ms)
+            if state.short_ms > self.tolerance * state.long_ms:
+                self._decrease(f"{lane} lane latency", state)
+            elif saturated:
+                self.limit = min(float(self.max_limit), self.limit + 1.0 / self.limit)
+        self._wake()
+
+    def _decrease(self, reason: str, lane: _Lane) -> None:
+        now = time.monotonic()
+        # One decrease per round-trip: concurrent failures are one signal
+        if now - self._last_decrease < max(0.1, (lane.short_ms or 0.0) / 1000):
+            return
+        self._last_decrease = now
+        previous = self.limit
+        self.limit = max(float(self.min_limit), self.limit * self.backoff)
+        self.decreases += 1
+        log.info("concurrency limit %.1f -> %.1f (%s)", previous, self.limit, reason)
+
+    def _next_lane(self) -> Optional[_Lane]:
+        """Smooth weighted round-robin over lanes that have waiters and may run."""
+        ready = []
+        for name, lane in self._lanes.items():
+            while lane.waiters and lane.waiters[0].done():
+                lane.waiters.popleft()   # cancelled while queued
+            if lane.waiters and self._admissible(name):
+                ready.append(lane)
+        if not ready:
+            return None
+        total = sum(lane.weight for lane in ready)
+        for lane in ready:
+            lane.current += lane.weight
+        best = max(ready, key=lambda lane: lane.current)
+        best.current -= total
+        return best
+
+    def _wake(self) -> None:
+        while self.in_flight < int(self.limit):
+            lane = self._next_lane()
+            if lane is None:
+                return
+            self.in_flight += 1
+            lane.in_flight += 1
+            lane.waiters.popleft().set_result(None)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "limit": round(self.limit, 2),
+            "in_flight": self.in_flight,
+            "queue_depth": self.queue_depth,
+            "queued": self.queued,
+            "decreases": self.decreases,
+            "lanes": {
+                name: {
+                    "weight": lane.weight,
+                    "in_flight": lane.in_flight,
+                    "queue_depth": len(lane.waiters),
+                    "queued": lane.queued,
+                    "shed": lane.shed,
+                    "latency_ewma_ms": {
+                        "short": round(lane.short_ms, 1) if lane.short_ms is not None else None,
+                        "long": round(lane.long_ms, 1) if lane.long_ms is not None else None,
+                    },
+                }
+                for name, lane in self._lanes.items()
+            },
+        }
+
+
+class LaneClassifier:
+    """
+    Remembers recent run times per query (by cache key) and sends queries
+    that took at least `slow_ms` last time to the slow lane. Queries never
+    seen before go to the fast lane.
+    """
+
+    def __init__(self, slow_ms: float = 2000.0, max_entries: int = 4096, alpha: float = 0.5) -> None:
+        self.slow_ms = slow_ms
+        self.max_entries = max_entries
+        self.alpha = alpha
+        self._ewma_ms: "OrderedDict[Hashable, float]" = OrderedDict()
+
+    def lane_for(self, key: Hashable, requested: Optional[str] = None) -> str:
+        """The explicitly requested lane if any, otherwise one inferred from history."""
+        if requested in LANES:
+            return requested
+        ms = self._ewma_ms.get(key)
+        return SLOW if ms is not None and ms >= self.slow_ms else FAST
+
+    def observe(self, key: Hashable, ms: float) -> None:
+        previous = self._ewma_ms.pop(key, None)
+        self._ewma_ms[key] = ms if previous is None else previous + self.alpha * (ms - previous)
+        while len(self._ewma_ms) > self.max_entries:
+            self._ewma_ms.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._ewma_ms)
@@ -0,0 +1,271 @@
+"""
+Lightweight in-process metrics: rolling latency windows, histograms, a
+counter/gauge registry, and Prometheus text-format export.
+"""
+
+import os
+import math
+import bisect
+import asyncio
+import logging
+from collections import deque
+from typing import Optional, Deque, Dict, Any, Tuple, List, Callable, Iterable
+
+from .background import BackgroundTask
+
+log = logging.getLogger("definite-mcp")
+
+
+class LatencyWindow:
+    """Rolling window of the most recent `size` samples (milliseconds)."""
+
+    def __init__(self, size: int = 200) -> None:
+        self._samples: Deque[float] = deque(maxlen=max(1, size))
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def observe(self, ms: float) -> None:
+        self._samples.append(ms)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Nearest-rank quantile, or None if there are no samples."""
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        rank = max(1, math.ceil(q * len(ordered)))
+        return ordered[rank - 1]
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "samples": len(self._samples),
+            "p50_ms": self.quantile(0.50),
+            "p95_ms": self.quantile(0.95),
+            "p99_ms": self.quantile(0.99),
+        }
+
+
+# Millisecond bucket upper bounds shared by all latency histograms
+DEFAULT_BUCKETS_MS = (
+    1, 2.5, 5, 10, 25, 50, 100, 250, 500,
+    1000, 2500, 5000, 10000, 30000, 60000, 120000,
+)
+
+
+class Histogram:
+    """Fixed-bucket histogram (cumulative on export, like Prometheus)."""
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS_MS) -> None:
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)   # last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.count += 1
+        self.sum += value
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimate by linear interpolation within the matching bucket."""
+        if not self.count:
+            return None
+        target = q * self.count
+        seen = 0
+        lower = 0.0
+        for i, n in enumerate(self.counts):
+            upper = self.buckets[i] if i < len(self.buckets) else lower
+            if n and seen + n >= target:
+                return lower + (upper - lower) * ((target - seen) / n)
+            seen += n
+            lower = upper
+        return lower
+
+    def snapshot(self) -> Dict[str, Any]:
+        def rnd(v: Optional[float]) -> Optional[float]:
+            return round(v, 1) if v is not None else None
+        return {
+            "count": self.count,
+            "mean_ms": rnd(self.sum / self.count) if self.count else None,
+            "p50_ms": rnd(self.quantile(0.50)),
+            "p95_ms": rnd(self.quantile(0.95)),
+            "p99_ms": rnd(self.quantile(0.99)),
+        }
+
+
+LabelKey = Tuple[Tuple[str, str], ...]
+# (name, type, help, labels, value) produced by collectors at scrape time
+Sample = Tuple[str, str, str, Dict[str, str], float]
+
+
+def _labels_key(labels: Dict[str, Any]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _fmt_labels(labels: Iterable[Tuple[str, str]]) -> str:
+    inner = ",".join(f'{k}="{_escape(v)}"' for k, v in labels)
+    return "{" + inner + "}" if inner else ""
+
+
+def _fmt_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class MetricsRegistry:
+    """
+    Counters are pushed with inc(); everything else (gauges, histograms owned
+    by other components) is pulled from collectors when a snapshot is taken.
+    """
+
+    def __init__(self, prefix: str = "definite_mcp") -> None:
+        self.prefix = prefix
+        self._counters: Dict[str, Dict[LabelKey, float]] = {}
+        self._help: Dict[str, str] = {}
+        self._histograms: List[Tuple[str, str, Callable[[], Iterable[Tuple[Dict[str, str], Histogram]]]]] = []
+        self._collectors: List[Callable[[], Iterable[Sample]]] = []
+
+    def describe(self, name: str, help_text: str) -> None:
+        self._help[name] = help_text
+
+    def inc(self, name: str, value: float = 1.0, **labels: Any) -> None:
+        series = self._counters.setdefault(name, {})
+        key = _labels_key(labels)
+        series[key] = series.get(key, 0.0) + value
+
+    def register_collector(self, fn: Callable[[], Iterable[Sample]]) -> None:
+        self._collectors.append(fn)
+
+    def register_histograms(
+        self,
+        name: str,
+        help_text: str,
+        fn: Callable[[], Iterable[Tuple[Dict[str, str], Histogram]]],
+    ) -> None:
+        """fn yields (labels, Histogram in ms); exported in seconds."""
+        self._histograms.append((name, help_text, fn))
+
+    def _collect(self) -> List[Sample]:
+        samples: List[Sample] = []
+        for fn in self._collectors:
+            try:
+                samples.extend(fn())
+            except Exception as e:  # a broken collector must not break export
+                log.debug("metrics collector %r failed: %r", fn, e)
+        return samples
+
+    def snapshot(self) -> Dict[str, Any]:
+        """JSON-friendly view of every metric."""
+        out: Dict[str, Any] = {"counters": {}, "gauges": {}, "histograms": {}}
+        for name, series in sorted(self._counters.items()):
+            out["counters"][name] = [
+                {"labels": dict(k), "value": v} for k, v in sorted(series.items())
+            ]
+        for name, _type, _help, labels, value in self._collect():
+            out["gauges"].setdefault(name, []).append({"labels": labels, "value": value})
+        for name, _help, fn in self._histograms:
+            out["histograms"][name] = [
+                {"labels": labels, **hist.snapshot()} for labels, hist in fn()
+            ]
+        return out
+
+    def render_prometheus(self) -> str:
+        lines: List[str] = []
+        p = self.prefix
+
+        for name, series in sorted(self._counters.items()):
+            full = f"{p}_{name}"
+            if name in self._help:
+                lines.append(f"# HELP {full} {self._help[name]}")
+            lines.append(f"# TYPE {full} counter")
+            for key, value in sorted(series.items()):
+                lines.append(f"{full}{_fmt_labels(key)} {_fmt_value(value)}")
+
+        # The text format wants each family's samples contiguous
+        families: Dict[str, List[Sample]] = {}
+        for sample in self._collect():
+            families.setdefault(sample[0], []).append(sample)
+        for name, samples in families.items():
+            full = f"{p}_{name}"
+            lines.append(f"# HELP {full} {samples[0][2]}")
+            lines.append(f"# TYPE {full} {samples[0][1]}")
+            for _, _, _, labels, value in samples:
+                lines.append(f"{full}{_fmt_labels(sorted(labels.items()))} {_fmt_value(value)}")
+
+        for name, help_text, fn in self._histograms:
+            full = f"{p}_{name}"
+            lines.append(f"# HELP {full} {help_text}")
+            lines.append(f"# TYPE {full} histogram")
+            for labels, hist in fn():
+                base = sorted(labels.items())
+                cumulative = 0
+                for bound, n in zip(hist.buckets, hist.counts):
+                    cumulative += n
+                    le = _fmt_value(bound / 1000)
+                    lines.append(f"{full}_bucket{_fmt_labels(base + [('le', le)])} {cumulative}")
+                lines.append(f"{full}_bucket{_fmt_labels(base + [('le', '+Inf')])} {hist.count}")
+                lines.append(f"{full}_sum{_fmt_labels(base)} {_fmt_value(hist.sum / 1000)}")
+                lines.append(f"{full}_count{_fmt_labels(base)} {hist.count}")
+
+        return "\n".join(lines) + "\n"
+
+
+class TextfileExporter:
+    """
+    Periodically writes render_prometheus() to `path` for the node-exporter
+    textfile collector. Writes go to a temp file and are renamed into place
+    so the collector never reads a partial file.
+    """
+
+    def __init__(self, registry: MetricsRegistry, path: Optional[str], interval_s: float) -> None:
+        self.registry = registry
+        self.path = path
+        self.interval_s = interval_s
+        self._loop = BackgroundTask(self._run, "definite-mcp-metrics-textfile")
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.path) and self.interval_s > 0
+
+    def ensure_started(self) -> None:
+        if not self.enabled:
+            return
+        self._loop.ensure_started()
+
+    async def stop(self) -> None:
+        if not self._loop.running:
+            return
+        await self._loop.stop()
+        # Leave a final snapshot behind; shutdown goes on if it can't be written
+        try:
+            await self.write()
+        except Exception as e:
+            log.warning("final metrics textfile write to %s failed: %s", self.path, e)
+
+    async def write(self) -> None:
+        if not self.path:
+            return
+        text = self.registry.render_prometheus()
+        await asyncio.get_running_loop().run_in_executor(None, self._write_file, text)
+
+    def _write_file(self, text: str) -> None:
+        assert self.path is not None
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp, self.path)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.write()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                log.warning("metrics textfile write to %s failed: %s", self.path, e)
+            await asyncio.sleep(self.interval_s)
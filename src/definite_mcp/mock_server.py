@@ -0,0 +1,540 @@
+"""
+Local stand-in for the Definite API, for offline benchmarks and tests.
+
+Serves /v1/query and /v1/healthz over plain HTTP/1.1 with configurable
+latency distributions, result sizes, error and 429 rates, dropped
+connections and slow bodies. Point the MCP server at it with:
+
+    definite-mcp-mock --port 8787 --latency lognormal:80,0.6 --rows 100
+    DEFINITE_API_BASE_URL=http://127.0.0.1:8787 DEFINITE_API_KEY=test definite-mcp
+
+Individual SQL queries can override the server defaults with a comment,
+e.g. "SELECT 1 /* mock: rows=5000 latency=2000 status=500 */". Cube queries
+can do the same with a "mock" object inside cube_query. A comma-separated
+value applies to successive runs of the same query, the last one repeating:
+"latency=2000,10" makes the first run a straggler and later ones fast, and
+"status=503,200" fails once and then succeeds.
+
+Queries sent with an Idempotency-Key header are executed once per key: a
+repeat while it is still running reattaches to that execution, and a repeat
+after it succeeded (within --idempotency-ttl) replays its response, both
+marked "Idempotent-Replayed: true". Failed executions are not kept, so
+retries of errors run again.
+
+POST /v1/query/cancel with {"request_id": ...} stops a running query sent
+with that X-Request-Id; it then answers 499 instead of a result.
+POST /v1/query/status with {"request_id": ...} reports how far it has got
+(rows_scanned grows linearly with its simulated run time).
+
+GET /mock/stats returns request counters as JSON; POST /mock/reset clears them
+(and the per-run override counts).
+"""
+
+import re
+import sys
+import json
+import math
+import time
+import random
+import asyncio
+import argparse
+import logging
+from typing import Optional, Dict, Any, Callable, List, Tuple
+
+log = logging.getLogger("definite-mcp.mock")
+
+_MOCK_COMMENT = re.compile(r"mock:\s*([^*]*)")
+
+
+def parse_latency(spec: str) -> Callable[[random.Random], float]:
+    """
+    Latency spec in milliseconds -> sampler returning seconds.
+
+        "50"                 fixed 50ms
+        "uniform:20,200"     uniform between 20 and 200ms
+        "exp:100"            exponential with mean 100ms
+        "lognormal:80,0.6"   lognormal with median 80ms and sigma 0.6
+    """
+    kind, _, args = spec.partition(":")
+    if not args:
+        fixed = float(kind) / 1000
+        return lambda rng: fixed
+    params = [float(x) for x in args.split(",")]
+    if kind == "uniform":
+        lo, hi = params
+        return lambda rng: rng.uniform(lo, hi) / 1000
+    if kind == "exp":
+        (mean,) = params
+        return lambda rng: rng.expovariate(1.0 / mean) / 1000 if mean > 0 else 0.0
+    if kind == "lognormal":
+        median, sigma = params
+        mu = math.log(median) if median > 0 else 0.0
+        return lambda rng: rng.lognormvariate(mu, sigma) / 1000
+    raise ValueError(f"Unknown latency distribution {spec!r}")
+
+
+class MockConfig:
+    def __init__(
+        self,
+        latency: str = "0",
+        rows: int = 10,
+        error_rate: float = 0.0,
+        rate_limit_rate: float = 0.0,
+        retry_after_s: float = 1.0,
+        drop_rate: float = 0.0,
+        slow_body_bps: int = 0,
+        health_latency: str = "0",
+        idempotency_ttl_s: float = 60.0,
+        seed: Optional[int] = None,
+    ) -> None:
+        self.latency = latency
+        self.rows = rows
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after_s = retry_after_s
+        self.drop_rate = drop_rate
+        self.slow_body_bps = slow_body_bps
+        self.health_latency = health_latency
+        self.idempotency_ttl_s = idempotency_ttl_s
+        self.seed = seed
+
+
+class _Request:
+    __slots__ = ("method", "path", "headers", "body")
+
+    def __init__(self, method: str, path: str, headers: Dict[str, str], body: bytes) -> None:
+        self.method = method
+        self.path = path
+        self.headers = headers
+        self.body = body
+
+
+class _Reply:
+    """What to send back; `drop` closes the connection without a response."""
+    __slots__ = ("status", "body", "headers", "drop", "bps")
+
+    def __init__(
+        self,
+        status: int = 200,
+        body: bytes = b"",
+        headers: Optional[Dict[str, str]] = None,
+        drop: bool = False,
+        bps: int = 0,
+    ) -> None:
+        self.status = status
+        self.body = body
+        self.headers = headers or {}
+        self.drop = drop
+        self.bps = bps
+
+
+_REASONS = {
+    200: "OK", 400: "Bad Request", 401: "Unauthorized", 404: "Not Found",
+    405: "Method Not Allowed", 422: "Unprocessable Entity", 429: "Too Many Requests", 499: "Client Closed Request",
+    500: "Internal Server Error",
+    502: "Bad Gateway", 503: "Service Unavailable", 504: "Gateway Timeout",
+}
+
+
+class _Running:
+    """A query in its simulated run time."""
+    __slots__ = ("cancelled", "started", "delay", "rows")
+
+    def __init__(self, delay: float, rows: int) -> None:
+        self.cancelled = asyncio.Event()
+        self.started = time.monotonic()
+        self.delay = delay
+        self.rows = rows
+
+    def rows_scanned(self) -> int:
+        if self.delay <= 0:
+            return self.rows
+        return int(self.rows * min(1.0, (time.monotonic() - self.started) / self.delay))
+
+
+class _Execution:
+    __slots__ = ("body", "task")
+
+    def __init__(self, body: bytes, task: "asyncio.Task[_Reply]") -> None:
+        self.body = body
+        self.task = task
+
+
+def _nth(value: str, run: int) -> str:
+    """The `run`th item of a comma-separated override, the last one repeating."""
+    items = value.split(",")
+    return items[min(run, len(items) - 1)]
+
+
+def _json(status: int, obj: Any, headers: Optional[Dict[str, str]] = None) -> _Reply:
+    return _Reply(status, json.dumps(obj).encode(), {"Content-Type": "application/json", **(headers or {})})
+
+
+class MockServer:
+    def __init__(self, config: MockConfig, host: str = "127.0.0.1", port: int = 0) -> None:
+        self.config = config
+        self.host = host
+        self.port = port
+        self.rng = random.Random(config.seed)
+        self._latency = parse_latency(config.latency)
+        self._health_latency = parse_latency(config.health_latency)
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._rows_cache: Dict[int, bytes] = {}
+        # X-Request-Id -> the queries running under it
+        self._running: Dict[str, List[_Running]] = {}
+        # Idempotency-Key -> its (running or succeeded) execution
+        self._executions: Dict[str, _Execution] = {}
+        # Query payload -> times it has run, for per-run override lists
+        self._runs: Dict[str, int] = {}
+        self.stats: Dict[str, int] = {}
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    async def start(self) -> "MockServer":
+        self._server = await asyncio.start_server(self._handle_conn, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        log.info("mock Definite API listening on %s", self.base_url)
+        return self
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def serve_forever(self) -> None:
+        if self._server is None:
+            await self.start()
+        assert self._server is not None
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def __aenter__(self) -> "MockServer":
+        return await self.start()
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.stop()
+
+    # -------------------------
+    # Routing
+    # -------------------------
+
+    async def dispatch(self, req: _Request) -> _Reply:
+        if req.path == "/v1/healthz":
+            self._count("health")
+            await asyncio.sleep(self._health_latency(self.rng))
+            return _Reply(200, b"" if req.method == "HEAD" else b'{"status":"ok"}',
+                          {"Content-Type": "application/json"})
+        if req.path == "/mock/stats" and req.method == "GET":
+            return _json(200, self.stats)
+        if req.path == "/mock/reset" and req.method == "POST":
+            self.stats.clear()
+            self._runs.clear()
+            return _json(200, {"ok": True})
+        if req.path in ("/v1/query/cancel", "/v1/query/status"):
+            if req.method != "POST":
+                return _json(405, {"message": "Method not allowed"})
+            return self._cancel(req) if req.path.endswith("cancel") else self._status(req)
+        if req.path == "/v1/query":
+            if req.method != "POST":
+                return _json(405, {"message": "Method not allowed"})
+            return await self._query(req)
+        return _json(404, {"message": f"No route for {req.path}"})
+
+    async def _query(self, req: _Request) -> _Reply:
+        self._count("query")
+        if not req.headers.get("authorization", "").startswith("Bearer "):
+            self._count("unauthorized")
+            return _json(401, {"message": "Missing API key"})
+        try:
+            payload = json.loads(req.body or b"{}")
+        except json.JSONDecodeError:
+            return _json(400, {"message": "Invalid JSON body"})
+        key = req.headers.get("idempotency-key")
+        if not key:
+            return await self._execute(req, payload)
+
+        execution = self._executions.get(key)
+        if execution is not None:
+            if execution.body != req.body:
+                self._count("idempotency_conflicts")
+                return _json(422, {"message": "Idempotency-Key reused with a different request"})
+            self._count("reattached" if not execution.task.done() else "replayed")
+            reply = await asyncio.shield(execution.task)
+            return _Reply(reply.status, reply.body, {**reply.headers, "Idempotent-Replayed": "true"},
+                          reply.drop, reply.bps)
+
+        task = asyncio.ensure_future(self._execute(req, payload))
+        execution = self._executions[key] = _Execution(req.body, task)
+        task.add_done_callback(lambda t, k=key, e=execution: self._executed(k, e))
+        # The execution outlives this connection, like a warehouse query would
+        return await asyncio.shield(task)
+
+    def _executed(self, key: str, execution: _Execution) -> None:
+        task = execution.task
+        ok = not task.cancelled() and task.exception() is None \
+            and task.result().status < 400 and not task.result().drop
+        if ok and self.config.idempotency_ttl_s > 0:
+            asyncio.get_running_loop().call_later(self.config.idempotency_ttl_s, self._forget, key, execution)
+        else:
+            self._forget(key, execution)
+
+    def _forget(self, key: str, execution: _Execution) -> None:
+        if self._executions.get(key) is execution:
+            del self._executions[key]
+
+    async def _execute(self, req: _Request, payload: Dict[str, Any]) -> _Reply:
+        opts = self._overrides(payload)
+        if any("," in v for v in opts.values()):
+            key = json.dumps(payload, sort_keys=True)
+            run = self._runs.get(key, 0)
+            self._runs[key] = run + 1
+            opts = {k: _nth(v, run) for k, v in opts.items()}
+
+        cfg = self.config
+        rng = self.rng
+        if rng.random() < float(opts.get("drop_rate", cfg.drop_rate)):
+            self._count("dropped")
+            return _Reply(drop=True)
+        if rng.random() < float(opts.get("rate_limit_rate", cfg.rate_limit_rate)):
+            self._count("rate_limited")
+            return _json(429, {"message": "Rate limit exceeded"},
+                         {"Retry-After": f"{cfg.retry_after_s:g}"})
+
+        latency_ms = opts.get("latency")
+        delay = float(latency_ms) / 1000 if latency_ms is not None else self._latency(rng)
+        rows = int(opts.get("rows", cfg.rows))
+        if not await self._run(req.headers.get("x-request-id"), delay, rows):
+            self._count("cancelled")
+            return _json(499, {"message": "Query cancelled"})
+
+        status = int(opts.get("status", 0))
+        if not status and rng.random() < float(opts.get("error_rate", cfg.error_rate)):
+            status = 500
+        if status >= 400:
+            self._count(f"status_{status}")
+            return _json(status, {"message": f"Something went wrong: mock error {status}"})
+
+        self._count("ok")
+        body = self._rows_body(rows)
+        return _Reply(200, body, {"Content-Type": "application/json"},
+                      bps=int(opts.get("bps", cfg.slow_body_bps)))
+
+    async def _run(self, rid: Optional[str], delay: float, rows: int) -> bool:
+        """Simulate the query running for `delay`; False if it was cancelled meanwhile."""
+        if not rid:
+            await asyncio.sleep(delay)
+            return True
+        running = _Running(delay, rows)
+        self._running.setdefault(rid, []).append(running)
+        try:
+            await asyncio.wait_for(running.cancelled.wait(), timeout=delay)
+            return False
+        except asyncio.TimeoutError:
+            return True
+        finally:
+            queries = self._running.get(rid, [])
+            if running in queries:
+                queries.remove(running)
+            if not queries:
+                self._running.pop(rid, None)
+
+    def _request_id(self, req: _Request) -> Tuple[Optional[str], Optional[_Reply]]:
+        """The request_id a cancel/status call is about, or the error reply to send."""
+        if not req.headers.get("authorization", "").startswith("Bearer "):
+            return None, _json(401, {"message": "Missing API key"})
+        try:
+            return json.loads(req.body or b"{}").get("request_id"), None
+        except (json.JSONDecodeError, AttributeError):
+            return None, _json(400, {"message": "Invalid JSON body"})
+
+    def _cancel(self, req: _Request) -> _Reply:
+        self._count("cancel_requests")
+        rid, error = self._request_id(req)
+        if error is not None:
+            return error
+        queries = self._running.get(rid or "", [])
+        if not queries:
+            return _json(404, {"message": f"No running query for request_id {rid}"})
+        for running in queries:
+            running.cancelled.set()
+        return _json(200, {"request_id": rid, "cancelled": len(queries)})
+
+    def _status(self, req: _Request) -> _Reply:
+        self._count("status_requests")
+        rid, error = self._request_id(req)
+        if error is not None:
+            return error
+        queries = self._running.get(rid or "", [])
+        if not queries:
+            return _json(200, {"request_id": rid, "state": "not_running"})
+        return _json(200, {
+            "request_id": rid,
+            "state": "running",
+            "rows_scanned": max(q.rows_scanned() for q in queries),
+        })
+
+    def _overrides(self, payload: Dict[str, Any]) -> Dict[str, str]:
+        opts: Dict[str, str] = {}
+        sql = payload.get("sql")
+        if isinstance(sql, str):
+            m = _MOCK_COMMENT.search(sql)
+            if m:
+                for token in m.group(1).split():
+                    k, _, v = token.partition("=")
+                    if v:
+                        opts[k] = v
+        cube = payload.get("cube_query")
+        if isinstance(cube, dict) and isinstance(cube.get("mock"), dict):
+            opts.update({k: str(v) for k, v in cube["mock"].items()})
+        return opts
+
+    def _rows_body(self, n: int) -> bytes:
+        body = self._rows_cache.get(n)
+        if body is None:
+            rows = [{"id": i, "name": f"row-{i}", "value": i * 1.5} for i in range(n)]
+            body = json.dumps({"data": rows, "row_count": n}).encode()
+            if len(self._rows_cache) < 32:
+                self._rows_cache[n] = body
+        return body
+
+    def _count(self, key: str) -> None:
+        self.stats[key] = self.stats.get(key, 0) + 1
+
+    # -------------------------
+    # HTTP/1.1 plumbing
+    # -------------------------
+
+    async def _handle_conn(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self._count("connections")
+        try:
+            while True:
+                req = await self._read_request(reader)
+                if req is None:
+                    break
+                reply = await self.dispatch(req)
+                if reply.drop:
+                    break
+                keep_alive = req.headers.get("connection", "").lower() != "close"
+                await self._write_reply(writer, req, reply, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+            pass
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            log.exception("mock server error")
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except Exception:
+                pass
+
+    async def _read_request(self, reader: asyncio.StreamReader) -> Optional[_Request]:
+        try:
+            head = await reader.readuntil(b"\r\n\r\n")
+        except asyncio.IncompleteReadError:
+            return None
+        lines = head.decode("latin-1").split("\r\n")
+        method, target, _version = lines[0].split(" ", 2)
+        headers: Dict[str, str] = {}
+        for line in lines[1:]:
+            if ":" in line:
+                k, v = line.split(":", 1)
+                headers[k.strip().lower()] = v.strip()
+        length = int(headers.get("content-length", "0") or 0)
+        body = await reader.readexactly(length) if length else b""
+        return _Request(method.upper(), target.split("?", 1)[0], headers, body)
+
+    async def _write_reply(
+        self,
+        writer: asyncio.StreamWriter,
+        req: _Request,
+        reply: _Reply,
+        keep_alive: bool,
+    ) -> None:
+        body = b"" if req.method == "HEAD" else reply.body
+        head = [f"HTTP/1.1 {reply.status} {_REASONS.get(reply.status, 'Unknown')}"]
+        headers = {
+            "Content-Length": str(len(reply.body)),
+            "Connection": "keep-alive" if keep_alive else "close",
+            **reply.headers,
+        }
+        rid = req.headers.get("x-request-id")
+        if rid:
+            headers["X-Request-Id"] = rid
+        head.extend(f"{k}: {v}" for k, v in headers.items())
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1"))
+        if not reply.bps or not body:
+            writer.write(body)
+            await writer.drain()
+            return
+        # Slow body: trickle it out at roughly `bps` bytes/second
+        chunk = max(1, reply.bps // 20)
+        for i in range(0, len(body), chunk):
+            writer.write(body[i:i + chunk])
+            await writer.drain()
+            await asyncio.sleep(chunk / reply.bps)
+
+
+def add_mock_arguments(p: argparse.ArgumentParser, prefix: str = "") -> None:
+    """Register the behaviour flags (optionally prefixed, e.g. "mock-")."""
+    def opt(name: str, **kwargs: Any) -> None:
+        dest = name.replace("-", "_")
+        p.add_argument(f"--{prefix}{name}", dest="mock_" + dest, metavar=dest.upper(), **kwargs)
+
+    opt("latency", default="0", help="ms: N | uniform:lo,hi | exp:mean | lognormal:median,sigma")
+    opt("health-latency", default="0")
+    opt("rows", type=int, default=10, help="rows per successful result")
+    opt("error-rate", type=float, default=0.0, help="fraction of 500s")
+    opt("rate-limit-rate", type=float, default=0.0, help="fraction of 429s")
+    opt("retry-after", type=float, default=1.0, help="Retry-After seconds on 429")
+    opt("drop-rate", type=float, default=0.0,
+        help="fraction of requests whose connection is closed without a response")
+    opt("slow-body-bps", type=int, default=0,
+        help="trickle response bodies at this many bytes/second (0 = off)")
+    opt("idempotency-ttl", type=float, default=60.0,
+        help="seconds a successful response is replayed for its Idempotency-Key (0 = only while running)")
+    opt("seed", type=int, default=None)
+
+
+def config_from_args(args: argparse.Namespace) -> MockConfig:
+    return MockConfig(
+        latency=args.mock_latency,
+        rows=args.mock_rows,
+        error_rate=args.mock_error_rate,
+        rate_limit_rate=args.mock_rate_limit_rate,
+        retry_after_s=args.mock_retry_after,
+        drop_rate=args.mock_drop_rate,
+        slow_body_bps=args.mock_slow_body_bps,
+        health_latency=args.mock_health_latency,
+        idempotency_ttl_s=args.mock_idempotency_ttl,
+        seed=args.mock_seed,
+    )
+
+
+def _parse_args(argv: Optional[list] = None) -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Local mock of the Definite API")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=8787)
+    add_mock_arguments(p)
+    return p.parse_args(argv)
+
+
+def main(argv: Optional[list] = None) -> None:
+    """Entry point for the definite-mcp-mock command"""
+    logging.basicConfig(stream=sys.stderr, level="INFO")
+    args = _parse_args(argv)
+    server = MockServer(config_from_args(args), args.host, args.port)
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
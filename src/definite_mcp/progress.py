@@ -0,0 +1,194 @@
+"""
+Progress reporting for calls that take a while.
+
+CallStatus records what one upstream call is doing (waiting for capacity,
+queued in a lane, running attempt N, backing off before a retry). The retry
+loop updates it, and with_progress() turns it into periodic progress
+notifications for every caller waiting on that call, so a client watching a
+long query sees it is alive instead of cancelling and resubmitting.
+StatusPoller optionally asks the API how far a running query has got.
+"""
+
+import time
+import asyncio
+import inspect
+import logging
+from typing import Optional, Dict, Any, Awaitable, Callable, TypeVar
+
+import httpx
+
+log = logging.getLogger("definite-mcp")
+
+T = TypeVar("T")
+
+# report(progress, total, message), e.g. mcp Context.report_progress; mcp
+# releases before progress messages existed take only (progress, total)
+ProgressFn = Callable[[float, Optional[float], Optional[str]], Awaitable[None]]
+
+
+def _accepts_message(report: Callable[..., Any]) -> bool:
+    try:
+        params = inspect.signature(report).parameters
+    except (TypeError, ValueError):
+        return True
+    return "message" in params or any(p.kind == p.VAR_KEYWORD for p in params.values())
+
+
+class CallStatus:
+    """What one upstream call is currently doing."""
+
+    def __init__(self, request_id: str, max_attempts: int) -> None:
+        self.request_id = request_id
+        self.max_attempts = max_attempts
+        self.state = "waiting"
+        self.attempt = 0
+        self.base_url: Optional[str] = None
+        self.lane: Optional[str] = None
+        self._position: Optional[Callable[[], int]] = None
+        self.retry_at = 0.0
+        self.reason: Optional[str] = None
+        self.rows_scanned: Optional[int] = None
+
+    def waiting(self, attempt: int) -> None:
+        self.state = "waiting"
+        self.attempt = attempt
+
+    def queued(self, lane: str, position: Callable[[], int]) -> None:
+        """Queued for a concurrency slot; position() is the current place in the lane."""
+        self.state = "queued"
+        self.lane = lane
+        self._position = position
+
+    def running(self, attempt: int, base_url: str) -> None:
+        self.state = "running"
+        self.attempt = attempt
+        self.base_url = base_url
+        self._position = None
+        self.rows_scanned = None
+
+    def backing_off(self, delay_s: float, reason: str) -> None:
+        self.state = "backoff"
+        self.retry_at = time.monotonic() + delay_s
+        self.reason = reason
+
+    def describe(self) -> str:
+        attempt = f"attempt {self.attempt}/{self.max_attempts}"
+        if self.state == "queued" and self._position is not None:
+            return f"{attempt}: queued in the {self.lane} lane at position {self._position()}"
+        if self.state == "running":
+            scanned = f", {self.rows_scanned:,} rows scanned" if self.rows_scanned is not None else ""
+            return f"{attempt} running{scanned}"
+        if self.state == "backoff":
+            wait_s = max(0.0, self.retry_at - time.monotonic())
+            return f"{attempt} failed ({self.reason}); retrying in {wait_s:.1f}s"
+        return f"{attempt}: waiting for capacity"
+
+
+class StatusPoller:
+    """
+    Asks the API for a running query's progress by request id. Stops asking
+    for good once the API answers 400/401/403/404/405, i.e. has no such
+    endpoint or won't serve it to us; backs off exponentially (up to
+    max_backoff_s) after errors, 429s and 5xx. A poll is skipped when
+    admit() returns False, e.g. no rate-limit token is free.
+    """
+
+    _UNSUPPORTED = (400, 401, 403, 404, 405)
+
+    def __init__(
+        self,
+        client: httpx.AsyncClient,
+        path: str,
+        headers: Dict[str, str],
+        timeout_s: float = 2.0,
+        max_backoff_s: float = 60.0,
+        admit: Optional[Callable[[], bool]] = None,
+    ) -> None:
+        self.client = client
+        self.path = path
+        self.headers = headers
+        self.timeout_s = timeout_s
+        self.max_backoff_s = max_backoff_s
+        self.admit = admit
+        self.supported = bool(path)
+        self.failures = 0
+        self._next_poll_at = 0.0
+
+    def _failed(self) -> None:
+        self.failures += 1
+        backoff_s = min(self.max_backoff_s, self.timeout_s * 2 ** self.failures)
+        self._next_poll_at = time.monotonic() + backoff_s
+
+    async def poll(self, status: CallStatus) -> None:
+        if not self.supported or status.state != "running" or status.base_url is None:
+            return
+        if time.monotonic() < self._next_poll_at:
+            return
+        if self.admit is not None and not self.admit():
+            return
+        try:
+            resp = await asyncio.wait_for(
+                self.client.post(f"{status.base_url}{self.path}",
+                                 json={"request_id": status.request_id}, headers=self.headers),
+                timeout=self.timeout_s,
+            )
+        except Exception as e:
+            log.debug("[%s] query status poll failed: %r", status.request_id, e)
+            self._failed()
+            return
+        if resp.status_code in self._UNSUPPORTED:
+            log.info("query status endpoint %s answered HTTP %d; not polling it again",
+                     self.path, resp.status_code)
+            self.supported = False
+            return
+        if resp.status_code >= 300:
+            log.debug("[%s] query status poll got HTTP %d", status.request_id, resp.status_code)
+            self._failed()
+            return
+        self.failures = 0
+        try:
+            body: Dict[str, Any] = resp.json()
+            rows = body.get("rows_scanned")
+        except (ValueError, AttributeError):
+            return
+        if isinstance(rows, int) and status.state == "running":
+            status.rows_scanned = rows
+
+
+async def with_progress(
+    aw: Awaitable[T],
+    report: ProgressFn,
+    status_of: Callable[[], Optional[CallStatus]],
+    interval_s: float,
+    total_s: Optional[float] = None,
+    poller: Optional[StatusPoller] = None,
+) -> T:
+    """
+    Await aw, calling report(elapsed_s, total_s, message) every interval_s
+    until it finishes (leaving out message when report doesn't take one,
+    as on older mcp releases). status_of() looks up the status of the call being
+    waited on (None before it has started).
+    """
+    task = asyncio.ensure_future(aw)
+    t0 = time.monotonic()
+    with_message = _accepts_message(report)
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=interval_s)
+            if done:
+                return task.result()
+            status = status_of()
+            if status is not None and poller is not None:
+                await poller.poll(status)
+            elapsed = time.monotonic() - t0
+            detail = status.describe() if status is not None else "waiting"
+            try:
+                if with_message:
+                    await report(round(elapsed, 1), total_s, f"{elapsed:.1f}s elapsed, {detail}")
+                else:
+                    await report(round(elapsed, 1), total_s)
+            except Exception as e:   # a progress hiccup must never fail the call
+                log.debug("progress notification failed: %r", e)
+    finally:
+        if not task.done():
+            task.cancel()
@@ -0,0 +1,110 @@
+"""
+Per-host HTTP/2 vs HTTP/1.1 selection.
+
+In "auto" mode each endpoint starts on the HTTP/2 client, where all
+concurrent calls share one multiplexed connection. It falls back to the
+HTTP/1.1 pool when:
+
+    - ALPN didn't negotiate h2 (the server or a proxy only speaks 1.1), or
+    - `max_failures` consecutive HTTP/2 attempts failed to connect or broke
+      (connect timeouts/errors, TLS and protocol errors). Read and deadline
+      timeouts don't count: a slow query is just as slow over HTTP/1.1.
+
+A fallen-back host gets HTTP/2 again after `retry_s`, so a transient edge
+problem doesn't pin it to HTTP/1.1 forever.
+"""
+
+import time
+import logging
+import importlib.util
+from typing import Optional, Dict, Any, Iterable
+
+log = logging.getLogger("definite-mcp")
+
+H1 = "http1.1"
+H2 = "http2"
+
+
+def http2_available() -> bool:
+    """httpx needs the optional `h2` package for HTTP/2."""
+    return importlib.util.find_spec("h2") is not None
+
+
+class _Host:
+    __slots__ = ("protocol", "failures", "fallen_back_at", "reason", "fallbacks")
+
+    def __init__(self, protocol: str) -> None:
+        self.protocol = protocol
+        self.failures = 0
+        self.fallen_back_at = 0.0
+        self.reason: Optional[str] = None
+        self.fallbacks = 0
+
+
+class ProtocolSelector:
+    """Tracks which protocol each base URL should use. Use from one event loop."""
+
+    def __init__(
+        self,
+        base_urls: Iterable[str],
+        mode: str = "off",
+        max_failures: int = 2,
+        retry_s: float = 300.0,
+    ) -> None:
+        self.mode = mode if mode in ("off", "auto") else "off"
+        self.max_failures = max(1, max_failures)
+        self.retry_s = retry_s
+        initial = H2 if self.enabled else H1
+        self._hosts: Dict[str, _Host] = {url: _Host(initial) for url in base_urls}
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode == "auto"
+
+    def use_http2(self, base_url: str) -> bool:
+        if not self.enabled:
+            return False
+        host = self._hosts.setdefault(base_url, _Host(H2))
+        if host.protocol == H1 and time.monotonic() - host.fallen_back_at >= self.retry_s:
+            log.info("retrying HTTP/2 for %s (fell back: %s)", base_url, host.reason)
+            host.protocol = H2
+            host.failures = 0
+        return host.protocol == H2
+
+    def record_response(self, base_url: str, http_version: str) -> None:
+        """A response arrived on the HTTP/2 client; http_version is what was negotiated."""
+        host = self._hosts.setdefault(base_url, _Host(H2))
+        if http_version == "HTTP/2":
+            host.failures = 0
+        else:
+            self._fall_back(base_url, host, "not_negotiated")
+
+    def record_failure(self, base_url: str, phase: str) -> None:
+        """An HTTP/2 attempt failed in a way that may be protocol-related."""
+        host = self._hosts.setdefault(base_url, _Host(H2))
+        if host.protocol != H2:
+            return
+        host.failures += 1
+        if host.failures >= self.max_failures:
+            self._fall_back(base_url, host, phase)
+
+    def _fall_back(self, base_url: str, host: _Host, reason: str) -> None:
+        if host.protocol == H1:
+            return
+        log.warning("falling back to HTTP/1.1 for %s (%s); retrying HTTP/2 in %.0fs",
+                    base_url, reason, self.retry_s)
+        host.protocol = H1
+        host.fallen_back_at = time.monotonic()
+        host.reason = reason
+        host.fallbacks += 1
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            url: {
+                "protocol": h.protocol,
+                "consecutive_failures": h.failures,
+                "fallbacks": h.fallbacks,
+                "fallback_reason": h.reason,
+            }
+            for url, h in self._hosts.items()
+        }
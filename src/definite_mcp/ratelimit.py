@@ -0,0 +1,159 @@
+"""
+Client-side token-bucket rate limiting.
+
+Each bucket refills at `rate` requests/second up to `burst`. A request
+takes one token from its API-key bucket and one from its integration's
+bucket; when either is empty it waits (in arrival order) until its token
+is due instead of being sent and rejected with 429.
+
+Tokens are reserved up front, so a bucket may go negative: the deficit is
+exactly the queue of callers already waiting, and each one sleeps until
+its own token would have been refilled.
+
+Optional requests (hedges, status polls) use try_acquire instead: they
+only take a token that is available right now, and are skipped otherwise,
+so they never delay or outnumber the calls the limit is there for.
+"""
+
+import time
+import asyncio
+from typing import Optional, Dict, Any, List, Tuple
+
+
+def parse_rate(spec: str) -> Tuple[float, Optional[float]]:
+    """"5" -> (5.0, None); "5:10" -> (5.0, 10.0)"""
+    rate, _, burst = spec.partition(":")
+    return float(rate), float(burst) if burst else None
+
+
+def parse_overrides(spec: str) -> Dict[str, Tuple[float, Optional[float]]]:
+    """"int_a=5,int_b=2:4" -> {"int_a": (5.0, None), "int_b": (2.0, 4.0)}"""
+    out: Dict[str, Tuple[float, Optional[float]]] = {}
+    for part in spec.split(","):
+        name, sep, value = part.partition("=")
+        if sep and name.strip():
+            out[name.strip()] = parse_rate(value.strip())
+    return out
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: Optional[float] = None) -> None:
+        self.rate = rate
+        self.burst = max(1.0, burst if burst is not None else rate)
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self.delayed = 0
+        self.skipped = 0
+        self.wait_s_total = 0.0
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def available(self) -> bool:
+        """Whether a token can be taken right now without waiting."""
+        self._refill()
+        return self._tokens >= 1
+
+    def reserve(self) -> float:
+        """Take a token; returns how long to wait before using it."""
+        self._refill()
+        self._tokens -= 1
+        return -self._tokens / self.rate if self._tokens < 0 else 0.0
+
+    def refund(self) -> None:
+        self._tokens = min(self.burst, self._tokens + 1)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "rate": self.rate,
+            "burst": self.burst,
+            "tokens": round(self._tokens, 2),
+            "delayed": self.delayed,
+            "skipped": self.skipped,
+            "wait_s_total": round(self.wait_s_total, 3),
+        }
+
+
+class RateLimiter:
+    """
+    Buckets per API key and per integration. A rate <= 0 means unlimited;
+    `overrides` sets (rate, burst) for specific integration ids.
+    """
+
+    def __init__(
+        self,
+        key_rate: float = 0.0,
+        key_burst: Optional[float] = None,
+        integration_rate: float = 0.0,
+        integration_burst: Optional[float] = None,
+        overrides: Optional[Dict[str, Tuple[float, Optional[float]]]] = None,
+    ) -> None:
+        self.key_rate = key_rate
+        self.key_burst = key_burst
+        self.integration_rate = integration_rate
+        self.integration_burst = integration_burst
+        self.overrides = dict(overrides or {})
+        self._buckets: Dict[str, TokenBucket] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return self.key_rate > 0 or self.integration_rate > 0 or any(r > 0 for r, _ in self.overrides.values())
+
+    def _bucket(self, name: str, rate: float, burst: Optional[float]) -> Optional[TokenBucket]:
+        if rate <= 0:
+            return None
+        bucket = self._buckets.get(name)
+        if bucket is None:
+            bucket = self._buckets[name] = TokenBucket(rate, burst)
+        return bucket
+
+    def _buckets_for(self, key_id: str, integration: Optional[str]) -> List[TokenBucket]:
+        found = [self._bucket(f"key:{key_id}", self.key_rate, self.key_burst)]
+        if integration is not None:
+            rate, burst = self.overrides.get(integration, (self.integration_rate, self.integration_burst))
+            found.append(self._bucket(f"integration:{integration}", rate, burst))
+        return [b for b in found if b is not None]
+
+    def try_acquire(self, key_id: str, integration: Optional[str] = None) -> bool:
+        """
+        Take a token from each bucket only if all have one now; False means
+        skip the (optional) request. integration None uses the key bucket only.
+        """
+        if not self.enabled:
+            return True
+        buckets = self._buckets_for(key_id, integration)
+        if not all(b.available() for b in buckets):
+            for b in buckets:
+                b.skipped += 1
+            return False
+        for b in buckets:
+            b.reserve()
+        return True
+
+    async def acquire(self, key_id: str, integration: str) -> float:
+        """
+        Wait until both buckets allow a request; returns seconds waited.
+        key_id identifies the API key (pass a fingerprint, not the key).
+        """
+        if not self.enabled:
+            return 0.0
+        buckets = self._buckets_for(key_id, integration)
+        wait_s = max((b.reserve() for b in buckets), default=0.0)
+        if wait_s <= 0:
+            return 0.0
+        for b in buckets:
+            b.delayed += 1
+            b.wait_s_total += wait_s
+        try:
+            await asyncio.sleep(wait_s)
+        except asyncio.CancelledError:
+            for b in buckets:
+                b.refund()
+            raise
+        return wait_s
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Bucket state keyed "key:<fingerprint>" / "integration:<id>"."""
+        return {name: b.snapshot() for name, b in sorted(self._buckets.items())}
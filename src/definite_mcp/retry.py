@@ -0,0 +1,131 @@
+"""
+Retry policy for Definite API requests.
+
+RetryPolicy decides which responses and exceptions are retryable and how
+long to wait (exponential backoff with jitter, honoring Retry-After).
+RetryBudget caps retries process-wide as a fraction of recent requests so a
+struggling API doesn't get hit by a retry storm.
+"""
+
+import time
+import random
+import asyncio
+from collections import deque
+from email.utils import parsedate_to_datetime
+from typing import Optional, Dict, Any, Deque, Tuple, Type, FrozenSet
+
+import httpx
+
+JITTER_MODES = ("full", "decorrelated", "none")
+
+DEFAULT_RETRY_STATUSES = frozenset({429, 502, 503, 504})
+
+DEFAULT_RETRY_EXCEPTIONS: Tuple[Type[BaseException], ...] = (
+    httpx.ConnectTimeout, httpx.ConnectError,
+    httpx.ReadTimeout, httpx.RemoteProtocolError,
+    httpx.PoolTimeout, asyncio.TimeoutError,
+)
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP-date)."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError, IndexError, OverflowError):
+        return None
+
+
+class RetryPolicy:
+    def __init__(
+        self,
+        max_attempts: int,
+        base_s: float,
+        max_s: float,
+        jitter: str = "full",
+        retry_after_max_s: float = 30.0,
+        retry_statuses: FrozenSet[int] = DEFAULT_RETRY_STATUSES,
+        retry_exceptions: Tuple[Type[BaseException], ...] = DEFAULT_RETRY_EXCEPTIONS,
+    ) -> None:
+        if jitter not in JITTER_MODES:
+            raise ValueError(f"Unknown retry jitter mode {jitter!r}; expected one of {JITTER_MODES}")
+        self.max_attempts = max(1, max_attempts)
+        self.base_s = base_s
+        self.max_s = max_s
+        self.jitter = jitter
+        self.retry_after_max_s = retry_after_max_s
+        self.retry_statuses = retry_statuses
+        self.retry_exceptions = retry_exceptions
+
+    def retryable_status(self, status_code: int) -> bool:
+        return status_code in self.retry_statuses
+
+    def delay(
+        self,
+        attempt: int,
+        previous_s: float = 0.0,
+        retry_after_s: Optional[float] = None,
+    ) -> Optional[float]:
+        """
+        Sleep before attempt `attempt + 1`, or None when the server asked us
+        to wait longer than retry_after_max_s (don't retry).
+        """
+        ceiling = min(self.max_s, self.base_s * (2 ** (attempt - 1)))
+        if self.jitter == "full":
+            d = random.uniform(0.0, ceiling)
+        elif self.jitter == "decorrelated":
+            d = min(self.max_s, random.uniform(self.base_s, max(self.base_s, previous_s * 3)))
+        else:
+            d = ceiling
+        if retry_after_s is not None:
+            if retry_after_s > self.retry_after_max_s:
+                return None
+            d = max(d, retry_after_s)
+        return d
+
+
+class RetryBudget:
+    """
+    Allows retries while retries in the last `window_s` stay below
+    `min_retries + ratio * requests` over the same window.
+    """
+
+    def __init__(self, ratio: float, min_retries: int, window_s: float = 10.0) -> None:
+        self.ratio = ratio
+        self.min_retries = min_retries
+        self.window_s = window_s
+        self._requests: Deque[float] = deque()
+        self._retries: Deque[float] = deque()
+        self.exhausted = 0
+
+    def record_request(self) -> None:
+        self._requests.append(time.monotonic())
+
+    def try_spend(self) -> bool:
+        now = time.monotonic()
+        self._prune(now)
+        if len(self._retries) >= self.min_retries + self.ratio * len(self._requests):
+            self.exhausted += 1
+            return False
+        self._retries.append(now)
+        return True
+
+    def snapshot(self) -> Dict[str, Any]:
+        self._prune(time.monotonic())
+        return {
+            "requests_in_window": len(self._requests),
+            "retries_in_window": len(self._retries),
+            "exhausted": self.exhausted,
+        }
+
+    def _prune(self, now: float) -> None:
+        cutoff = now - self.window_s
+        for q in (self._requests, self._retries):
+            while q and q[0] < cutoff:
+                q.popleft()
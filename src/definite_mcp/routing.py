@@ -0,0 +1,114 @@
+"""
+Latency-weighted routing across several Definite API endpoints.
+
+Each endpoint keeps an exponentially weighted moving average (EWMA) of its
+time to response headers. A request goes to the endpoint with the lowest
+score, ewma * (in_flight + 1), so a slow or busy endpoint sheds load to the
+others without being abandoned. Connect failures fold a penalty into the
+EWMA, and the caller can exclude endpoints that already failed during the
+current call. An idle endpoint without samples scores 0, so each one is
+tried early and gets a latency estimate; while its first requests are in
+flight it is scored with the average of the others.
+"""
+
+from typing import Optional, Dict, Any, List, Callable, Iterable
+
+_EXC_ATTR = "_definite_endpoint"
+
+
+class Endpoint:
+    def __init__(self, url: str, index: int) -> None:
+        self.url = url
+        self.index = index
+        self.ewma_ms: Optional[float] = None
+        self.in_flight = 0
+        self.requests = 0
+        self.failures = 0
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "ewma_ms": round(self.ewma_ms, 1) if self.ewma_ms is not None else None,
+            "in_flight": self.in_flight,
+            "requests": self.requests,
+            "failures": self.failures,
+        }
+
+
+class EndpointRouter:
+    """Picks the lowest-scoring endpoint. Use from one event loop."""
+
+    def __init__(self, urls: List[str], alpha: float = 0.3, failure_penalty_ms: float = 5000.0) -> None:
+        if not urls:
+            raise ValueError("at least one endpoint URL is required")
+        self.endpoints = [Endpoint(url, i) for i, url in enumerate(urls)]
+        self._by_url = {e.url: e for e in self.endpoints}
+        self.alpha = alpha
+        self.failure_penalty_ms = failure_penalty_ms
+
+    def __len__(self) -> int:
+        return len(self.endpoints)
+
+    def pick(
+        self,
+        exclude: Iterable[str] = (),
+        usable: Optional[Callable[[Endpoint], bool]] = None,
+    ) -> Endpoint:
+        """
+        Best endpoint not in `exclude`, preferring ones `usable` accepts
+        (e.g. healthy, circuit not open). Falls back to excluded or unusable
+        endpoints rather than returning nothing; ties go to list order.
+        """
+        excluded = set(exclude)
+        candidates = [e for e in self.endpoints if e.url not in excluded] or self.endpoints
+        if usable is not None:
+            candidates = [e for e in candidates if usable(e)] or candidates
+        known = [e.ewma_ms for e in self.endpoints if e.ewma_ms is not None]
+        default_ms = sum(known) / len(known) if known else 1.0
+
+        def score(e: Endpoint) -> float:
+            if e.ewma_ms is None and e.in_flight == 0:
+                return 0.0
+            return (e.ewma_ms if e.ewma_ms is not None else default_ms) * (e.in_flight + 1)
+
+        return min(candidates, key=lambda e: (score(e), e.index))
+
+    def started(self, endpoint: Endpoint) -> None:
+        """Count a request against endpoint; call right after pick() so the next pick sees it."""
+        endpoint.in_flight += 1
+        endpoint.requests += 1
+
+    def finished(self, endpoint: Endpoint) -> None:
+        endpoint.in_flight = max(0, endpoint.in_flight - 1)
+
+    def observe(self, url: str, latency_ms: float) -> None:
+        """Fold a time-to-response-headers sample into url's EWMA."""
+        endpoint = self._by_url.get(url)
+        if endpoint is not None:
+            self._observe(endpoint, latency_ms)
+
+    def failed(self, url: str) -> None:
+        """Record a connect-level failure against url."""
+        endpoint = self._by_url.get(url)
+        if endpoint is not None:
+            endpoint.failures += 1
+            self._observe(endpoint, max(self.failure_penalty_ms, endpoint.ewma_ms or 0.0))
+
+    def _observe(self, endpoint: Endpoint, ms: float) -> None:
+        if endpoint.ewma_ms is None:
+            endpoint.ewma_ms = ms
+        else:
+            endpoint.ewma_ms += self.alpha * (ms - endpoint.ewma_ms)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        return {e.url: e.snapshot() for e in self.endpoints}
+
+
+def attach_endpoint(exc: BaseException, url: str) -> None:
+    try:
+        setattr(exc, _EXC_ATTR, url)
+    except AttributeError:
+        pass
+
+
+def endpoint_of(exc: BaseException) -> Optional[str]:
+    return getattr(exc, _EXC_ATTR, None)
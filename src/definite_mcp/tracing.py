@@ -0,0 +1,110 @@
+"""
+Per-request phase timings via the httpx/httpcore "trace" extension.
+
+A RequestTrace is passed as `extensions={"trace": trace}`; httpcore calls it
+with "<layer>.<step>.started/complete/failed" events, which are folded into
+phase durations:
+
+    queue_wait     waiting on the client-side rate limiter / concurrency limit
+    pool_wait      request start -> first connection/IO event
+    dns            name resolution (reported by the resolver, when available)
+    connect        TCP connect
+    tls            TLS handshake
+    request_write  sending request headers + body
+    ttfb           waiting for response headers after the request was sent
+    download       reading the response body
+    total          whole attempt
+"""
+
+import time
+from contextvars import ContextVar
+from typing import Optional, Dict, Any, Tuple
+
+from .metrics import Histogram
+
+PHASES = ("queue_wait", "pool_wait", "dns", "connect", "tls", "request_write", "ttfb", "download", "total")
+
+# httpcore step name -> phase
+_STEP_PHASES = {
+    "connect_tcp": "connect",
+    "connect_unix_socket": "connect",
+    "start_tls": "tls",
+    "send_connection_init": "request_write",
+    "send_request_headers": "request_write",
+    "send_request_body": "request_write",
+    "receive_response_headers": "ttfb",
+    "receive_response_body": "download",
+}
+
+_EXC_ATTR = "_definite_timings"
+
+# The trace of the attempt running in this context, for layers below httpcore
+# (e.g. the DNS cache) that have no access to the request's extensions
+CURRENT_TRACE: "ContextVar[Optional[RequestTrace]]" = ContextVar("definite_mcp_trace", default=None)
+
+
+class RequestTrace:
+    """Callable trace hook that accumulates phase durations for one attempt."""
+
+    def __init__(self) -> None:
+        self.t0 = time.monotonic()
+        self.t_end: Optional[float] = None
+        self.phases_ms: Dict[str, float] = {}
+        self._first_event: Optional[float] = None
+        self._open: Dict[str, float] = {}
+
+    async def __call__(self, event_name: str, info: Dict[str, Any]) -> None:
+        now = time.monotonic()
+        if self._first_event is None:
+            self._first_event = now
+        step, _, status = event_name.rpartition(".")
+        step = step.split(".", 1)[-1]
+        if status == "started":
+            self._open[step] = now
+            return
+        started = self._open.pop(step, None)
+        phase = _STEP_PHASES.get(step)
+        if started is not None and phase is not None:
+            self.add(phase, (now - started) * 1000)
+
+    def add(self, phase: str, ms: float) -> None:
+        self.phases_ms[phase] = self.phases_ms.get(phase, 0.0) + ms
+
+    def finish(self) -> Dict[str, float]:
+        """Close the trace and return rounded phase timings (ms)."""
+        if self.t_end is None:
+            self.t_end = time.monotonic()
+            if self._first_event is not None:
+                # DNS, when reported, happens inside the connect window already
+                self.add("pool_wait", (self._first_event - self.t0) * 1000)
+            self.add("total", (self.t_end - self.t0) * 1000)
+        return {p: round(self.phases_ms[p], 1) for p in PHASES if p in self.phases_ms}
+
+
+class PhaseHistograms:
+    """Histograms keyed by (phase, endpoint, integration)."""
+
+    def __init__(self) -> None:
+        self._hists: Dict[Tuple[str, str, str], Histogram] = {}
+
+    def record(self, endpoint: str, integration: str, timings: Dict[str, float]) -> None:
+        for phase, ms in timings.items():
+            key = (phase, endpoint, integration)
+            hist = self._hists.get(key)
+            if hist is None:
+                hist = self._hists[key] = Histogram()
+            hist.observe(ms)
+
+    def items(self):
+        return self._hists.items()
+
+
+def attach_timings(exc: BaseException, timings: Dict[str, float]) -> None:
+    try:
+        setattr(exc, _EXC_ATTR, timings)
+    except AttributeError:
+        pass
+
+
+def timings_of(exc: BaseException) -> Optional[Dict[str, float]]:
+    return getattr(exc, _EXC_ATTR, None)
@@ -0,0 +1,139 @@
+"""
+Connection pre-warming for the shared HTTP client.
+
+At startup, and for `window_s` after the last real response from an
+endpoint, the warmer sends `connections` concurrent HEAD requests to it
+whenever its pooled connections are about to hit the keepalive expiry.
+Concurrent requests make the pool open (or reuse and refresh) that many
+keep-alive connections, so a follow-up call shortly after a burst skips
+TCP + TLS setup instead of paying for it.
+
+Once an endpoint has been quiet for `window_s` the warmer stops pinging it
+and lets the pool's keepalive expiry close (and so recycle) its
+connections; the loop exits when every endpoint is quiet and is started
+again by the next call.
+"""
+
+import time
+import asyncio
+import logging
+from typing import Optional, Dict, Any, List, Callable
+
+import httpx
+
+from .background import BackgroundTask
+
+log = logging.getLogger("definite-mcp")
+
+
+class ConnectionWarmer:
+    def __init__(
+        self,
+        client: httpx.AsyncClient,
+        base_urls: List[str],
+        client_for: Optional[Callable[[str], httpx.AsyncClient]] = None,
+        path: str = "/v1/healthz",
+        connections: int = 1,
+        idle_s: float = 2.5,
+        window_s: float = 60.0,
+        timeout_s: float = 5.0,
+    ) -> None:
+        self.client = client
+        # Picks the client (e.g. HTTP/1.1 vs HTTP/2) a base URL is served by
+        self.client_for = client_for
+        self.base_urls = list(base_urls)
+        self.path = path
+        self.connections = connections
+        self.idle_s = idle_s
+        self.window_s = window_s
+        self.timeout_s = timeout_s
+        # base URL -> monotonic time of the last response seen on it
+        self._last_active: Dict[str, float] = {}
+        # base URL -> monotonic time of the last real (non-warm-up) response
+        self._last_traffic: Dict[str, float] = {}
+        self._started_at = 0.0
+        self.warmups = 0
+        self.failures = 0
+        self._loop = BackgroundTask(self._run, "definite-mcp-warmup")
+
+    @property
+    def enabled(self) -> bool:
+        return self.connections > 0 and self.idle_s > 0 and self.window_s > 0
+
+    def touch(self, base_url: str) -> None:
+        """Note a real response on base_url (its connection was just refreshed)."""
+        self._last_active[base_url] = self._last_traffic[base_url] = time.monotonic()
+
+    def ensure_started(self) -> None:
+        """Start the warm loop on the running event loop if it isn't already."""
+        if not self.enabled:
+            return
+        if self._loop.ensure_started():
+            # Starting (at startup or on a call after going quiet) opens a window
+            self._started_at = time.monotonic()
+
+    async def stop(self) -> None:
+        await self._loop.stop()
+
+    async def warm(self, base_url: str) -> int:
+        """Open/refresh up to `connections` pooled connections to base_url; returns how many succeeded."""
+        results = await asyncio.gather(
+            *(self._head(base_url) for _ in range(self.connections)), return_exceptions=True,
+        )
+        ok = sum(1 for r in results if r is True)
+        self.warmups += ok
+        self.failures += len(results) - ok
+        if ok:
+            self._last_active[base_url] = time.monotonic()
+        for r in results:
+            if isinstance(r, BaseException):
+                log.debug("warm-up of %s failed: %r", base_url, r)
+        return ok
+
+    async def _head(self, base_url: str) -> bool:
+        client = self.client_for(base_url) if self.client_for is not None else self.client
+        await asyncio.wait_for(
+            client.head(f"{base_url}{self.path}", headers={"User-Agent": "definite-mcp/warmup"}),
+            timeout=self.timeout_s,
+        )
+        return True
+
+    def snapshot(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        return {
+            "connections": self.connections,
+            "idle_s": self.idle_s,
+            "window_s": self.window_s,
+            "running": self._loop.running,
+            "warmups": self.warmups,
+            "failures": self.failures,
+            "idle_for_s": {
+                url: round(now - self._last_active[url], 1) if url in self._last_active else None
+                for url in self.base_urls
+            },
+        }
+
+    def _in_window(self, base_url: str, now: float) -> bool:
+        last = max(self._last_traffic.get(base_url, 0.0), self._started_at)
+        return now - last < self.window_s
+
+    async def _run(self) -> None:
+        while True:
+            now = time.monotonic()
+            active = [url for url in self.base_urls if self._in_window(url, now)]
+            if not active:
+                log.debug("warm-up stopped: no traffic for %.0fs", self.window_s)
+                return
+            try:
+                stale = [
+                    url for url in active
+                    if now - self._last_active.get(url, float("-inf")) >= self.idle_s
+                ]
+                if stale:
+                    await asyncio.gather(*(self.warm(url) for url in stale))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:  # never let the warmer die
+                log.debug("warm-up loop error: %r", e)
+            # Check often enough to refresh before the pool's keepalive expiry
+            await asyncio.sleep(self.idle_s / 2)